@@ -0,0 +1,73 @@
+# Поиск по содержимому: пул процессов с mmap против однопоточного open().read().
+# Запуск из корня проекта: python -m benchmarks.bench_content --files 2000
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finder.content import ContentSearch
+
+WORDS = "запрос ответ ошибка доступ сервер error warning connect timeout user".split()
+
+
+def make_files(root, n, lines, seed=7):
+    rnd = random.Random(seed)
+    paths = []
+    for i in range(n):
+        p = os.path.join(root, f"log_{i}.log")
+        with open(p, "w", encoding="utf-8") as f:
+            for j in range(lines):
+                f.write(" ".join(rnd.choice(WORDS) for _ in range(8)))
+                if rnd.random() < 0.001:
+                    f.write(" NEEDLE-42")
+                f.write("\n")
+        paths.append((os.path.basename(p), p))
+    return paths
+
+
+def baseline(paths, needle):
+    hits = 0
+    low = needle.lower()
+    for _, p in paths:
+        with open(p, encoding="utf-8", errors="replace") as f:
+            for line in f.read().splitlines():
+                if low in line.lower():
+                    hits += 1
+    return hits
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=2000)
+    ap.add_argument("--lines", type=int, default=2000)
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--needle", default="needle-42")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="ffp_content_")
+    try:
+        paths = make_files(tmp, args.files, args.lines)
+        mb = sum(os.path.getsize(p) for _, p in paths) / 1024 / 1024
+
+        t0 = time.perf_counter()
+        h1 = baseline(paths, args.needle)
+        t1 = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        h2 = sum(1 for _ in ContentSearch(paths, args.needle, args.workers))
+        t2 = time.perf_counter() - t0
+
+        print(f"{args.files} файлов, {mb:.0f} МБ")
+        print(f"open().read(), 1 поток: {t1:7.2f} с  {mb / t1:8.1f} МБ/с  строк: {h1}")
+        print(f"mmap, {args.workers} процессов:    {t2:7.2f} с  {mb / t2:8.1f} МБ/с  строк: {h2}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
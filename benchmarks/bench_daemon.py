@@ -0,0 +1,146 @@
+# Нагрузочный тест демона поиска: N клиентов одновременно шлют запросы.
+# Без --socket демон поднимается в этом же процессе на синтетическом дереве.
+# Запуск из корня проекта:
+#   python -m benchmarks.bench_daemon --clients 16 --queries 20
+#   python -m benchmarks.bench_daemon --socket /run/user/1000/ffp.sock --root /srv/share
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import treegen
+from finder.daemon import DaemonClient, DaemonError, SearchDaemon
+
+# Запросы клиентов по кругу: подстроки, расширения, уточнения предыдущих
+QUERIES = [
+    ("", [".xlsx", ".xls"]),
+    ("отч", []),
+    ("отчет", []),
+    ("a", [".pdf"]),
+    ("*.doc?", []),
+    ("2024", []),
+]
+
+
+def client(path, root, n, offset, cancel_every, out):
+    lat, rows, cancelled, errors = [], 0, 0, []
+    try:
+        with DaemonClient(path, timeout=10) as c:
+            for i in range(n):
+                text, exts = QUERIES[(offset + i) % len(QUERIES)]
+                # Каждый cancel_every-й запрос отменяется после первого пакета
+                cancel = cancel_every and (i + 1) % cancel_every == 0
+                got = []
+                t0 = time.perf_counter()
+                for batch in c.search(root, text, exts, stop=lambda: cancel and got):
+                    got.append(len(batch))
+                lat.append((time.perf_counter() - t0) * 1000)
+                rows += sum(got)
+                cancelled += bool(c.last.get("cancelled"))
+    except DaemonError as e:
+        errors.append(str(e))
+    out.append((lat, rows, cancelled, errors))
+
+
+def run(path, root, clients, queries, cancel_every):
+    out = []
+    threads = [
+        threading.Thread(
+            target=client, args=(path, root, queries, k, cancel_every, out)
+        )
+        for k in range(clients)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    lat = sorted(x for r in out for x in r[0])
+    rows = sum(r[1] for r in out)
+    errors = [e for r in out for e in r[3]]
+    print(f"клиентов: {clients}, запросов: {len(lat)}, за {wall:.2f} с")
+    if lat:
+        p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+        print(
+            f"задержка: медиана {statistics.median(lat):.1f} мс, "
+            f"p95 {p95:.1f} мс, макс {lat[-1]:.1f} мс"
+        )
+        print(
+            f"запросов/с: {len(lat) / wall:.1f}, строк/с: {rows / wall:.0f}, "
+            f"отменено: {sum(r[2] for r in out)}"
+        )
+    if errors:
+        print(f"ошибок: {len(errors)} ({errors[0]})")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--socket", help="сокет уже запущенного демона")
+    ap.add_argument("--root", help="готовое дерево вместо синтетического")
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--queries", type=int, default=10, help="запросов на клиента")
+    ap.add_argument("--cancel-every", type=int, default=5, help="0 — без отмен")
+    ap.add_argument("--max-clients", type=int, default=32)
+    ap.add_argument("--depth", type=int, default=4)
+    ap.add_argument("--fanout", type=int, default=5)
+    ap.add_argument("--files", type=int, default=20000)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="ffp_daemon_")
+    root = args.root
+    daemon = None
+    try:
+        if not root:
+            root = os.path.join(tmp, "tree")
+            os.makedirs(root)
+            tree = treegen.generate(root, args.depth, args.fanout, args.files)
+            print(f"Синтетическое дерево: {tree['files']} файлов, {tree['dirs']} папок")
+        path = args.socket
+        if not path:
+            daemon = SearchDaemon(
+                os.path.join(tmp, "ffp.sock"),
+                os.path.join(tmp, "index.db"),
+                max_clients=args.max_clients,
+            )
+            daemon.start()
+            path = daemon.path
+        # Первый прогон застаёт холодный демон (обход), второй — тёплый
+        # (кэш и индекс, построенный после первого обхода)
+        for phase in ("холодный", "тёплый"):
+            print(f"--- {phase} ---")
+            run(path, root, args.clients, args.queries, args.cancel_every)
+            if daemon:
+                # Ждём фоновую индексацию, чтобы тёплый прогон её застал
+                while daemon.report()["indexing"]:
+                    time.sleep(0.1)
+        with DaemonClient(path) as c:
+            stats = c.stats()
+        print(
+            "демон: "
+            + ", ".join(
+                f"{k}={stats[k]}"
+                for k in (
+                    "connections",
+                    "rejected",
+                    "from_walk",
+                    "from_index",
+                    "from_cache",
+                    "cancelled",
+                )
+            )
+        )
+    finally:
+        if daemon:
+            daemon.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
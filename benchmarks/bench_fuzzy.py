@@ -0,0 +1,73 @@
+# Пропускная способность нечёткой оценки имён и top-K кучи против подстроки.
+# Запуск из корня проекта: python -m benchmarks.bench_fuzzy --names 1000000
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_query import make_names
+from finder.fuzzy import TopK, compile_fuzzy
+
+
+def substring(names, term):
+    term = term.casefold()
+    return sum(1 for n in names if term in n.casefold())
+
+
+def score_only(names, term):
+    score = compile_fuzzy(term)
+    return sum(1 for n in names if score(n) is not None)
+
+
+def ranked(names, term, k):
+    # Полный путь нечёткого режима: оценка + куча лучших K
+    score = compile_fuzzy(term)
+    top = TopK(k)
+    for n in names:
+        s = score(n)
+        if s is not None:
+            top.push(s, (n, n, -1, 0.0))
+    return len(top.heap)
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    hits = fn(*args)
+    return hits, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--names", type=int, default=1_000_000)
+    ap.add_argument("--k", type=int, default=200)
+    ap.add_argument("--terms", nargs="+", default=["отчет", "отчт", "budgt_12", "IMG"])
+    args = ap.parse_args()
+
+    names = make_names(args.names, [".xlsx", ".docx", ".pdf"])
+    n = len(names)
+    for term in args.terms:
+        h0, t0 = timed(substring, names, term)
+        h1, t1 = timed(score_only, names, term)
+        h2, t2 = timed(ranked, names, term, args.k)
+        print(
+            f"{term:<10} подстрока: {t0 / n * 1e9:5.0f} нс/имя ({h0})  "
+            f"оценка: {t1 / n * 1e9:5.0f} нс/имя ({h1})  "
+            f"оценка+top-{args.k}: {t2 / n * 1e9:5.0f} нс/имя, "
+            f"{n / t2 / 1e6:.2f} млн имён/с"
+        )
+
+    # Память кучи не зависит от числа просмотренных имён
+    for count in (n // 10, n):
+        part = names[:count]
+        tracemalloc.start()
+        ranked(part, args.terms[0], args.k)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"пик памяти top-{args.k} на {count} именах: {peak / 1024:.0f} КБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Стоимость проверки одного имени: старый цикл SearchThread против finder.query.
+# Запуск из корня проекта: python -m benchmarks.bench_query --names 1000000
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from itertools import compress
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finder.query import compile_query
+
+WORDS = ["отчет", "report", "IMG", "договор", "budget", "scan", "Копия", "final", "data"]
+
+
+def make_names(n, exts, seed=42):
+    rnd = random.Random(seed)
+    pool = exts + [".tmp", ".dll", ".exe", ".dat", ".bin", ".cache"] * 3
+    return [
+        f"{rnd.choice(WORDS)}_{rnd.randrange(100000)}{rnd.choice(pool)}"
+        for _ in range(n)
+    ]
+
+
+def legacy_match(names, term, exts):
+    # Цикл из SearchThread.run до компилятора запросов
+    term = term.lower()
+    hits = 0
+    for f in names:
+        f_low = f.lower()
+        match_name = term in f_low
+        match_ext = any(f_low.endswith(e) for e in exts) if exts else True
+        if (match_name and match_ext) or (not term and not exts):
+            hits += 1
+    return hits
+
+
+def compiled_match(names, term, exts):
+    # Как в finder.engine: совпавшие отбирает Query.matches, цикл — только по ним
+    hits = 0
+    for f in compress(names, compile_query(term, exts).matches(names)):
+        hits += 1
+    return hits
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    hits = fn(*args)
+    return hits, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--names", type=int, default=1_000_000)
+    ap.add_argument("--category", default="excel")
+    ap.add_argument("--term", default="отчет")
+    args = ap.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root, "extensions.json"), encoding="utf-8") as f:
+        exts = json.load(f).get(args.category, [])
+    names = make_names(args.names, exts)
+
+    for label, term, e in [
+        ("имя + категория", args.term, exts),
+        ("только категория", "", exts),
+        ("только имя", args.term, []),
+    ]:
+        h1, t1 = timed(legacy_match, names, term, e)
+        h2, t2 = timed(compiled_match, names, term, e)
+        print(
+            f"{label:<18} старый: {t1 / len(names) * 1e9:6.0f} нс/имя  "
+            f"новый: {t2 / len(names) * 1e9:6.0f} нс/имя  x{t1 / t2:.2f}  "
+            f"(совпадений {h1}/{h2})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# Холодный запуск окна: медиана по фазам из main.py --startup-profile.
+# Каждый замер — отдельный процесс. Без PyQt6 меряется только импорт finder:
+# модули, нужные для показа окна, против всех сразу (как было до отложенных импортов).
+# Запуск из корня проекта: python -m benchmarks.bench_startup --runs 10
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# То, что main.py импортирует при запуске
+STARTUP_MODULES = [
+    "finder.cache",
+    "finder.categories",
+    "finder.engine",
+    "finder.filters",
+    "finder.index",
+    "finder.iopool",
+    "finder.metrics",
+    "finder.prune",
+    "finder.query",
+    "finder.store",
+    "finder.throttle",
+    "finder.walker",
+    "finder.watchdog",
+]
+# Режимы поиска, которые теперь грузятся при первом использовании
+DEFERRED_MODULES = [
+    "finder.archives",
+    "finder.content",
+    "finder.daemon",
+    "finder.dupes",
+    "finder.facets",
+    "finder.fuzzy",
+    "finder.multiroot",
+    "finder.thumbs",
+    "finder.usage",
+]
+
+IMPORT_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import {modules}
+print((time.perf_counter() - t0) * 1000)
+"""
+
+
+def import_ms(modules):
+    code = IMPORT_SNIPPET.format(modules=", ".join(modules))
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return float(out.stdout.strip())
+
+
+def has_qt():
+    try:
+        import PyQt6.QtWidgets  # noqa: F401
+
+        return True
+    except ImportError:
+        return False
+
+
+def window_phases(out_path):
+    env = dict(os.environ)
+    if sys.platform.startswith("linux") and not env.get("DISPLAY"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    subprocess.run(
+        [
+            sys.executable,
+            "main.py",
+            f"--startup-profile={out_path}",
+            "--startup-exit",
+        ],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        check=True,
+        timeout=120,
+    )
+    with open(out_path, encoding="utf-8") as f:
+        data = json.load(f)
+    phases = {p["phase"]: p["ms"] for p in data["phases"]}
+    phases["всего"] = data["total_ms"]
+    return phases
+
+
+def median_table(runs):
+    names = list(runs[0])
+    width = max(len(n) for n in names)
+    for n in names:
+        values = [r[n] for r in runs if n in r]
+        print(f"{n:<{width}}  {statistics.median(values):8.1f} мс")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=10)
+    args = ap.parse_args()
+
+    startup = [import_ms(STARTUP_MODULES) for _ in range(args.runs)]
+    eager = [import_ms(STARTUP_MODULES + DEFERRED_MODULES) for _ in range(args.runs)]
+    print(
+        f"импорт finder при запуске: {statistics.median(startup):.1f} мс, "
+        f"со всеми режимами сразу: {statistics.median(eager):.1f} мс"
+    )
+
+    if not has_qt():
+        print("PyQt6 не установлен — замер окна пропущен")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "startup.json")
+        runs = [window_phases(out) for _ in range(args.runs)]
+    print(f"окно, медиана по {args.runs} запускам:")
+    median_table(runs)
+
+
+if __name__ == "__main__":
+    main()
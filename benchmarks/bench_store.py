@@ -0,0 +1,87 @@
+# Память и доступ: список кортежей против finder.store.ResultStore, в том
+# числе с выгрузкой во временный файл. Строки — как у скана "Все файлы".
+# Запуск из корня проекта: python -m benchmarks.bench_store --rows 2000000
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_query import make_names
+from finder.store import ResultStore
+
+
+def make_rows(n, per_dir=40):
+    names = make_names(n, [".xlsx", ".docx", ".pdf", ".jpg"])
+    rows = []
+    for i, name in enumerate(names):
+        d = f"/srv/share/отдел_{i // 4000}/проект_{i // per_dir}/"
+        rows.append((name, d + name, 1000 + i, 1_700_000_000.0 + i))
+    return rows
+
+
+def traced(build):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, current - base
+
+
+def access_ns(seq, probes):
+    t0 = time.perf_counter()
+    for i in probes:
+        seq[i]
+    return (time.perf_counter() - t0) / len(probes) * 1e9
+
+
+def iterate_s(seq):
+    t0 = time.perf_counter()
+    for _ in seq:
+        pass
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=2_000_000)
+    ap.add_argument("--budget-mb", type=int, default=64, help="порог выгрузки на диск")
+    args = ap.parse_args()
+
+    rows = make_rows(args.rows)
+    n = len(rows)
+    probes = [random.randrange(n) for _ in range(100_000)]
+
+    # Строки пересоздаём, иначе в замер попадут только кортежи
+    copy, list_bytes = traced(
+        lambda: [
+            (a.encode().decode(), b.encode().decode(), c + 0, d + 0.0)
+            for a, b, c, d in rows
+        ]
+    )
+    print(
+        f"список кортежей: {list_bytes / n:6.1f} Б/строка, "
+        f"доступ {access_ns(copy, probes):5.0f} нс, обход {iterate_s(copy):.2f} с"
+    )
+    del copy
+
+    for label, budget in (("в памяти", None), ("с выгрузкой", args.budget_mb)):
+        kwargs = {"memory_bytes": budget * 1024 * 1024} if budget else {}
+        t0 = time.perf_counter()
+        store, resident = traced(lambda: ResultStore(rows, **kwargs))
+        build = time.perf_counter() - t0
+        print(
+            f"ResultStore {label}: {resident / n:6.1f} Б/строка в памяти, "
+            f"{store.nbytes / n:6.1f} Б/строка всего, заполнение {build:.2f} с, "
+            f"доступ {access_ns(store, probes):5.0f} нс, обход {iterate_s(store):.2f} с, "
+            f"на диске: {'да' if store.spilled else 'нет'}"
+        )
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
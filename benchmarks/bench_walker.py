@@ -0,0 +1,72 @@
+# Замер скорости обхода (файлов/сек) для 1..N потоков на синтетическом дереве.
+# Запуск из корня проекта: python -m benchmarks.bench_walker --workers 1 2 4 8
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import treegen
+from finder import walker
+from finder.walker import walk_files
+
+
+def bench(root, workers, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n = sum(len(files) for _, files in walk_files(root, False, None, workers))
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return n, best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--root", help="готовое дерево вместо синтетического")
+    ap.add_argument("--depth", type=int, default=4)
+    ap.add_argument("--fanout", type=int, default=6)
+    ap.add_argument("--files", type=int, default=20000)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="искусственная задержка listdir (эмуляция сетевой папки/HDD)",
+    )
+    args = ap.parse_args()
+
+    if args.latency_ms:
+        scan_dir = walker.scan_dir
+
+        def slow_scan_dir(path, *rest):
+            time.sleep(args.latency_ms / 1000)
+            return scan_dir(path, *rest)
+
+        walker.scan_dir = slow_scan_dir
+
+    tmp = None
+    root = args.root
+    if not root:
+        tmp = tempfile.mkdtemp(prefix="ffp_bench_")
+        root = tmp
+        tree = treegen.generate(root, args.depth, args.fanout, args.files)
+        print(f"Синтетическое дерево: {tree['files']} файлов, {tree['dirs']} папок")
+    try:
+        base = None
+        for w in args.workers:
+            n, dt = bench(root, w, args.repeat)
+            rate = n / dt if dt else 0
+            base = base or rate
+            print(f"workers={w:<3} files={n:<8} {dt:8.3f} s  {rate:12.0f} files/s  x{rate / base:.2f}")
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+# Набор замеров скорости поиска с сохранением в JSON и сравнением прогонов.
+# Запуск из корня проекта:
+#   python -m benchmarks.suite run --out base.json
+#   python -m benchmarks.suite compare base.json new.json --threshold 10
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import treegen
+from finder.categories import category_exts, load_categories
+from finder.engine import Search, entry_stat
+from finder.facets import FacetScan
+from finder.fuzzy import TopK, compile_fuzzy
+from finder.query import compile_query
+from finder.store import ResultStore
+from finder.walker import DEFAULT_WORKERS, walk_files
+
+MATCH_TARGET = 1_000_000
+
+
+def metric(value, unit, better):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def bench_walk(root, workers, repeat):
+    best = None
+    n = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n = sum(len(files) for _, files in walk_files(root, False, None, workers))
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return n / best
+
+
+def collect(root):
+    # Строки в том виде, в каком их выдаёт finder.engine
+    return [
+        (e.name, e.path, *entry_stat(e)) for _, files in walk_files(root) for e in files
+    ]
+
+
+def bench_cancel(root, workers, repeat):
+    # Задержка отмены: от stop() до выхода из поиска с остановкой потоков
+    # обхода — столько окно ждёт, прежде чем начать новый обход
+    times = []
+    for _ in range(repeat):
+        stopped = []
+        search = Search(
+            root, compile_query("", []), False, workers, stop=lambda: bool(stopped)
+        )
+        rows = iter(search)
+        next(rows, None)
+        t0 = time.perf_counter()
+        stopped.append(True)
+        for _ in rows:
+            pass
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def bench_facets(root, cats, workers):
+    # Во сколько раз сводка за один обход быстрее обхода на каждую категорию
+    t0 = time.perf_counter()
+    for key in cats:
+        for _ in Search(root, compile_query("", category_exts(cats, key)), False, workers):
+            pass
+    per_category = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    FacetScan(Search(root, compile_query(""), False, workers), cats).run()
+    return per_category / (time.perf_counter() - t0)
+
+
+def bench_match(names, query):
+    # Имена дерева повторяем до ~1М, чтобы цифра не зависела от размера дерева
+    reps = max(1, MATCH_TARGET // max(1, len(names)))
+    match = query.match
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        for n in names:
+            match(n)
+    return (time.perf_counter() - t0) / (reps * len(names)) * 1e9
+
+
+def bench_fuzzy(names, text, k=200):
+    # Нечёткая оценка + куча лучших K, на тех же ~1М имён
+    reps = max(1, MATCH_TARGET // max(1, len(names)))
+    score = compile_fuzzy(text)
+    top = TopK(k)
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        for n in names:
+            s = score(n)
+            if s is not None:
+                top.push(s, n)
+    return (time.perf_counter() - t0) / (reps * len(names)) * 1e9
+
+
+def bench_results_memory(rows):
+    # Сколько весил бы список кортежей (так окно хранило результаты раньше)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    # Строки и числа пересоздаём, иначе в замер попадут только кортежи
+    data = [
+        (n.encode().decode(), p.encode().decode(), size + 0, mtime + 0.0)
+        for n, p, size, mtime in rows
+    ]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return peak - base
+
+
+def bench_store_memory(rows):
+    # Сколько весит ResultStore, в котором окно держит raw_results_data
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    store = ResultStore(rows)
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store
+    return current - base
+
+
+def bench_store_get(rows):
+    # Случайный доступ, как у отрисовки видимых строк
+    store = ResultStore(rows)
+    n = len(store)
+    step = 7919  # простое: обходим все строки вразброс
+    reps = max(1, 200_000 // max(1, n))
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        i = 0
+        for _ in range(n):
+            store[i]
+            i = (i + step) % n
+    return (time.perf_counter() - t0) / (reps * n) * 1e9
+
+
+def bench_gui_delivery(rows):
+    # Вставка результатов пакетами в окно на offscreen-платформе Qt
+    try:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt6.QtWidgets import QApplication
+    except ImportError:
+        return None
+    import main
+
+    app = QApplication.instance() or QApplication([])
+    cwd = os.getcwd()
+    tmp = tempfile.mkdtemp(prefix="ffp_gui_")
+    os.chdir(tmp)  # settings.json и index.db окна — во временной папке
+    try:
+        window = main.ModernSearchApp()
+        window.show()
+        size = main.RESULT_BATCH_SIZE
+        t0 = time.perf_counter()
+        for i in range(0, len(rows), size):
+            window.add_results_batch(rows[i : i + size])
+            app.processEvents()
+        dt = time.perf_counter() - t0
+        window.close()
+        return dt / max(1, len(rows)) * 1e6
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run(args):
+    tmp = tempfile.mkdtemp(prefix="ffp_suite_")
+    try:
+        tree = treegen.generate(
+            tmp,
+            depth=args.depth,
+            fanout=args.fanout,
+            files=args.files,
+            seed=args.seed,
+        )
+        rows = collect(tmp)
+        names = [r[0] for r in rows]
+        cats = load_categories(os.path.join(treegen.ROOT, "extensions.json"))
+
+        metrics = {
+            "walk_serial_files_per_s": metric(
+                bench_walk(tmp, 1, args.repeat), "files/s", "higher"
+            ),
+            "walk_parallel_files_per_s": metric(
+                bench_walk(tmp, args.workers, args.repeat), "files/s", "higher"
+            ),
+            "cancel_latency_ms": metric(
+                bench_cancel(tmp, args.workers, args.repeat), "ms", "lower"
+            ),
+            "facets_speedup_x": metric(
+                bench_facets(tmp, cats, args.workers), "x", "higher"
+            ),
+            "match_term_ns_per_file": metric(
+                bench_match(names, compile_query("отч", [])), "ns", "lower"
+            ),
+            "match_category_ns_per_file": metric(
+                bench_match(names, compile_query("", category_exts(cats, "excel"))),
+                "ns",
+                "lower",
+            ),
+            "match_glob_ns_per_file": metric(
+                bench_match(names, compile_query("*a*.xls?", [])), "ns", "lower"
+            ),
+            "fuzzy_rank_ns_per_file": metric(
+                bench_fuzzy(names, "отчт"), "ns", "lower"
+            ),
+            "results_bytes_per_row": metric(
+                bench_results_memory(rows) / max(1, len(rows)), "bytes", "lower"
+            ),
+            "store_bytes_per_row": metric(
+                bench_store_memory(rows) / max(1, len(rows)), "bytes", "lower"
+            ),
+            "store_get_ns": metric(bench_store_get(rows), "ns", "lower"),
+        }
+        gui = bench_gui_delivery(rows)
+        if gui is not None:
+            metrics["gui_delivery_us_per_row"] = metric(gui, "us", "lower")
+
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "workers": args.workers,
+                "tree": tree,
+            },
+            "metrics": metrics,
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return 0
+
+
+def compare(args):
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)["metrics"]
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)["metrics"]
+
+    failed = False
+    for name, m in new.items():
+        if name not in base:
+            print(f"{name:<30} {m['value']:>14.1f} {m['unit']:<8} (новая метрика)")
+            continue
+        old = base[name]["value"]
+        cur = m["value"]
+        if not old:
+            continue
+        # Положительное изменение — всегда ухудшение
+        if m["better"] == "higher":
+            change = (old - cur) / old * 100
+        else:
+            change = (cur - old) / old * 100
+        bad = change > args.threshold
+        failed |= bad
+        mark = "РЕГРЕССИЯ" if bad else "ok"
+        print(
+            f"{name:<30} {old:>14.1f} -> {cur:>14.1f} {m['unit']:<8} "
+            f"{-change:+7.1f}%  {mark}"
+        )
+    return 1 if failed else 0
+
+
+def main():
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="прогнать замеры")
+    r.add_argument("--out", help="куда сохранить JSON")
+    r.add_argument("--depth", type=int, default=4)
+    r.add_argument("--fanout", type=int, default=5)
+    r.add_argument("--files", type=int, default=20000)
+    r.add_argument("--seed", type=int, default=1)
+    r.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    r.add_argument("--repeat", type=int, default=3)
+    r.set_defaults(func=run)
+
+    c = sub.add_parser("compare", help="сравнить два прогона")
+    c.add_argument("base")
+    c.add_argument("new")
+    c.add_argument(
+        "--threshold", type=float, default=10.0, help="допустимое ухудшение, %%"
+    )
+    c.set_defaults(func=compare)
+
+    args = ap.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
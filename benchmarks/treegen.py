@@ -0,0 +1,70 @@
+# Детерминированный генератор синтетического дерева файлов для замеров.
+import json
+import os
+import random
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LATIN = "abcdefghijklmnopqrstuvwxyz0123456789_-"
+CYRILLIC = "абвгдеёжзийклмнопрстуфхцчшщыэюя"
+NOISE_EXTS = [".tmp", ".dll", ".exe", ".dat", ".bin", ".cache", ".lnk", ""]
+
+
+def load_exts():
+    with open(os.path.join(ROOT, "extensions.json"), encoding="utf-8") as f:
+        exts = sorted({e for lst in json.load(f).values() for e in lst})
+    return exts + NOISE_EXTS * 4
+
+
+def random_name(rnd, mean_len, sd_len, cyrillic_ratio):
+    n = max(3, min(80, int(rnd.gauss(mean_len, sd_len))))
+    alphabet = CYRILLIC if rnd.random() < cyrillic_ratio else LATIN
+    name = "".join(rnd.choice(alphabet) for _ in range(n))
+    return name.capitalize() if rnd.random() < 0.3 else name
+
+
+def generate(
+    root,
+    depth=4,
+    fanout=5,
+    files=10000,
+    mean_len=14,
+    sd_len=6,
+    cyrillic_ratio=0.3,
+    hidden_ratio=0.1,
+    seed=1,
+):
+    # Возвращает сводку: сколько папок/файлов и сколько из них в скрытых/$
+    rnd = random.Random(seed)
+    exts = load_exts()
+    dirs = [(root, False)]
+    level = [(root, False)]
+    for _ in range(depth):
+        nxt = []
+        for path, hidden in level:
+            for i in range(fanout):
+                r = rnd.random()
+                if r < hidden_ratio / 2:
+                    name, h = f".{random_name(rnd, 8, 3, 0)}", True
+                elif r < hidden_ratio:
+                    name, h = f"{random_name(rnd, 8, 3, 0)}$", True
+                else:
+                    name, h = random_name(rnd, 10, 4, cyrillic_ratio), hidden
+                sub = os.path.join(path, f"{name}_{i}")
+                os.mkdir(sub)
+                nxt.append((sub, h))
+        dirs.extend(nxt)
+        level = nxt
+
+    hidden_files = 0
+    for i in range(files):
+        path, hidden = rnd.choice(dirs)
+        name = f"{random_name(rnd, mean_len, sd_len, cyrillic_ratio)}_{i}{rnd.choice(exts)}"
+        open(os.path.join(path, name), "w").close()
+        hidden_files += hidden
+    return {
+        "dirs": len(dirs),
+        "files": files,
+        "visible_files": files - hidden_files,
+        "seed": seed,
+    }
@@ -0,0 +1 @@
+# Корень репозитория в sys.path: тесты импортируют пакет finder без установки
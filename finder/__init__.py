@@ -0,0 +1 @@
+# Логика поиска без зависимостей от PyQt6 (обход диска, индекс и т.п.)
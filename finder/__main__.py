@@ -0,0 +1,7 @@
+import sys
+
+from .cli import main
+
+# Защита нужна для пула процессов (spawn на Windows заново импортирует модуль)
+if __name__ == "__main__":
+    sys.exit(main())
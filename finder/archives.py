@@ -0,0 +1,246 @@
+import os
+import sqlite3
+import tarfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .index import INDEX_DB
+from .walker import DEFAULT_WORKERS
+
+
+MEMBER_SEP = "!/"  # путь файла внутри архива: D:/backup.zip!/docs/отчет.docx
+ZIP_EXTS = (".zip",)
+# Только несжатый tar: заголовки читаются переходами по файлу. У .tar.gz и
+# подобных заголовки лежат внутри сжатого потока — без распаковки их не прочитать
+TAR_EXTS = (".tar",)
+ARCHIVE_EXTS = ZIP_EXTS + TAR_EXTS
+MAX_PENDING = 64  # архивов в работе одновременно
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archives (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS archive_members (
+    archive TEXT NOT NULL,
+    inner TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL
+);
+CREATE INDEX IF NOT EXISTS archive_members_archive ON archive_members(archive);
+"""
+
+
+def is_archive(name):
+    return name.casefold().endswith(ARCHIVE_EXTS)
+
+
+def split_member(path):
+    # "a.zip!/x/y.docx" -> ("a.zip", "x/y.docx"); обычный путь -> (путь, None)
+    i = path.find(MEMBER_SEP)
+    if i < 0:
+        return path, None
+    return path[:i], path[i + len(MEMBER_SEP) :]
+
+
+def list_zip(path):
+    # ZipFile читает только центральный каталог в конце файла
+    out = []
+    with zipfile.ZipFile(path) as z:
+        for info in z.infolist():
+            if info.is_dir():
+                continue
+            try:
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+            except (OverflowError, ValueError):
+                mtime = 0.0
+            out.append((info.filename, info.file_size, mtime))
+    return out
+
+
+def list_tar(path):
+    # В режиме "r:" tarfile перескакивает через данные по seek
+    out = []
+    with tarfile.open(path, "r:") as t:
+        for m in t:
+            if m.isfile():
+                out.append((m.name, m.size, float(m.mtime)))
+    return out
+
+
+def list_members(path):
+    # [(путь внутри, размер, mtime)]; битый или чужой архив — пусто
+    try:
+        if path.casefold().endswith(ZIP_EXTS):
+            return list_zip(path)
+        return list_tar(path)
+    except (OSError, zipfile.BadZipFile, tarfile.TarError, EOFError, ValueError):
+        return []
+
+
+def member_rows(archive, members):
+    for inner, size, mtime in members:
+        name = inner.rstrip("/").rsplit("/", 1)[-1]
+        yield name, archive + MEMBER_SEP + inner, size, mtime
+
+
+# --- КЭШ ОГЛАВЛЕНИЙ АРХИВОВ ---
+# Хранится в index.db; ключ — путь, размер и mtime архива, так что
+# повторный поиск по папке с архивами стоит одного stat на архив
+class ArchiveCache:
+    def __init__(self, db_path=INDEX_DB):
+        self.db_path = db_path
+        self.con = None
+
+    def _conn(self):
+        # Соединение открывается в потоке поиска, который им и пользуется
+        if self.con is None:
+            self.con = sqlite3.connect(self.db_path, timeout=30)
+            self.con.execute("PRAGMA journal_mode=WAL")
+            self.con.executescript(SCHEMA)
+        return self.con
+
+    def get(self, path, size, mtime):
+        try:
+            con = self._conn()
+            row = con.execute(
+                "SELECT size, mtime FROM archives WHERE path = ?", (path,)
+            ).fetchone()
+            if row is None or row[0] != size or row[1] != mtime:
+                return None
+            return con.execute(
+                "SELECT inner, size, mtime FROM archive_members WHERE archive = ?",
+                (path,),
+            ).fetchall()
+        except sqlite3.Error:
+            return None
+
+    def put(self, path, size, mtime, members):
+        try:
+            con = self._conn()
+            con.execute("DELETE FROM archive_members WHERE archive = ?", (path,))
+            con.execute(
+                "INSERT OR REPLACE INTO archives(path, size, mtime) VALUES (?, ?, ?)",
+                (path, size, mtime),
+            )
+            con.executemany(
+                "INSERT INTO archive_members(archive, inner, size, mtime)"
+                " VALUES (?, ?, ?, ?)",
+                [(path, *m) for m in members],
+            )
+        except sqlite3.Error:
+            pass
+
+    def prune(self, root, seen):
+        # Оглавления архивов под root, которых обход не встретил и которых
+        # больше нет на диске (удалены или перенесены) — иначе база растёт
+        # без конца. Не встреченный, но существующий архив (в отсечённой
+        # папке) остаётся: его ещё может найти другой поиск
+        prefix = root if root.endswith(os.sep) else root + os.sep
+        try:
+            con = self._conn()
+            rows = con.execute(
+                "SELECT path FROM archives WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix),
+            ).fetchall()
+            gone = [(p,) for (p,) in rows if p not in seen and not os.path.lexists(p)]
+            con.executemany("DELETE FROM archive_members WHERE archive = ?", gone)
+            con.executemany("DELETE FROM archives WHERE path = ?", gone)
+            return len(gone)
+        except sqlite3.Error:
+            return 0
+
+    def close(self):
+        if self.con is not None:
+            try:
+                self.con.commit()
+            except sqlite3.Error:
+                pass
+            self.con.close()
+            self.con = None
+
+
+# --- ЧТЕНИЕ ОГЛАВЛЕНИЙ В ПУЛЕ ПОТОКОВ ---
+# Обход отдаёт найденные архивы в submit(), готовые оглавления забираются
+# через ready() между папками и через drain() в конце; выдаются строки
+# (имя, "архив!/путь", размер, mtime) для всех файлов внутри
+class ArchiveLister:
+    def __init__(self, cache=None, workers=DEFAULT_WORKERS):
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.pool = None
+        self.pending = {}  # future -> (путь, размер, mtime)
+        self.hits = []  # оглавления из кэша, ещё не отданные
+        self.archives = 0
+        self.cached = 0
+        self.members = 0
+        self.seen = set()  # архивы этого поиска — для prune()
+        self.removed = 0
+
+    def submit(self, path, size, mtime):
+        # size и mtime — со свежего stat архива: они же ключ кэша
+        self.archives += 1
+        self.seen.add(path)
+        members = self.cache.get(path, size, mtime) if self.cache else None
+        if members is not None:
+            self.cached += 1
+            self.hits.append((path, members))
+            return
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        fut = self.pool.submit(list_members, path)
+        self.pending[fut] = (path, size, mtime)
+
+    def busy(self):
+        # Не набираем архивов больше, чем успеваем прочитать
+        return len(self.pending) >= MAX_PENDING
+
+    def ready(self, block=False, timeout=None):
+        hits, self.hits = self.hits, []
+        for path, members in hits:
+            yield from self._rows(path, members)
+        if not self.pending:
+            return
+        if block:
+            done, _ = wait(self.pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        else:
+            done = [f for f in self.pending if f.done()]
+        for fut in done:
+            path, size, mtime = self.pending.pop(fut)
+            members = fut.result()
+            if self.cache:
+                self.cache.put(path, size, mtime, members)
+            yield from self._rows(path, members)
+
+    def drain(self, stop=None):
+        while self.hits or self.pending:
+            if stop and stop():
+                return
+            yield from self.ready(block=True, timeout=0.1)
+
+    def prune(self, root):
+        # Зовётся после полного обхода root
+        if self.cache:
+            self.removed += self.cache.prune(root, self.seen)
+
+    def _rows(self, path, members):
+        self.members += len(members)
+        return member_rows(path, members)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        if self.cache:
+            self.cache.close()
+
+    def summary(self):
+        text = (
+            f"Архивов: {self.archives} (из кэша {self.cached}) · "
+            f"файлов внутри: {self.members}"
+        )
+        if self.removed:
+            text += f" · удалено исчезнувших: {self.removed}"
+        return text
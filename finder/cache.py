@@ -0,0 +1,89 @@
+import json
+import sys
+import time
+from collections import OrderedDict
+
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+DEFAULT_TTL = 300  # секунд; старше — считаем, что диск мог измениться
+
+# Кортеж + запись в списке + заголовки двух строк + размер и mtime
+ROW_OVERHEAD = (
+    sys.getsizeof(("", "", 0, 0.0))
+    + 8
+    + 2 * sys.getsizeof("")
+    + sys.getsizeof(2**40)
+    + sys.getsizeof(0.0)
+)
+
+
+def rows_size(rows):
+    # finder.store.ResultStore знает свой объём сам
+    nbytes = getattr(rows, "nbytes", None)
+    if nbytes is not None:
+        return nbytes
+    return sum(ROW_OVERHEAD + len(r[0]) + len(r[1]) for r in rows)
+
+
+def rules_scope(category, prune):
+    # scope для кэша: категория и раздел prune, из которых строятся правила
+    # отсечения (finder.prune.build_rules)
+    return json.dumps([category, prune or {}], sort_keys=True, ensure_ascii=False)
+
+
+def cache_key(root, deep, query, scope=None):
+    # scope — всё прочее, от чего зависит набор строк (правила отсечения);
+    # наборы с разным scope друг друга не подменяют
+    return (root, bool(deep), query.text, frozenset(query.exts), scope)
+
+
+# --- LRU-КЭШ НАБОРОВ РЕЗУЛЬТАТОВ ---
+class ResultCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()  # ключ -> (запрос, строки, время, размер)
+        self.size = 0
+
+    def put(self, root, deep, query, rows, scope=None):
+        key = cache_key(root, deep, query, scope)
+        size = rows_size(rows)
+        self._drop(key)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (query, rows, time.monotonic(), size)
+        self.size += size
+        while self.size > self.max_bytes:
+            self._drop(next(iter(self.entries)))
+
+    def get(self, root, deep, query, scope=None):
+        # Точное совпадение: (строки, True); сужение: (строки шире, False)
+        self.expire()
+        key = cache_key(root, deep, query, scope)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key][1], True
+        best = None
+        for k, (q, rows, _, _) in self.entries.items():
+            same = k[0] == root and k[1] == bool(deep) and k[4] == scope
+            if same and query.narrows(q):
+                if best is None or len(rows) < len(self.entries[best][1]):
+                    best = k
+        if best is None:
+            return None, False
+        self.entries.move_to_end(best)
+        return self.entries[best][1], False
+
+    def expire(self):
+        now = time.monotonic()
+        for k in [k for k, e in self.entries.items() if now - e[2] > self.ttl]:
+            self._drop(k)
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def _drop(self, key):
+        e = self.entries.pop(key, None)
+        if e:
+            self.size -= e[3]
@@ -0,0 +1,36 @@
+import json
+import os
+
+
+ALL_FILES = "ALL_FILES"
+# Категории, где ищем и в скрытых/системных ($) папках
+DEEP_CATEGORIES = {"эцп"}
+# Кнопки интерфейса называются по-русски, а в extensions.json ключи другие
+CATEGORY_ALIASES = {"фото": "picture", "видео": "video"}
+
+EXTENSIONS_JSON = "extensions.json"
+
+
+def load_categories(path=EXTENSIONS_JSON):
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+
+def category_name(key):
+    # Ключ кнопки -> ключ extensions.json
+    return CATEGORY_ALIASES.get(key, key)
+
+
+def category_exts(categories, key):
+    if key == ALL_FILES:
+        return []
+    return categories.get(category_name(key), [])
+
+
+def is_deep(key):
+    return key in DEEP_CATEGORIES
@@ -0,0 +1,507 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+# Режимы (--content, --daemon, --dupes, --facets, --du, несколько корней)
+# грузятся в своих ветках: обычный поиск их не импортирует
+from .categories import ALL_FILES, category_exts, is_deep, load_categories
+from .engine import Search
+from .filters import StatFilter, parse_size, parse_time
+from .fuzzy import TOP_K, FuzzySearch, fill_stat
+from .index import INDEX_DB, FileIndex
+from .prune import build_rules, load_prune_config
+from .query import compile_query
+from .throttle import DEFAULT_DIRS_PER_S, DEFAULT_FILES_PER_S, Throttle
+from .walker import DEFAULT_WORKERS
+
+FLUSH_INTERVAL = 0.1
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(
+        prog="python -m finder",
+        description="Поиск файлов FileFinderPro без графического интерфейса.",
+    )
+    ap.add_argument("term", nargs="?", default="", help="запрос (как в строке поиска)")
+    ap.add_argument(
+        "-r",
+        "--root",
+        action="append",
+        default=[],
+        help="папка поиска; можно несколько — обходятся параллельно по дискам",
+    )
+    ap.add_argument(
+        "-c", "--category", default=ALL_FILES, help="ключ категории из extensions.json"
+    )
+    ap.add_argument(
+        "-e", "--ext", action="append", default=[], help="расширение (.pdf), можно несколько"
+    )
+    ap.add_argument(
+        "--deep", action="store_true", help="заходить в скрытые и системные ($) папки"
+    )
+    ap.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS)
+    ap.add_argument(
+        "-0", "--null", action="store_true", help="пути через NUL (для xargs -0)"
+    )
+    ap.add_argument(
+        "--extensions", default="extensions.json", help="путь к extensions.json"
+    )
+    ap.add_argument(
+        "--index",
+        default=INDEX_DB,
+        help="база индекса; используется, только если файл уже существует",
+    )
+    ap.add_argument("--no-index", action="store_true")
+    ap.add_argument(
+        "--settings",
+        default="settings.json",
+        help="settings.json окна: из него берутся правила отсечения папок (prune)",
+    )
+    ap.add_argument(
+        "--content",
+        metavar="TEXT",
+        help="искать текст внутри найденных файлов (литерал или re:выражение)",
+    )
+    ap.add_argument("--min-size", help="не меньше, напр. 10M")
+    ap.add_argument("--max-size", help="не больше, напр. 1.5G")
+    ap.add_argument(
+        "--newer", help="изменён не раньше: 2026-01-31, 31.01.2026 или 7d (неделя назад)"
+    )
+    ap.add_argument("--older", help="изменён не позже (формат как у --newer)")
+    ap.add_argument(
+        "--fuzzy",
+        nargs="?",
+        type=int,
+        const=TOP_K,
+        metavar="K",
+        help=f"нечёткий поиск: лучшие K совпадений по убыванию оценки (по умолчанию {TOP_K})",
+    )
+    ap.add_argument(
+        "--dupes",
+        action="store_true",
+        help="искать дубликаты среди подходящих файлов (группы в NDJSON)",
+    )
+    ap.add_argument(
+        "--facets",
+        action="store_true",
+        help="сводка по всем категориям extensions.json за один обход (файлов и байт)",
+    )
+    ap.add_argument(
+        "--du",
+        action="store_true",
+        help="занятое место по папкам (как du): папки по убыванию размера в NDJSON",
+    )
+    ap.add_argument(
+        "--du-min",
+        metavar="SIZE",
+        help="для --du: мельче этого папки только в сумме родителя (по умолчанию 1M)",
+    )
+    ap.add_argument(
+        "--archives",
+        action="store_true",
+        help="искать и внутри .zip/.tar (по оглавлению, без распаковки)",
+    )
+    ap.add_argument(
+        "--background",
+        action="store_true",
+        help="фоновый режим: низкий приоритет (nice/ioprio) и лимиты скорости обхода",
+    )
+    ap.add_argument(
+        "--files-per-s",
+        type=int,
+        metavar="N",
+        help=f"файлов в секунду в фоновом режиме (по умолчанию {DEFAULT_FILES_PER_S})",
+    )
+    ap.add_argument(
+        "--dirs-per-s",
+        type=int,
+        metavar="N",
+        help=f"папок в секунду в фоновом режиме (по умолчанию {DEFAULT_DIRS_PER_S})",
+    )
+    ap.add_argument(
+        "--daemon",
+        nargs="?",
+        const="",
+        metavar="SOCKET",
+        help="искать через демон (python -m finder.daemon); без пути — сокет по умолчанию",
+    )
+    ap.add_argument(
+        "--stats", metavar="PATH", help="сохранить метрики сканирования в JSON"
+    )
+    return ap
+
+
+def write_ndjson(out, rec):
+    try:
+        line = json.dumps(rec, ensure_ascii=False).encode("utf-8")
+    except UnicodeEncodeError:
+        # Имя не в UTF-8 (суррогаты от файловой системы) — экранируем
+        line = json.dumps(rec).encode("ascii")
+    out.write(line + b"\n")
+
+
+def write_null(out, rec):
+    out.write(os.fsencode(rec["path"]) + b"\0")
+
+
+def row_record(row):
+    # Строка поиска по нескольким корням несёт корень пятым полем
+    name, path, size, mtime = row[:4]
+    rec = {"name": name, "path": path, "size": size, "mtime": mtime}
+    if len(row) > 4:
+        rec["root"] = row[4]
+    return rec
+
+
+def tagged_rows(search):
+    for root, row in search:
+        yield row + (root,)
+
+
+def records(search, content):
+    if not content:
+        for row in search:
+            yield row_record(row)
+        return
+    for row, line, snippet in content:
+        rec = row_record(row)
+        rec["line"] = line
+        rec["snippet"] = snippet
+        yield rec
+
+
+def run_dupes(args, root, query, deep, stat_filter, rules, out):
+    from .dupes import DuplicateFinder
+
+    finder = DuplicateFinder(
+        root, query, deep, args.workers, stat_filter=stat_filter, rules=rules
+    )
+    if not os.path.isdir(root):
+        print(f"Путь не найден: {root}", file=sys.stderr)
+        return 2
+    try:
+        groups = finder.run()
+        for g in groups:
+            if args.null:
+                for p in g.paths:
+                    write_null(out, {"path": p})
+            else:
+                write_ndjson(out, g.to_dict())
+        out.flush()
+    except BrokenPipeError:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    except KeyboardInterrupt:
+        return 130
+    # Время по этапам — в stderr, чтобы не мешать разбору вывода
+    print(finder.summary(groups), file=sys.stderr)
+    return 0 if groups else 1
+
+
+def run_fuzzy(args, root, query, deep, index, stat_filter, rules, throttle, out):
+    # Обходим всё, что подходит по категории; имя оценивает FuzzySearch
+    search = Search(
+        root,
+        compile_query("", query.exts),
+        deep,
+        args.workers,
+        index,
+        stat_filter=stat_filter,
+        rules=rules,
+        with_stat=False,
+        archives=args.archives,
+        throttle=throttle,
+    )
+    fuzzy = FuzzySearch(search, query.text, args.fuzzy)
+    try:
+        fuzzy.run()
+        for score, row in fuzzy.top.ranked():
+            if args.null:
+                write_null(out, {"path": row[1]})
+                continue
+            rec = row_record(fill_stat(row))
+            rec["score"] = score
+            write_ndjson(out, rec)
+        out.flush()
+    except FileNotFoundError:
+        print(f"Путь не найден: {root}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    except KeyboardInterrupt:
+        return 130
+    return 0 if fuzzy.found else 1
+
+
+def run_facets(args, root, query, deep, index, stat_filter, rules, throttle, out):
+    # Категории не сужают обход: каждое имя раскладывается по всем сразу
+    from .facets import FacetScan
+
+    search = Search(
+        root,
+        compile_query(query.text),
+        deep,
+        args.workers,
+        index,
+        stat_filter=stat_filter,
+        rules=rules,
+        archives=args.archives,
+        throttle=throttle,
+    )
+    # Строки не нужны — только числа по категориям
+    facets = FacetScan(search, load_categories(args.extensions), keep_rows=False)
+    try:
+        counts = facets.run()
+        for key, (n, size) in sorted(counts.items(), key=lambda kv: -kv[1][0]):
+            write_ndjson(out, {"category": key, "files": n, "bytes": size})
+        out.flush()
+    except FileNotFoundError:
+        print(f"Путь не найден: {root}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        facets.close()
+    print(facets.summary(), file=sys.stderr)
+    return 0 if facets.found else 1
+
+
+def run_du(args, root, deep, rules, throttle, out):
+    from .usage import DEFAULT_MIN_BYTES, DiskUsage
+
+    try:
+        min_bytes = parse_size(args.du_min or "")
+    except ValueError as e:
+        print(f"Неверный размер: {e}", file=sys.stderr)
+        return 2
+    usage = DiskUsage(
+        root,
+        deep,
+        args.workers,
+        rules=rules,
+        throttle=throttle,
+        min_bytes=DEFAULT_MIN_BYTES if min_bytes is None else min_bytes,
+    )
+    try:
+        usage.run()
+        for depth, node in usage.walk():
+            if args.null:
+                write_null(out, {"path": node.path})
+                continue
+            rec = {"path": node.path, "bytes": node.bytes, "files": node.files}
+            rec["depth"] = depth
+            if node.folded:
+                rec["folded"] = node.folded
+            write_ndjson(out, rec)
+        out.flush()
+    except FileNotFoundError:
+        print(f"Путь не найден: {root}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    except KeyboardInterrupt:
+        return 130
+    print(usage.summary(), file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    exts = args.ext or category_exts(load_categories(args.extensions), args.category)
+    if args.category != ALL_FILES and not exts:
+        print(f"Неизвестная категория: {args.category}", file=sys.stderr)
+        return 2
+    try:
+        query = compile_query(args.term, exts)
+    except re.error as e:
+        print(f"Неверное регулярное выражение: {e}", file=sys.stderr)
+        return 2
+    if args.content:
+        # multiprocessing грузим только для поиска по содержимому
+        from .content import ContentSearch, compile_pattern
+
+        # re:-выражение проверяем до обхода, а не в процессах пула
+        try:
+            compile_pattern(args.content)
+        except re.error as e:
+            print(f"Неверное регулярное выражение: {e}", file=sys.stderr)
+            return 2
+
+    try:
+        stat_filter = StatFilter(
+            parse_size(args.min_size or ""),
+            parse_size(args.max_size or ""),
+            parse_time(args.newer or ""),
+            parse_time(args.older or "", end=True),
+        )
+    except ValueError as e:
+        print(f"Неверный размер или дата: {e}", file=sys.stderr)
+        return 2
+
+    index = None
+    if not args.no_index and os.path.exists(args.index):
+        index = FileIndex(args.index)
+
+    deep = args.deep or is_deep(args.category)
+    prune = load_prune_config(args.settings)
+    try:
+        rules = build_rules(prune, args.category, deep)
+    except re.error as e:
+        print(f"Неверное правило отсечения: {e}", file=sys.stderr)
+        return 2
+    throttle = None
+    if args.background or args.files_per_s is not None or args.dirs_per_s is not None:
+        # 0 — без ограничения по этой оси, а не значение по умолчанию
+        throttle = Throttle(
+            DEFAULT_FILES_PER_S if args.files_per_s is None else args.files_per_s,
+            DEFAULT_DIRS_PER_S if args.dirs_per_s is None else args.dirs_per_s,
+        )
+    write = write_null if args.null else write_ndjson
+    out = sys.stdout.buffer
+    roots = args.root or ["."]
+    if args.dupes:
+        if len(roots) > 1:
+            print("--dupes ищет в одной папке", file=sys.stderr)
+            return 2
+        return run_dupes(args, roots[0], query, deep, stat_filter, rules, out)
+    multi = len(roots) > 1
+    if args.fuzzy and (multi or args.content):
+        print("--fuzzy ищет в одной папке и только по именам", file=sys.stderr)
+        return 2
+    if args.du:
+        if multi:
+            print("--du считает одну папку", file=sys.stderr)
+            return 2
+        return run_du(args, roots[0], deep, rules, throttle, out)
+    if args.facets:
+        if multi or args.content or args.fuzzy:
+            print("--facets считает в одной папке и только по именам", file=sys.stderr)
+            return 2
+        return run_facets(
+            args, roots[0], query, deep, index, stat_filter, rules, throttle, out
+        )
+    if args.fuzzy:
+        return run_fuzzy(
+            args, roots[0], query, deep, index, stat_filter, rules, throttle, out
+        )
+    metrics = None
+    if args.stats:
+        from .metrics import ScanMetrics
+
+        metrics = ScanMetrics("" if multi else roots[0])
+    daemon_errors = ()  # DaemonError, если ищем через демон
+    if multi:
+        from .multiroot import MultiSearch
+
+        search = MultiSearch(
+            roots,
+            query,
+            deep,
+            args.workers,
+            index,
+            metrics=metrics,
+            stat_filter=stat_filter,
+            rules=rules,
+            archives=args.archives,
+            throttle=throttle,
+        )
+        if not search.roots:
+            print("Ни одна из папок не найдена", file=sys.stderr)
+            return 2
+        rows = tagged_rows(search)
+    elif args.daemon is not None:
+        # Обход, индекс и кэш — у демона; здесь только вывод (и --content)
+        from .daemon import DaemonError, DaemonSearch
+
+        daemon_errors = DaemonError
+        search = DaemonSearch(
+            roots[0],
+            query,
+            deep,
+            stat_filter=stat_filter,
+            archives=args.archives,
+            category=None if args.category == ALL_FILES else args.category,
+            path=args.daemon or None,
+            # Правила отсечения и --no-index действуют и у демона
+            no_index=args.no_index,
+            prune=prune,
+        )
+        rows = search
+    else:
+        search = Search(
+            roots[0],
+            query,
+            deep,
+            args.workers,
+            index,
+            metrics=metrics,
+            stat_filter=stat_filter,
+            rules=rules,
+            archives=args.archives,
+            throttle=throttle,
+        )
+        rows = search
+    content = ContentSearch(rows, args.content) if args.content else None
+    last_flush = time.monotonic()
+    last_path = None
+    try:
+        for rec in records(rows, content):
+            # В режиме -0 файл с несколькими совпадениями выводим один раз
+            if args.null and rec["path"] == last_path:
+                continue
+            last_path = rec["path"]
+            write(out, rec)
+            # Сбрасываем вывод по времени, чтобы конвейер видел пути сразу
+            now = time.monotonic()
+            if now - last_flush >= FLUSH_INTERVAL:
+                out.flush()
+                last_flush = now
+        out.flush()
+    except FileNotFoundError:
+        print(f"Путь не найден: {roots[0]}", file=sys.stderr)
+        return 2
+    except daemon_errors as e:
+        print(f"Демон: {e}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        # head и т.п. закрыли канал — это не ошибка; глушим вывод,
+        # чтобы Python не упал при финальном flush (см. документацию signal)
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if metrics:
+            extra = {"pruned": rules.report()}
+            if throttle:
+                extra["background"] = throttle.to_dict()
+            if hasattr(search, "reply"):
+                extra["daemon"] = search.reply
+            metrics.export(args.stats, extra)
+            print(metrics.summary(), file=sys.stderr)
+            if rules.counts:
+                print(f"Отсечено: {rules.summary()}", file=sys.stderr)
+            if not multi and search.lister:
+                print(search.lister.summary(), file=sys.stderr)
+            if throttle:
+                print(throttle.summary(), file=sys.stderr)
+            if hasattr(search, "reply"):
+                print(search.summary(), file=sys.stderr)
+    if multi:
+        for root, err in search.errors.items():
+            print(f"{root}: {err}", file=sys.stderr)
+    return 0 if (content or search).found else 1
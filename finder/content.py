@@ -0,0 +1,172 @@
+import mmap
+import multiprocessing
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+
+MAX_FILE_BYTES = 64 * 1024 * 1024  # больше — почти наверняка не текст
+SNIFF_BYTES = 8192
+MAX_MATCHES_PER_FILE = 20
+SNIPPET_CHARS = 160
+FILES_PER_TASK = 32  # файлов на задачу процесса: меньше накладных на IPC
+# Текстовые файлы у нас в UTF-8 или в cp1251 (старые логи и выгрузки 1С)
+ENCODINGS = ("utf-8", "cp1251")
+REGEX_PREFIX = "re:"
+
+
+def _char_class(c, encodings):
+    # Регистронезависимость для кириллицы в байтах: (?:а|А) в каждой кодировке
+    variants = set()
+    for ch in {c.lower(), c.upper()}:
+        for enc in encodings:
+            try:
+                variants.add(ch.encode(enc))
+            except UnicodeEncodeError:
+                pass
+    if not variants:
+        return None
+    alts = b"|".join(re.escape(v) for v in sorted(variants))
+    return b"(?:" + alts + b")"
+
+
+def compile_pattern(text, encodings=ENCODINGS):
+    # Возвращает [(кодировка, bytes-регулярка)]; литерал ищется без учёта регистра
+    patterns = []
+    if text.startswith(REGEX_PREFIX):
+        # Для байтовых регулярок IGNORECASE работает только для ASCII
+        src = text[len(REGEX_PREFIX) :]
+        for enc in encodings:
+            try:
+                patterns.append((enc, re.compile(src.encode(enc), re.IGNORECASE)))
+            except UnicodeEncodeError:
+                pass
+        return patterns
+    if text.isascii():
+        # ASCII одинаков во всех наших кодировках, IGNORECASE его покрывает
+        return [(encodings[0], re.compile(re.escape(text.encode()), re.IGNORECASE))]
+    for enc in encodings:
+        parts = []
+        for c in text:
+            cls = _char_class(c, (enc,))
+            if cls is None:
+                break
+            parts.append(cls)
+        else:
+            rx = re.compile(b"".join(parts))
+            if all(rx.pattern != p.pattern for _, p in patterns):
+                patterns.append((enc, rx))
+    return patterns
+
+
+def is_binary(head):
+    return b"\0" in head
+
+
+def scan_file(path, patterns, max_matches=MAX_MATCHES_PER_FILE):
+    # [(номер строки, фрагмент)] для одного файла; ошибки и бинарники — пусто
+    try:
+        size = os.path.getsize(path)
+        if size == 0 or size > MAX_FILE_BYTES:
+            return []
+        with open(path, "rb") as f:
+            if is_binary(f.read(SNIFF_BYTES)):
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _scan(mm, patterns, max_matches)
+    except (OSError, ValueError):
+        return []
+
+
+def _scan(mm, patterns, max_matches):
+    hits = {}
+    for enc, rx in patterns:
+        line, last = 1, 0
+        for m in rx.finditer(mm):
+            start = m.start()
+            line += mm[last:start].count(b"\n")
+            last = start
+            if line in hits:
+                continue
+            bol = mm.rfind(b"\n", 0, start) + 1
+            eol = mm.find(b"\n", start)
+            if eol < 0:
+                eol = len(mm)
+            text = mm[bol:eol].decode(enc, "replace").strip()
+            hits[line] = text[:SNIPPET_CHARS]
+            if len(hits) >= max_matches:
+                break
+    return sorted(hits.items())
+
+
+def scan_files(paths, patterns):
+    # Задача для процесса: пачка файлов целиком
+    return [(p, scan_file(p, patterns)) for p in paths]
+
+
+# --- ПОИСК ПО СОДЕРЖИМОМУ ---
+# Кандидаты (строки с именем и путём) приходят из поиска по имени/расширению,
+# файлы читаются через mmap в пуле процессов; выдаёт (строка-кандидат,
+# номер строки, фрагмент)
+class ContentSearch:
+    def __init__(self, candidates, text, workers=None, stop=None):
+        self.candidates = candidates
+        self.patterns = compile_pattern(text)
+        self.workers = workers or os.cpu_count() or 1
+        self.stop = stop
+        self.files = 0
+        self.found = 0
+
+    def stopped(self):
+        return bool(self.stop and self.stop())
+
+    def __iter__(self):
+        if not self.patterns:
+            return
+        found = {}
+        chunk = []
+        pending = set()
+        # spawn, а не fork: нас зовут из потока Qt или демона, и fork
+        # многопоточного процесса может унести в дочерний занятые замки
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            for row in self.candidates:
+                if self.stopped():
+                    return
+                path = row[1]
+                found[path] = row
+                chunk.append(path)
+                if len(chunk) >= FILES_PER_TASK:
+                    pending.add(pool.submit(scan_files, chunk, self.patterns))
+                    chunk = []
+                    # Готовое отдаём сразу, не дожидаясь конца обхода
+                    done = {f for f in pending if f.done()}
+                    if done:
+                        pending -= done
+                        yield from self._collect(done, found)
+                # Не набираем задач больше, чем успеваем обработать
+                while len(pending) >= self.workers * 4:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from self._collect(done, found)
+                    if self.stopped():
+                        return
+            if chunk:
+                pending.add(pool.submit(scan_files, chunk, self.patterns))
+            while pending:
+                if self.stopped():
+                    return
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                yield from self._collect(done, found)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _collect(self, done, rows):
+        for fut in done:
+            for path, hits in fut.result():
+                self.files += 1
+                row = rows.pop(path)
+                for line, snippet in hits:
+                    self.found += 1
+                    yield row, line, snippet
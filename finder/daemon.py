@@ -0,0 +1,759 @@
+import argparse
+import getpass
+import json
+import os
+import re
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+from .cache import DEFAULT_MAX_BYTES, ResultCache, rules_scope
+from .engine import Search
+from .filters import StatFilter
+from .index import INDEX_DB, FileIndex
+from .prune import build_rules, load_prune_config
+from .query import compile_query
+from .walker import DEFAULT_WORKERS
+
+# Сообщение — 4 байта длины (big-endian) и JSON в UTF-8. Имена с суррогатами
+# от файловой системы проходят как есть (surrogatepass на обоих концах)
+HEADER = struct.Struct(">I")
+PEERCRED = struct.Struct("3i")  # pid, uid, gid
+MAX_MESSAGE = 16 * 1024 * 1024
+ENCODING, ERRORS = "utf-8", "surrogatepass"
+
+MAX_CLIENTS = 32
+MAX_QUERIES_PER_CLIENT = 4
+MAX_WALKS = 2  # одновременных обходов диска на весь демон
+SEND_TIMEOUT = 30  # клиент, который столько не читает, отключается
+BATCH_SIZE = 500
+BATCH_INTERVAL = 0.05
+POLL_INTERVAL = 0.05
+CONNECT_TIMEOUT = 2.0
+INDEX_MAX_AGE = 3600  # как в окне: индекс старше часа обновляется после обхода
+
+
+class DaemonError(Exception):
+    pass
+
+
+SOCKET_NAME = "daemon.sock"
+
+
+def default_socket_path():
+    # Свой демон у каждого пользователя. XDG_RUNTIME_DIR и так закрыт для
+    # чужих; в общей временной папке сокет лежит в своей папке с правами 0700
+    # (её проверяет и создаёт ensure_private_dir), а не под предсказуемым
+    # именем, которое может заранее занять другой пользователь
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return os.path.join(runtime, f"filefinderpro-{getpass.getuser()}.sock")
+    base = os.path.join(tempfile.gettempdir(), f"filefinderpro-{getpass.getuser()}")
+    return os.path.join(base, SOCKET_NAME)
+
+
+def _uid():
+    return os.getuid() if hasattr(os, "getuid") else None
+
+
+def ensure_private_dir(path):
+    # Папка нашего сокета: создаём с 0700, чужую или открытую — не берём
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise OSError(f"не папка: {path}")
+    if st.st_uid != _uid() or st.st_mode & 0o077:
+        raise OSError(f"папка сокета чужая или открыта для других: {path}")
+
+
+def check_owner(path):
+    # Сокет должен принадлежать нам — иначе его подложил другой пользователь
+    uid = _uid()
+    if uid is not None and os.lstat(path).st_uid != uid:
+        raise OSError(f"сокет принадлежит другому пользователю: {path}")
+
+
+def peer_uid(sock):
+    # uid процесса на том конце сокета (Linux, SO_PEERCRED); где не узнать — None
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, PEERCRED.size)
+    return PEERCRED.unpack(creds)[1]
+
+
+# --- ПРОТОКОЛ ---
+def encode(obj):
+    data = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    data = data.encode(ENCODING, ERRORS)
+    return HEADER.pack(len(data)) + data
+
+
+def send_msg(sock, obj):
+    sock.sendall(encode(obj))
+
+
+class MessageReader:
+    # Собирает сообщения из потока байт; таймаут сокета посреди сообщения
+    # не теряет уже принятую его часть
+    def __init__(self, sock):
+        self.sock = sock
+        self.buf = bytearray()
+
+    def _parse(self):
+        if len(self.buf) < HEADER.size:
+            return None
+        (n,) = HEADER.unpack_from(self.buf)
+        if n > MAX_MESSAGE:
+            raise ValueError(f"сообщение {n} байт")
+        end = HEADER.size + n
+        if len(self.buf) < end:
+            return None
+        data = bytes(self.buf[HEADER.size : end])
+        del self.buf[:end]
+        return json.loads(data.decode(ENCODING, ERRORS))
+
+    def read(self):
+        # EOFError — собеседник закрыл соединение; socket.timeout — по
+        # таймауту сокета
+        while True:
+            msg = self._parse()
+            if msg is not None:
+                return msg
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise EOFError
+            self.buf += chunk
+
+
+# --- СОЕДИНЕНИЕ С КЛИЕНТОМ ---
+# Читатель в своём потоке, каждый запрос — в отдельном потоке со своим
+# флагом отмены. Ответы пишутся под замком: пакеты разных запросов не
+# перемешиваются внутри сообщения
+class ClientConnection:
+    def __init__(self, daemon, sock):
+        self.daemon = daemon
+        self.sock = sock
+        self.reader = MessageReader(sock)
+        self.wlock = threading.Lock()
+        self.queries = {}  # id запроса -> threading.Event отмены
+        self.lock = threading.Lock()
+
+    def send(self, obj):
+        with self.wlock:
+            send_msg(self.sock, obj)
+
+    def run(self):
+        try:
+            while True:
+                try:
+                    msg = self.reader.read()
+                except socket.timeout:
+                    continue
+                self.handle(msg)
+        except (EOFError, OSError, ValueError):
+            pass
+        finally:
+            # Клиент ушёл — его запросы больше никому не нужны
+            with self.lock:
+                for ev in self.queries.values():
+                    ev.set()
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.daemon.forget(self)
+
+    def handle(self, msg):
+        op = msg.get("op") if isinstance(msg, dict) else None
+        qid = msg.get("id") if isinstance(msg, dict) else None
+        if op == "query":
+            with self.lock:
+                if qid in self.queries:
+                    return self.send({"id": qid, "error": "duplicate_id"})
+                if len(self.queries) >= MAX_QUERIES_PER_CLIENT:
+                    return self.send({"id": qid, "error": "too_many_queries"})
+                stop = threading.Event()
+                self.queries[qid] = stop
+            threading.Thread(
+                target=self.query, args=(msg, stop), daemon=True
+            ).start()
+        elif op == "cancel":
+            with self.lock:
+                ev = self.queries.get(msg.get("target"))
+            if ev:
+                ev.set()
+        elif op == "stats":
+            self.send({"id": qid, "stats": self.daemon.report()})
+        else:
+            self.send({"id": qid, "error": "unknown_op"})
+
+    def query(self, msg, stop):
+        qid = msg.get("id")
+
+        def emit(rows):
+            self.send({"id": qid, "rows": rows})
+
+        try:
+            found, source = self.daemon.run_query(msg, stop.is_set, emit)
+            self.send(
+                {
+                    "id": qid,
+                    "done": True,
+                    "found": found,
+                    "source": source,
+                    "cancelled": stop.is_set(),
+                }
+            )
+        except FileNotFoundError:
+            self._reply_error(qid, "not_found")
+        except (ValueError, TypeError, KeyError, re.error) as e:
+            self._reply_error(qid, f"bad_query: {e}")
+        except OSError:
+            # Не смогли отправить — соединение закроет читатель
+            stop.set()
+        finally:
+            with self.lock:
+                self.queries.pop(qid, None)
+
+    def _reply_error(self, qid, text):
+        try:
+            self.send({"id": qid, "error": text})
+        except OSError:
+            pass
+
+
+# --- ДЕМОН ПОИСКА ---
+# Один процесс держит индекс, кэш результатов и обходы диска для всех окон
+# и CLI пользователя. Повторный или уточнённый запрос отвечается из кэша,
+# проиндексированный корень — из индекса, остальное — обходом, которых
+# одновременно не больше max_walks. После обхода корень индексируется в фоне
+class SearchDaemon:
+    def __init__(
+        self,
+        path=None,
+        index_path=INDEX_DB,
+        workers=DEFAULT_WORKERS,
+        max_clients=MAX_CLIENTS,
+        max_walks=MAX_WALKS,
+        prune=None,
+        cache_bytes=DEFAULT_MAX_BYTES,
+    ):
+        self.default_path = not path
+        self.path = path or default_socket_path()
+        self.index = FileIndex(index_path) if index_path else None
+        self.workers = workers
+        self.max_clients = max_clients
+        self.prune = prune
+        self.cache = ResultCache(cache_bytes)
+        self.cache_lock = threading.Lock()
+        self.walk_slots = threading.BoundedSemaphore(max_walks)
+        self.lock = threading.Lock()
+        self.clients = set()
+        self.indexing = set()  # корни, которые сейчас индексируются
+        self.walking = 0
+        self.stats = {
+            "connections": 0,
+            "rejected": 0,
+            "queries": 0,
+            "cancelled": 0,
+            "rows": 0,
+            "from_cache": 0,
+            "from_index": 0,
+            "from_walk": 0,
+            "indexed": 0,
+        }
+        self.started = time.time()
+        self.stopping = threading.Event()
+        self.sock = None
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.stats[key] += n
+
+    # --- Приём соединений ---
+    def bind(self):
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("нет Unix-сокетов на этой платформе")
+        if self.default_path and not os.environ.get("XDG_RUNTIME_DIR"):
+            ensure_private_dir(os.path.dirname(self.path))
+        if os.path.lexists(self.path):
+            check_owner(self.path)
+            # Живой демон на этом сокете — второй не запускаем; мёртвый — убираем
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+                probe.close()
+                raise OSError(f"демон уже запущен: {self.path}")
+            except ConnectionRefusedError:
+                os.unlink(self.path)
+            finally:
+                probe.close()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.path)
+        os.chmod(self.path, 0o600)
+        sock.listen(self.max_clients)
+        sock.settimeout(POLL_INTERVAL * 10)
+        self.sock = sock
+
+    def serve_forever(self):
+        if self.sock is None:
+            self.bind()
+        try:
+            while not self.stopping.is_set():
+                try:
+                    conn, _ = self.sock.accept()
+                except socket.timeout:
+                    continue
+                except OSError:
+                    if self.stopping.is_set():
+                        break
+                    raise
+                self.accept(conn)
+        finally:
+            self.close()
+
+    def start(self):
+        # Демон в фоновом потоке (замеры, встраивание); возвращает поток
+        self.bind()
+        t = threading.Thread(target=self.serve_forever, daemon=True)
+        t.start()
+        return t
+
+    def shutdown(self):
+        self.stopping.set()
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        with self.lock:
+            clients = list(self.clients)
+        for c in clients:
+            try:
+                c.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def accept(self, conn):
+        # Запросы принимаем только от своего пользователя
+        try:
+            uid = peer_uid(conn)
+        except OSError:
+            uid = -1
+        if uid is not None and uid != _uid():
+            with self.lock:
+                self.stats["rejected"] += 1
+            conn.close()
+            return
+        conn.settimeout(SEND_TIMEOUT)
+        with self.lock:
+            self.stats["connections"] += 1
+            full = len(self.clients) >= self.max_clients
+            if full:
+                self.stats["rejected"] += 1
+            else:
+                client = ClientConnection(self, conn)
+                self.clients.add(client)
+        if full:
+            try:
+                send_msg(conn, {"id": None, "error": "busy"})
+            except OSError:
+                pass
+            conn.close()
+            return
+        threading.Thread(target=client.run, daemon=True).start()
+
+    def forget(self, client):
+        with self.lock:
+            self.clients.discard(client)
+
+    # --- Запросы ---
+    def run_query(self, msg, stop, emit):
+        # Выполняет запрос msg, отдавая строки пакетами в emit;
+        # возвращает (найдено, откуда: cache/index/walk)
+        self.count("queries")
+        root = msg["root"]
+        # Рабочая папка у демона своя: относительный путь клиента здесь
+        # означал бы другую папку
+        if not isinstance(root, str) or not os.path.isabs(root):
+            raise ValueError(f"нужен абсолютный путь: {root!r}")
+        deep = bool(msg.get("deep"))
+        query = compile_query(msg.get("text") or "", msg.get("exts") or [])
+        stat_filter = StatFilter(
+            msg.get("min_size"), msg.get("max_size"), msg.get("after"), msg.get("before")
+        )
+        archives = bool(msg.get("archives"))
+        # Клиент может прислать свой раздел prune (CLI с --settings);
+        # без него действуют правила, с которыми запущен демон
+        prune = msg["prune"] if "prune" in msg else self.prune
+        rules = build_rules(prune, msg.get("category"), deep)
+        # no_index — клиент просит свежий обход: ни индекса, ни кэша
+        no_index = bool(msg.get("no_index"))
+        # Кэш общий для всех клиентов: ответ, снятый при других правилах
+        # (категория, свой prune), другому запросу не отдаём
+        scope = rules_scope(msg.get("category"), prune)
+
+        rows, exact = None, False
+        if not archives and not no_index:
+            with self.cache_lock:
+                rows, exact = self.cache.get(root, deep, query, scope)
+        search = Search(
+            root,
+            query,
+            deep,
+            self.workers,
+            None if no_index else self.index,
+            stop=stop,
+            rows=rows,
+            stat_filter=stat_filter,
+            rules=rules,
+            archives=archives,
+        )
+        if rows is not None:
+            source = "cache"
+        elif search.from_index:
+            source = "index"
+        else:
+            source = "walk"
+        self.count(f"from_{source}")
+        # В кэш — совпадения по именам без фильтров, как в окне
+        keep = [] if not archives and not stat_filter.active and not exact else None
+
+        slot = source == "walk"
+        if slot:
+            # Свободного места для обхода ждём, пока клиент не отменил запрос
+            while not self.walk_slots.acquire(timeout=POLL_INTERVAL):
+                if stop():
+                    self.count("cancelled")
+                    return 0, source
+            with self.lock:
+                self.walking += 1
+        try:
+            batch = []
+            last = time.monotonic()
+            for row in search:
+                batch.append(row)
+                if keep is not None:
+                    keep.append(row)
+                now = time.monotonic()
+                if len(batch) >= BATCH_SIZE or now - last >= BATCH_INTERVAL:
+                    emit(batch)
+                    self.count("rows", len(batch))
+                    batch = []
+                    last = now
+            if batch:
+                emit(batch)
+                self.count("rows", len(batch))
+        finally:
+            if slot:
+                with self.lock:
+                    self.walking -= 1
+                self.walk_slots.release()
+        if stop():
+            self.count("cancelled")
+            return search.found, source
+        if keep is not None:
+            with self.cache_lock:
+                self.cache.put(root, deep, query, keep, scope)
+        if source == "walk":
+            self.schedule_index(root, deep)
+        return search.found, source
+
+    def schedule_index(self, root, deep):
+        # Корень, который пришлось обходить, индексируем в фоне — следующий
+        # запрос по нему (от любого клиента) ответит индекс
+        if self.index is None:
+            return
+        covering = self.index.covering_root(root, deep)
+        if covering and time.time() - covering[1] < INDEX_MAX_AGE:
+            return
+        with self.lock:
+            if root in self.indexing:
+                return
+            self.indexing.add(root)
+        threading.Thread(
+            target=self._index, args=(root, deep), daemon=True
+        ).start()
+
+    def _index(self, root, deep):
+        try:
+            # Индексация — тоже обход: ждёт свободного места, как запросы
+            while not self.walk_slots.acquire(timeout=POLL_INTERVAL * 10):
+                if self.stopping.is_set():
+                    return
+            try:
+                count = self.index.rebuild(root, deep, self.stopping.is_set, self.workers)
+            finally:
+                self.walk_slots.release()
+            if count is not None:
+                self.count("indexed")
+                # Старые ответы из кэша могли разойтись с диском
+                with self.cache_lock:
+                    self.cache.clear()
+        finally:
+            with self.lock:
+                self.indexing.discard(root)
+
+    def report(self):
+        with self.lock:
+            out = dict(self.stats)
+            out["clients"] = len(self.clients)
+            out["walking"] = self.walking
+            out["indexing"] = sorted(self.indexing)
+        with self.cache_lock:
+            out["cache_entries"] = len(self.cache.entries)
+            out["cache_bytes"] = self.cache.size
+        out["uptime_s"] = round(time.time() - self.started, 1)
+        return out
+
+
+# --- КЛИЕНТ ---
+class DaemonClient:
+    def __init__(self, path=None, timeout=CONNECT_TIMEOUT):
+        self.path = path or default_socket_path()
+        self.next_id = 0
+        self.last = {}  # ответ done последнего запроса
+        if not hasattr(socket, "AF_UNIX"):
+            raise DaemonError("нет Unix-сокетов на этой платформе")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            # Чужой сокет получил бы наши запросы и мог бы подсунуть ответы
+            check_owner(self.path)
+            sock.connect(self.path)
+            uid = peer_uid(sock)
+            if uid is not None and uid != _uid():
+                raise OSError("демон запущен другим пользователем")
+        except OSError as e:
+            sock.close()
+            raise DaemonError(f"нет связи с демоном ({self.path}): {e}") from e
+        self.sock = sock
+        self.reader = MessageReader(sock)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.sock.close()
+
+    def _request(self, msg):
+        self.next_id += 1
+        msg["id"] = self.next_id
+        try:
+            send_msg(self.sock, msg)
+        except OSError as e:
+            raise DaemonError(f"демон закрыл соединение: {e}") from e
+        return self.next_id
+
+    def _read(self, timeout):
+        self.sock.settimeout(timeout)
+        try:
+            msg = self.reader.read()
+        except socket.timeout:
+            return None
+        except (EOFError, OSError, ValueError) as e:
+            raise DaemonError(f"демон закрыл соединение: {e!r}") from e
+        if msg.get("id") is None and msg.get("error"):
+            raise DaemonError(msg["error"])  # busy — демон не принял соединение
+        return msg
+
+    def search(
+        self,
+        root,
+        text="",
+        exts=(),
+        deep=False,
+        stat_filter=None,
+        archives=False,
+        category=None,
+        stop=None,
+        no_index=False,
+        prune=None,
+    ):
+        # Генератор пакетов строк (имя, путь, размер, mtime). stop() —
+        # отмена: демон получает cancel, генератор дочитывает ответ done.
+        # Корень — абсолютный: рабочая папка демона не та, что у клиента
+        msg = {
+            "op": "query",
+            "root": os.path.abspath(root),
+            "text": text,
+            "exts": list(exts),
+            "deep": bool(deep),
+            "archives": bool(archives),
+        }
+        if category:
+            msg["category"] = category
+        if no_index:
+            msg["no_index"] = True
+        if prune is not None:
+            msg["prune"] = prune
+        if stat_filter is not None and stat_filter.active:
+            msg["min_size"] = stat_filter.min_size
+            msg["max_size"] = stat_filter.max_size
+            msg["after"] = stat_filter.after
+            msg["before"] = stat_filter.before
+        qid = self._request(msg)
+        cancelled = False
+        while True:
+            if stop and not cancelled and stop():
+                self._request({"op": "cancel", "target": qid})
+                cancelled = True
+            reply = self._read(POLL_INTERVAL)
+            if reply is None or reply.get("id") != qid:
+                continue
+            if "error" in reply:
+                if reply["error"] == "not_found":
+                    raise FileNotFoundError(root)
+                raise DaemonError(reply["error"])
+            if reply.get("done"):
+                self.last = reply
+                return
+            if not cancelled:
+                yield [tuple(r) for r in reply["rows"]]
+
+    def stats(self, timeout=CONNECT_TIMEOUT):
+        qid = self._request({"op": "stats"})
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            reply = self._read(POLL_INTERVAL)
+            if reply and reply.get("id") == qid:
+                return reply.get("stats", {})
+        raise DaemonError("демон не ответил")
+
+
+# --- ПОИСК ЧЕРЕЗ ДЕМОН ---
+# Тот же интерфейс, что у finder.engine.Search (итерация по строкам, found,
+# lister), но строки приходят от демона. client — уже открытое соединение
+# (окно проверяет, запущен ли демон, до начала поиска)
+class DaemonSearch:
+    def __init__(
+        self,
+        root,
+        query,
+        deep=False,
+        stop=None,
+        on_progress=None,
+        stat_filter=None,
+        archives=False,
+        category=None,
+        path=None,
+        client=None,
+        no_index=False,
+        prune=None,
+    ):
+        self.root = root
+        self.query = query
+        self.deep = deep
+        self.stop = stop
+        self.on_progress = on_progress
+        self.stat_filter = stat_filter
+        self.archives = archives
+        self.category = category
+        self.path = path
+        self.client = client
+        self.no_index = no_index
+        self.prune = prune
+        self.lister = None
+        self.found = 0
+        self.reply = {}
+
+    @property
+    def source(self):
+        return self.reply.get("source")
+
+    @property
+    def from_index(self):
+        return self.source == "index"
+
+    def __iter__(self):
+        client = self.client or DaemonClient(self.path)
+        self.client = None  # соединение на один поиск
+        with client:
+            batches = client.search(
+                self.root,
+                self.query.text,
+                self.query.exts,
+                self.deep,
+                self.stat_filter,
+                self.archives,
+                self.category,
+                self.stop,
+                self.no_index,
+                self.prune,
+            )
+            for batch in batches:
+                self.found += len(batch)
+                yield from batch
+                if self.on_progress:
+                    self.on_progress(self.found)
+            self.reply = client.last
+
+    def summary(self):
+        sources = {"cache": "кэш", "index": "индекс", "walk": "обход"}
+        return f"Демон: {sources.get(self.source, '—')}, найдено {self.found}"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog="python -m finder.daemon",
+        description="Демон поиска FileFinderPro: индекс и кэш для окон и CLI.",
+    )
+    ap.add_argument("--socket", help=f"путь к сокету (по умолчанию {default_socket_path()})")
+    ap.add_argument("--index", default=INDEX_DB, help="база индекса")
+    ap.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS)
+    ap.add_argument("--max-clients", type=int, default=MAX_CLIENTS)
+    ap.add_argument("--max-walks", type=int, default=MAX_WALKS)
+    ap.add_argument(
+        "--settings",
+        default="settings.json",
+        help="settings.json окна: из него берутся правила отсечения папок (prune)",
+    )
+    ap.add_argument("--stats", action="store_true", help="спросить статистику у демона")
+    args = ap.parse_args(argv)
+
+    if args.stats:
+        try:
+            with DaemonClient(args.socket) as client:
+                print(json.dumps(client.stats(), ensure_ascii=False, indent=2))
+        except DaemonError as e:
+            print(e, file=sys.stderr)
+            return 2
+        return 0
+
+    daemon = SearchDaemon(
+        args.socket,
+        args.index,
+        args.workers,
+        args.max_clients,
+        args.max_walks,
+        load_prune_config(args.settings),
+    )
+    try:
+        daemon.bind()
+    except OSError as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(f"Демон слушает {daemon.path}", file=sys.stderr)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        daemon.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import hashlib
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from .walker import walk_files
+
+
+EDGE_BYTES = 64 * 1024  # сколько читаем с начала и с конца на втором этапе
+CHUNK_BYTES = 1024 * 1024
+DEFAULT_WORKERS = 4
+
+
+def _hasher():
+    return hashlib.blake2b(digest_size=20)
+
+
+def partial_hash(path, size):
+    # Первые и последние 64 КиБ; для файлов до 128 КиБ это весь файл
+    h = _hasher()
+    with open(path, "rb") as f:
+        h.update(f.read(EDGE_BYTES))
+        if size > EDGE_BYTES:
+            f.seek(max(EDGE_BYTES, size - EDGE_BYTES))
+            h.update(f.read(EDGE_BYTES))
+    return h.digest()
+
+
+def full_hash(path, stop=None):
+    h = _hasher()
+    with open(path, "rb") as f:
+        while True:
+            if stop and stop():
+                return None
+            chunk = f.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.digest()
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.files_in = 0
+        self.files_out = 0
+        self.bytes_total = 0  # сколько пришлось бы прочитать без отсева
+        self.bytes_read = 0
+        self.seconds = 0.0
+
+    def to_dict(self):
+        return {
+            "stage": self.name,
+            "files_in": self.files_in,
+            "files_out": self.files_out,
+            "bytes_total": self.bytes_total,
+            "bytes_read": self.bytes_read,
+            "seconds": round(self.seconds, 6),
+        }
+
+    def __str__(self):
+        read = self.bytes_read / 1024 / 1024
+        total = self.bytes_total / 1024 / 1024
+        return (
+            f"{self.name}: {self.files_in} -> {self.files_out} файлов, "
+            f"прочитано {read:.1f} из {total:.1f} МБ за {self.seconds:.2f} с"
+        )
+
+
+class DuplicateGroup:
+    def __init__(self, size, paths):
+        self.size = size
+        self.paths = paths
+
+    @property
+    def wasted(self):
+        return self.size * (len(self.paths) - 1)
+
+    def to_dict(self):
+        return {"size": self.size, "wasted": self.wasted, "paths": self.paths}
+
+
+# --- ПОИСК ДУБЛИКАТОВ: РАЗМЕР → КРАЯ ФАЙЛА → ПОЛНЫЙ ХЭШ ---
+# Каждый этап отсеивает уникальные файлы, и дорогое полное чтение
+# достаётся только тем, кто совпал по размеру и по краям
+class DuplicateFinder:
+    def __init__(
+        self, root, query, deep=False, walk_workers=1, hash_workers=DEFAULT_WORKERS,
+        stop=None, min_size=1, metrics=None, stat_filter=None, rules=None,
+    ):
+        self.root = root
+        self.query = query
+        self.deep = deep
+        self.walk_workers = walk_workers
+        self.hash_workers = hash_workers
+        self.stop = stop
+        self.min_size = min_size
+        self.metrics = metrics
+        self.rules = rules
+        self.stat_filter = stat_filter if stat_filter and stat_filter.active else None
+        self.stages = []
+        self.hardlinks = 0
+
+    def stopped(self):
+        return bool(self.stop and self.stop())
+
+    def run(self, on_stage=None):
+        # Возвращает группы дубликатов по убыванию потерянного места
+        try:
+            groups = self._group_by_size()
+            for name, fn in (("края файла", self._partial), ("полный хэш", self._full)):
+                if on_stage:
+                    on_stage(self.stages[-1])
+                if self.stopped():
+                    return []
+                groups = self._rehash(groups, name, fn)
+            if on_stage:
+                on_stage(self.stages[-1])
+            if self.stopped():
+                return []
+        finally:
+            if self.metrics:
+                self.metrics.finish()
+        out = [DuplicateGroup(size, sorted(paths)) for (size, _), paths in groups.items()]
+        out.sort(key=lambda g: g.wasted, reverse=True)
+        return out
+
+    def summary(self, groups):
+        wasted = sum(g.wasted for g in groups) / 1024 / 1024
+        lines = [f"Групп: {len(groups)} · Лишнего места: {wasted:.1f} МБ"]
+        if self.hardlinks:
+            lines[0] += f" · Жёстких ссылок пропущено: {self.hardlinks}"
+        lines += [str(st) for st in self.stages]
+        return "\n".join(lines)
+
+    def _group_by_size(self):
+        # Размер берём из DirEntry.stat(): на Windows он уже есть после scandir
+        st = StageStats("размер")
+        t0 = time.perf_counter()
+        sizes = defaultdict(list)
+        match = self.query.match
+        test = self.stat_filter.test if self.stat_filter else None
+        for _, files in walk_files(
+            self.root, self.deep, self.stop, self.walk_workers, self.metrics, self.rules
+        ):
+            for e in files:
+                # Ссылка — не копия: её размер — длина пути, а хэш считался
+                # бы по файлу, на который она указывает
+                if not match(e.name) or e.is_symlink():
+                    continue
+                st.files_in += 1
+                try:
+                    s = e.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                size = s.st_size
+                if test and not test(size, s.st_mtime):
+                    continue
+                st.bytes_total += size
+                if size >= self.min_size:
+                    sizes[size].append(e.path)
+        groups = {}
+        for size, paths in sizes.items():
+            if len(paths) > 1:
+                paths = self._drop_hardlinks(paths)
+                if len(paths) > 1:
+                    groups[(size, b"")] = paths
+        st.files_out = sum(len(p) for p in groups.values())
+        st.seconds = time.perf_counter() - t0
+        self.stages.append(st)
+        return groups
+
+    def _drop_hardlinks(self, paths):
+        # Жёсткие ссылки на один файл — это не копии: считаем их один раз
+        seen = set()
+        out = []
+        for p in paths:
+            try:
+                s = os.stat(p)
+                key = (s.st_dev, s.st_ino)
+            except OSError:
+                continue
+            if key[1] and key in seen:
+                self.hardlinks += 1
+                continue
+            seen.add(key)
+            out.append(p)
+        return out
+
+    def _partial(self, path, size):
+        return partial_hash(path, size), min(size, 2 * EDGE_BYTES)
+
+    def _full(self, path, size):
+        # Файл до 128 КиБ уже прочитан целиком на прошлом этапе
+        if size <= 2 * EDGE_BYTES:
+            return b"", 0
+        return full_hash(path, self.stop), size
+
+    def _rehash(self, groups, name, fn):
+        st = StageStats(name)
+        t0 = time.perf_counter()
+        jobs = [(key, p) for key, paths in groups.items() for p in paths]
+        st.files_in = len(jobs)
+        st.bytes_total = sum(key[0] for key, _ in jobs)
+
+        def work(job):
+            (size, _), path = job
+            if self.stopped():
+                return None
+            try:
+                return fn(path, size)
+            except OSError:
+                return None
+
+        out = defaultdict(list)
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as pool:
+            for (key, path), res in zip(jobs, pool.map(work, jobs)):
+                if res is None or res[0] is None:
+                    continue
+                digest, read = res
+                st.bytes_read += read
+                out[(key[0], key[1] + digest)].append(path)
+        result = {k: v for k, v in out.items() if len(v) > 1}
+        st.files_out = sum(len(p) for p in result.values())
+        st.seconds = time.perf_counter() - t0
+        self.stages.append(st)
+        return result
@@ -0,0 +1,213 @@
+import os
+import time
+from itertools import compress
+
+from .index import INDEX_DB, norm_root
+from .walker import walk_files
+
+
+PROGRESS_EVERY = 100
+
+
+def entry_stat(entry):
+    # На Windows stat уже лежит в DirEntry после scandir, на Unix — один
+    # lstat/stat на совпавший файл, а не на каждый просмотренный
+    try:
+        st = entry.stat()
+        return st.st_size, st.st_mtime
+    except OSError:
+        return -1, 0.0
+
+
+# --- ПОИСК БЕЗ Qt ---
+# Генератор строк (имя, путь, размер, mtime). Используется окном (SearchThread),
+# CLI и любыми скриптами; остановка — через stop(), прогресс — через on_progress
+class Search:
+    def __init__(
+        self,
+        root,
+        query,
+        deep=False,
+        workers=1,
+        index=None,
+        stop=None,
+        on_progress=None,
+        metrics=None,
+        rows=None,
+        stat_filter=None,
+        rules=None,
+        with_stat=True,
+        archives=False,
+        throttle=None,
+        finish_metrics=True,
+    ):
+        self.root = root
+        self.query = query
+        self.deep = deep
+        self.workers = workers
+        self.index = index
+        self.stop = stop
+        self.on_progress = on_progress
+        self.metrics = metrics
+        # False — metrics общие на несколько поисков, finish() зовёт владелец
+        self.finish_metrics = finish_metrics
+        self.rows = rows  # готовый набор строк вместо диска, напр. из кэша
+        self.stat_filter = stat_filter if stat_filter and stat_filter.active else None
+        self.rules = rules  # finder.prune.PruneRules; None — правила по умолчанию
+        # False — не делать stat при обходе (размер -1), если фильтру он не нужен:
+        # нечёткому поиску stat нужен только для лучших K
+        self.with_stat = with_stat or self.stat_filter is not None
+        self.archives = archives  # True — искать и среди файлов внутри zip/tar
+        self.lister = None  # finder.archives.ArchiveLister этого поиска
+        self.throttle = throttle  # finder.throttle.Throttle — фоновый режим
+        self.scanned = 0
+        self.found = 0
+        use_index = index and rows is None and (rules is None or rules.fits_index(deep))
+        self.covering = index.covering_root(root, deep) if use_index else None
+
+    @property
+    def from_index(self):
+        return self.covering is not None
+
+    def stopped(self):
+        return bool(self.stop and self.stop())
+
+    def _progress(self, n=1):
+        before = self.scanned
+        self.scanned += n
+        if self.on_progress and self.scanned // PROGRESS_EVERY > before // PROGRESS_EVERY:
+            self.on_progress(self.scanned)
+
+    def __iter__(self):
+        if self.rows is None and not os.path.exists(self.root):
+            raise FileNotFoundError(self.root)
+        m = self.metrics
+        if self.archives and self.rows is None:
+            # zipfile и tarfile грузим только для поиска по архивам
+            from .archives import ArchiveCache, ArchiveLister
+
+            db = self.index.db_path if self.index else INDEX_DB
+            self.lister = ArchiveLister(ArchiveCache(db), self.workers)
+        try:
+            if self.rows is not None:
+                yield from self._from_rows(self.rows, m)
+            elif self.from_index:
+                yield from self._from_index(m)
+            else:
+                yield from self._from_walk(m)
+        finally:
+            if self.lister:
+                self.lister.close()
+            if m and self.finish_metrics:
+                m.finish()
+
+    def _from_index(self, m):
+        # Корень уже проиндексирован — отвечаем из базы без обхода диска
+        rows = self.index.query(self.root, self.query, self.deep, self.stat_filter)
+        if self.rules is not None and self.rules.custom:
+            # Индекс построен без пользовательских правил — отсекаем здесь
+            root = norm_root(self.root)
+            rows = (r for r in rows if self.rules.allows(root, r[1]))
+        yield from self._from_rows(rows, m)
+        if self.lister:
+            from .archives import ARCHIVE_EXTS
+
+            for path, _, _ in self.index.files_with_ext(self.root, ARCHIVE_EXTS):
+                if self.stopped():
+                    return
+                # Размер и mtime из индекса могли устареть — тогда оглавление
+                # нового файла легло бы в кэш под старым ключом. Один stat
+                # на архив; исчезнувший после индексации пропускаем
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                self.lister.submit(path, st.st_size, st.st_mtime)
+                if self.lister.busy():
+                    yield from self._from_rows(self.lister.ready(block=True), m)
+            yield from self._from_rows(self.lister.drain(self.stopped), m)
+
+    def _from_rows(self, rows, m):
+        match = self.query.match
+        test = self.stat_filter.test if self.stat_filter else None
+        clock = time.perf_counter
+        t0 = clock()
+        emitted = 0.0
+        n = 0
+        try:
+            for row in rows:
+                if self.stopped():
+                    break
+                self._progress()
+                if not match(row[0]) or (test and not test(row[2], row[3])):
+                    continue
+                self.found += 1
+                if m:
+                    n += 1
+                    t1 = clock()
+                    yield row
+                    emitted += clock() - t1
+                else:
+                    yield row
+        finally:
+            if m:
+                m.add_matches(n, clock() - t0 - emitted, emitted)
+
+    def _from_walk(self, m):
+        matches = self.query.matches
+        test = self.stat_filter.test if self.stat_filter else None
+        with_stat = self.with_stat
+        lister = self.lister
+        if lister:
+            from .archives import is_archive
+        clock = time.perf_counter
+        for _, files in walk_files(
+            self.root, self.deep, self.stop, self.workers, m, self.rules, self.throttle
+        ):
+            # Время сравнения считаем на папку целиком за вычетом вывода —
+            # замер на каждый файл стоил бы дороже самого сравнения
+            t0 = clock() if m else 0
+            emitted = 0.0
+            n = 0
+            try:
+                if self.stopped():
+                    return
+                self._progress(len(files))
+                if lister:
+                    for entry in files:
+                        if is_archive(entry.name):
+                            # Архив читаем независимо от того, подходит ли он сам
+                            size, mtime = entry_stat(entry)
+                            if size >= 0:
+                                lister.submit(entry.path, size, mtime)
+                # Имена папки проверяются одним проходом (Query.matches):
+                # цикл Python идёт только по совпавшим
+                for entry in compress(files, matches([e.name for e in files])):
+                    if self.stopped():
+                        return
+                    size, mtime = entry_stat(entry) if with_stat else (-1, 0.0)
+                    if test and not test(size, mtime):
+                        continue
+                    row = (entry.name, entry.path, size, mtime)
+                    self.found += 1
+                    if m:
+                        n += 1
+                        t1 = clock()
+                        yield row
+                        emitted += clock() - t1
+                    else:
+                        yield row
+            finally:
+                if m:
+                    m.add_matches(n, clock() - t0 - emitted, emitted)
+            if lister:
+                # Готовые оглавления — между папками, не дожидаясь конца обхода
+                yield from self._from_rows(lister.ready(block=lister.busy()), m)
+        if lister:
+            yield from self._from_rows(lister.drain(self.stopped), m)
+            if not self.stopped():
+                lister.prune(self.root)
+
+
+def search(root, query, deep=False, workers=1, index=None, stop=None, stat_filter=None):
+    return iter(Search(root, query, deep, workers, index, stop, stat_filter=stat_filter))
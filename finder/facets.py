@@ -0,0 +1,129 @@
+import time
+from array import array
+
+from .store import DEFAULT_MEMORY_BYTES, ResultStore
+
+
+UPDATE_EVERY = 100  # часы смотрим раз на 100 строк, а не на каждую
+
+
+# --- ОБРАТНАЯ КАРТА РАСШИРЕНИЙ ---
+def build_ext_map(categories):
+    # extensions.json -> {".pdf": ("pdf", "docs"), ...} для однократной
+    # проверки имени; составные суффиксы (".tar.gz") — отдельным списком
+    ext_map, compound = {}, []
+    for key, exts in categories.items():
+        for e in exts:
+            e = e.casefold()
+            if e.count(".") == 1 and e.startswith("."):
+                cats = ext_map.setdefault(e, [])
+                if key not in cats:
+                    cats.append(key)
+            else:
+                compound.append((e, key))
+    return {e: tuple(c) for e, c in ext_map.items()}, compound
+
+
+# --- СВОДКА ПО КАТЕГОРИЯМ ЗА ОДИН ОБХОД ---
+# Каждая строка потока (finder.engine.Search) раскладывается по всем
+# категориям extensions.json сразу. Строки хранятся в ResultStore, а для
+# категории — номера её строк, так что подборка по категории после обхода
+# берётся из памяти. keep_rows=False — только числа (CLI): ни хранилища,
+# ни временного файла. on_update(counts) зовётся не чаще interval
+class FacetScan:
+    def __init__(
+        self,
+        rows,
+        categories,
+        stop=None,
+        memory_bytes=DEFAULT_MEMORY_BYTES,
+        keep_rows=True,
+    ):
+        self.rows = rows
+        self.ext_map, self.compound = build_ext_map(categories)
+        self.stop = stop
+        self.store = ResultStore(memory_bytes=memory_bytes) if keep_rows else None
+        self.members = {key: array("I") for key in categories} if keep_rows else None
+        self.counts = {key: [0, 0] for key in categories}  # файлов, байт
+        self.found = 0
+        self.total_bytes = 0
+
+    def stopped(self):
+        return bool(self.stop and self.stop())
+
+    def classify(self, name):
+        cf = name.casefold()
+        i = cf.rfind(".")
+        cats = self.ext_map.get(cf[i:], ()) if i >= 0 else ()
+        if self.compound:
+            extra = [k for e, k in self.compound if cf.endswith(e) and k not in cats]
+            if extra:
+                cats = tuple(cats) + tuple(extra)
+        return cats
+
+    def run(self, on_update=None, interval=0.2, batch=500):
+        clock = time.monotonic
+        classify = self.classify
+        members, counts = self.members, self.counts
+        keep = self.store is not None
+        pending = []
+        last = clock()
+        for row in self.rows:
+            if self.stopped():
+                break
+            n = self.found
+            self.found += 1
+            size = max(row[2], 0)
+            self.total_bytes += size
+            for key in classify(row[0]):
+                if keep:
+                    members[key].append(n)
+                c = counts[key]
+                c[0] += 1
+                c[1] += size
+            if keep:
+                pending.append(row)
+                if len(pending) >= batch:
+                    self.store.extend(pending)
+                    pending = []
+            if on_update and not n % UPDATE_EVERY and clock() - last >= interval:
+                on_update(self.snapshot())
+                last = clock()
+        if keep:
+            self.store.extend(pending)
+        if on_update:
+            on_update(self.snapshot())
+        return self.snapshot()
+
+    def snapshot(self):
+        return {key: tuple(c) for key, c in self.counts.items()}
+
+    def subset(self, key, exts=None):
+        # Строки категории; exts — выбранная в диалоге часть её расширений
+        if self.store is None:
+            return []
+        store = self.store
+        rows = (store[i] for i in self.members.get(key, ()))
+        if exts:
+            wanted = tuple(e.casefold() for e in exts)
+            rows = (r for r in rows if r[0].casefold().endswith(wanted))
+        return list(rows)
+
+    def summary(self):
+        busiest = sorted(self.counts.items(), key=lambda kv: -kv[1][0])[:3]
+        top = ", ".join(f"{k}: {n}" for k, (n, _) in busiest if n)
+        text = f"Сводка: {self.found} файлов"
+        return text + (f" · {top}" if top else "")
+
+    def to_dict(self):
+        return {
+            "files": self.found,
+            "bytes": self.total_bytes,
+            "categories": {
+                k: {"files": n, "bytes": b} for k, (n, b) in self.counts.items()
+            },
+        }
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
@@ -0,0 +1,105 @@
+import re
+import time
+
+
+# Множители для "10M", "1.5 гб" и т.п.; без единицы — байты
+SIZE_UNITS = {
+    "": 1,
+    "b": 1,
+    "б": 1,
+    "k": 1024,
+    "kb": 1024,
+    "кб": 1024,
+    "m": 1024**2,
+    "mb": 1024**2,
+    "мб": 1024**2,
+    "g": 1024**3,
+    "gb": 1024**3,
+    "гб": 1024**3,
+}
+# Относительное время: "7d" / "7д" — семь дней назад, "12h" / "12ч" — двенадцать часов
+AGE_UNITS = {"d": 86400, "д": 86400, "h": 3600, "ч": 3600, "w": 604800, "н": 604800}
+DATE_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%d", "%d.%m.%Y %H:%M", "%d.%m.%Y")
+END_EPSILON = 1e-6  # верхняя граница — чуть раньше следующих суток
+
+_SIZE_RE = re.compile(r"^\s*(\d+(?:[.,]\d+)?)\s*([^\d\s]*)\s*$")
+_AGE_RE = re.compile(r"^\s*(\d+)\s*([^\d\s]+)\s*$")
+
+
+def parse_size(text):
+    # "" -> None; неверная запись -> ValueError
+    text = text.strip().casefold()
+    if not text:
+        return None
+    m = _SIZE_RE.match(text)
+    if not m or m.group(2) not in SIZE_UNITS:
+        raise ValueError(text)
+    return int(float(m.group(1).replace(",", ".")) * SIZE_UNITS[m.group(2)])
+
+
+def parse_time(text, now=None, end=False):
+    # Дата или возраст ("7d") -> метка времени; "" -> None. end=True — для
+    # верхней границы: дата без времени означает конец этого дня (минута —
+    # конец минуты), иначе файлы, изменённые в сам этот день, не подходят
+    text = text.strip().casefold()
+    if not text:
+        return None
+    m = _AGE_RE.match(text)
+    if m and m.group(2) in AGE_UNITS:
+        now = time.time() if now is None else now
+        return now - int(m.group(1)) * AGE_UNITS[m.group(2)]
+    for fmt in DATE_FORMATS:
+        try:
+            t = time.strptime(text, fmt)
+        except ValueError:
+            continue
+        if not end:
+            return time.mktime(t)
+        y, mo, d, h, mi = t[:5]
+        # Следующие полночь или минута через mktime: переход на летнее
+        # время не сдвигает границу на час
+        if "%H" in fmt:
+            nxt = time.mktime((y, mo, d, h, mi + 1, 0, 0, 0, -1))
+        else:
+            nxt = time.mktime((y, mo, d + 1, 0, 0, 0, 0, 0, -1))
+        return nxt - END_EPSILON
+    raise ValueError(text)
+
+
+def format_size(n):
+    if n < 0:
+        return "—"
+    for unit in ("Б", "КБ", "МБ", "ГБ"):
+        if n < 1024 or unit == "ГБ":
+            return f"{n:.0f} {unit}" if unit == "Б" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+# --- ФИЛЬТР ПО РАЗМЕРУ И ДАТЕ ИЗМЕНЕНИЯ ---
+# Проверяется в цикле обхода сразу после совпадения имени; границы включительно
+class StatFilter:
+    def __init__(self, min_size=None, max_size=None, after=None, before=None):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.after = after
+        self.before = before
+
+    @property
+    def active(self):
+        return any(
+            v is not None for v in (self.min_size, self.max_size, self.after, self.before)
+        )
+
+    def test(self, size, mtime):
+        # size < 0 — stat не удался: такой файл под активный фильтр не подходит
+        if size < 0:
+            return not self.active
+        if self.min_size is not None and size < self.min_size:
+            return False
+        if self.max_size is not None and size > self.max_size:
+            return False
+        if self.after is not None and mtime < self.after:
+            return False
+        if self.before is not None and mtime > self.before:
+            return False
+        return True
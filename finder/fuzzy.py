@@ -0,0 +1,225 @@
+import heapq
+import os
+import time
+
+
+TOP_K = 200
+SEPARATORS = frozenset(" _-.,()[]{}")
+
+# Веса как у нечёткого поиска в редакторах: совпадение на границе слова
+# и подряд идущие буквы ценнее разбросанных по имени
+SCORE_MATCH = 16
+BONUS_FIRST = 8  # совпадение с первой буквой имени
+BONUS_BOUNDARY = 8  # начало слова: после разделителя, camelCase, буква после цифры
+BONUS_CONSECUTIVE = 8
+PENALTY_GAP_START = 3
+PENALTY_GAP = 1
+PENALTY_TYPO = 24  # пропущенная буква запроса (опечатка)
+BONUS_EXT = 12  # запрос "отчет.xls" и расширение совпало
+
+
+def _boundary(name, i):
+    if i == 0:
+        return True
+    prev, cur = name[i - 1], name[i]
+    if prev in SEPARATORS:
+        return True
+    if prev.islower() and cur.isupper():
+        return True
+    return prev.isdigit() != cur.isdigit()
+
+
+def _forward(cf, pattern, pos=0):
+    # Жадно ищем буквы по порядку: позиции найденных (могут быть не все)
+    find = cf.find
+    out = []
+    for c in pattern:
+        pos = find(c, pos)
+        if pos < 0:
+            break
+        out.append(pos)
+        pos += 1
+    return out
+
+
+def compile_fuzzy(text, typos=True):
+    # Возвращает score(name) -> число или None (не подходит).
+    # Пробелы в запросе не значимы: "отч 2024" == "отч2024"
+    pattern = "".join(text.casefold().split())
+    m = len(pattern)
+    dot = pattern.rfind(".")
+    want_ext = pattern[dot:] if 0 < dot < m - 1 else ""
+    # Одна опечатка — запрос без одной буквы. Для запроса короче четырёх
+    # букв это даёт слишком много шума
+    typos = typos and m >= 4
+
+    def score(name):
+        if not m:
+            return None
+        cf = name.casefold()
+        pat = pattern
+        found = _forward(cf, pattern)
+        missed = 0
+        k = len(found)
+        if k < m:
+            if not typos:
+                return None
+            # Букву j <= k можно выкинуть, если начало до неё встало (жадные
+            # позиции found), а хвост pattern[j+1:] помещается правее.
+            # Самые правые начала хвостов считаем с конца и только пока нужно
+            rfind = cf.rfind
+            end = len(cf)
+            for t in range(m - 1, k, -1):
+                end = rfind(pattern[t], 0, end)
+                if end < 0:
+                    return None
+            j = k
+            while True:
+                before = found[j - 1] if j else -1
+                if end > before:
+                    break
+                if not j:
+                    return None
+                end = rfind(pattern[j], 0, end)
+                if end < 0:
+                    return None
+                j -= 1
+            pat = pattern[:j] + pattern[j + 1 :]
+            found = found[:j] + _forward(cf, pattern[j + 1 :], before + 1)
+            missed = 1
+        last = found[-1]
+        # Обратный проход от последней буквы: самое плотное совпадение
+        positions = [last]
+        rfind = cf.rfind
+        end = last
+        for c in reversed(pat[:-1]):
+            end = rfind(c, 0, end)
+            positions.append(end)
+        positions.reverse()
+
+        # casefold может удлинить имя ("ß" -> "ss", "İ" -> "i̇"): тогда
+        # позиции в cf переводим в позиции name, где видны регистр и цифры
+        orig = None
+        if len(cf) != len(name):
+            orig = [j for j, ch in enumerate(name) for _ in ch.casefold()]
+        ext_at = cf.rfind(".")
+        total = -missed * PENALTY_TYPO
+        prev = -1
+        for i in positions:
+            s = SCORE_MATCH
+            if i == 0:
+                s += BONUS_FIRST + BONUS_BOUNDARY
+            elif orig is None:
+                if _boundary(name, i):
+                    s += BONUS_BOUNDARY
+            elif orig[i] != orig[i - 1] and _boundary(name, orig[i]):
+                # Вторая буква из одной исходной ("ss" из "ß") — не граница
+                s += BONUS_BOUNDARY
+            if prev >= 0:
+                if i == prev + 1:
+                    s += BONUS_CONSECUTIVE
+                else:
+                    s -= PENALTY_GAP_START + (i - prev - 1) * PENALTY_GAP
+            if 0 < ext_at < i:
+                # Буквы из расширения ничего не говорят об имени
+                s -= BONUS_BOUNDARY
+            total += s
+            prev = i
+        if want_ext and cf.endswith(want_ext):
+            total += BONUS_EXT
+        # При прочих равных короткое имя выше
+        return total - len(cf) // 8
+
+    return score
+
+
+def fill_stat(row):
+    # Строки без stat (size < 0) дополняем только для попавших в top-K
+    name, path, size, mtime = row
+    if size >= 0:
+        return row
+    try:
+        st = os.stat(path)
+        return name, path, st.st_size, st.st_mtime
+    except OSError:
+        return row
+
+
+# --- ЛУЧШИЕ K СОВПАДЕНИЙ ---
+# Мин-куча фиксированного размера: память не растёт с числом файлов,
+# слабейший из лучших всегда в heap[0]
+class TopK:
+    def __init__(self, k=TOP_K):
+        self.k = k
+        self.heap = []
+        self.seq = 0  # при равном счёте выше тот, кто найден раньше
+        self.version = 0  # меняется при каждом изменении набора лучших
+        self.seen = 0
+
+    def push(self, score, row):
+        self.seen += 1
+        self.seq -= 1
+        item = (score, self.seq, row)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, item)
+        elif item > self.heap[0]:
+            heapq.heapreplace(self.heap, item)
+        else:
+            return False
+        self.version += 1
+        return True
+
+    def threshold(self):
+        # Счёт, который нужно превзойти, чтобы попасть в набор
+        return self.heap[0][0] if len(self.heap) >= self.k else None
+
+    def ranked(self):
+        return [(score, row) for score, _, row in sorted(self.heap, reverse=True)]
+
+
+# --- НЕЧЁТКИЙ ПОИСК ---
+# Оценивает каждое имя из rows (поток строк finder.engine.Search) и держит
+# лучшие K; on_update(ранжированные строки) зовётся не чаще interval
+class FuzzySearch:
+    def __init__(self, rows, text, k=TOP_K, stop=None):
+        self.rows = rows
+        self.score = compile_fuzzy(text)
+        self.top = TopK(k)
+        self.stop = stop
+        self.filled = {}  # путь -> строка со stat из прошлого results()
+
+    @property
+    def found(self):
+        return len(self.top.heap)
+
+    def stopped(self):
+        return bool(self.stop and self.stop())
+
+    def run(self, on_update=None, interval=0.2):
+        clock = time.monotonic
+        score = self.score
+        push = self.top.push
+        last = clock()
+        shown = self.top.version
+        for row in self.rows:
+            if self.stopped():
+                break
+            s = score(row[0])
+            if s is not None:
+                push(s, row)
+            if on_update and self.top.version != shown and clock() - last >= interval:
+                on_update(self.results())
+                shown = self.top.version
+                last = clock()
+        return self.results()
+
+    def results(self):
+        # Зовётся на каждом обновлении: stat делаем только новичкам top-K,
+        # а кэш держим лишь для тех, кто в наборе сейчас
+        filled, out = {}, []
+        for _, row in self.top.ranked():
+            path = row[1]
+            row = filled[path] = self.filled.get(path) or fill_stat(row)
+            out.append(row)
+        self.filled = filled
+        return out
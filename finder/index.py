@@ -0,0 +1,219 @@
+import os
+import sqlite3
+import time
+
+from .walker import walk_files
+
+
+INDEX_DB = "index.db"
+BATCH_SIZE = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    name_low TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL
+);
+CREATE INDEX IF NOT EXISTS files_path ON files(path);
+CREATE INDEX IF NOT EXISTS files_ext ON files(ext);
+CREATE TABLE IF NOT EXISTS roots (
+    root TEXT PRIMARY KEY,
+    deep INTEGER NOT NULL,
+    indexed_at REAL NOT NULL,
+    count INTEGER NOT NULL
+);
+"""
+
+# Триграммный FTS5 (SQLite 3.34+) ищет подстроку в имени без полного перебора
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS names_fts USING fts5(
+    name_low, content='files', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+    INSERT INTO names_fts(rowid, name_low) VALUES (new.id, new.name_low);
+END;
+CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+    INSERT INTO names_fts(names_fts, rowid, name_low) VALUES ('delete', old.id, old.name_low);
+END;
+"""
+
+
+def file_ext(name_cf):
+    # Как и f_low.endswith(e): для ".bashrc" расширением считается всё имя
+    i = name_cf.rfind(".")
+    return name_cf[i:] if i >= 0 else ""
+
+
+def norm_root(root):
+    return os.path.normpath(os.path.abspath(root))
+
+
+def path_prefix(root):
+    return root if root.endswith(os.sep) else root + os.sep
+
+
+def is_under(path, root):
+    return path == root or path.startswith(path_prefix(root))
+
+
+# --- ИНДЕКС ИМЁН ФАЙЛОВ ---
+class FileIndex:
+    def __init__(self, db_path=INDEX_DB):
+        self.db_path = db_path
+        self.has_fts = False
+        try:
+            with self._connect() as con:
+                con.executescript(SCHEMA)
+                try:
+                    con.executescript(FTS_SCHEMA)
+                    self.has_fts = True
+                except sqlite3.OperationalError:
+                    pass
+        except sqlite3.Error:
+            pass
+
+    def _connect(self):
+        # Отдельное соединение на вызов: индекс читают и пишут разные потоки
+        con = sqlite3.connect(self.db_path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        return con
+
+    def covering_root(self, root, deep):
+        root = norm_root(root)
+        try:
+            with self._connect() as con:
+                rows = con.execute(
+                    "SELECT root, indexed_at FROM roots WHERE deep = ?", (int(deep),)
+                ).fetchall()
+        except sqlite3.Error:
+            return None
+        best = None
+        for r, ts in rows:
+            if not is_under(root, r):
+                continue
+            # Папку, которую обход без deep пропускает, индекс предка не покрывает
+            if not deep and root != r:
+                rel = os.path.relpath(root, r).split(os.sep)
+                if any(p.startswith(".") or "$" in p for p in rel):
+                    continue
+            if best is None or len(r) > len(best[0]):
+                best = (r, ts)
+        return best
+
+    def query(self, root, query, deep, stat_filter=None):
+        root = norm_root(root)
+        sql = (
+            "SELECT f.name, f.path, coalesce(f.size, -1), coalesce(f.mtime, 0)"
+            " FROM files f"
+        )
+        where, args = [], []
+        # Индекс отбирает кандидатов по самой длинной обязательной подстроке
+        lit = max(query.literals, key=len, default="")
+        if lit and self.has_fts and len(lit) >= 3:
+            sql += " JOIN names_fts ON names_fts.rowid = f.id"
+            where.append("names_fts MATCH ?")
+            args.append('"' + lit.replace('"', '""') + '"')
+        elif lit:
+            where.append("instr(f.name_low, ?) > 0")
+            args.append(lit)
+        if query.ext_set:
+            where.append(f"f.ext IN ({','.join('?' * len(query.ext_set))})")
+            args.extend(query.ext_set)
+        # Фильтр по размеру и дате проверяется в SQL, а не после выборки
+        if stat_filter:
+            for col, op, val in (
+                ("size", ">=", stat_filter.min_size),
+                ("size", "<=", stat_filter.max_size),
+                ("mtime", ">=", stat_filter.after),
+                ("mtime", "<=", stat_filter.before),
+            ):
+                if val is not None:
+                    where.append(f"f.{col} {op} ?")
+                    args.append(val)
+        # Только файлы под root: в базе лежат и другие проиндексированные корни
+        prefix = path_prefix(root)
+        where.append("substr(f.path, 1, ?) = ?")
+        args.extend([len(prefix), prefix])
+        sql += " WHERE " + " AND ".join(where)
+        # Это кандидаты: окончательно их проверяет query.match в finder.engine
+        with self._connect() as con:
+            yield from con.execute(sql, args)
+
+    def files_with_ext(self, root, exts):
+        # (путь, размер, mtime) всех файлов с расширением из exts под root —
+        # для архивов, которые сами под запрос не подходят
+        root = norm_root(root)
+        prefix = path_prefix(root)
+        sql = (
+            "SELECT path, coalesce(size, -1), coalesce(mtime, 0) FROM files"
+            f" WHERE ext IN ({','.join('?' * len(exts))})"
+            " AND substr(path, 1, ?) = ?"
+        )
+        with self._connect() as con:
+            yield from con.execute(sql, [*exts, len(prefix), prefix])
+
+    def rebuild(self, root, deep, stop=None, workers=1):
+        root = norm_root(root)
+        prefix = path_prefix(root)
+        con = self._connect()
+        try:
+            con.execute("BEGIN")
+            con.execute(
+                "DELETE FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+            )
+            con.execute(
+                "DELETE FROM roots WHERE root = ? OR substr(root, 1, ?) = ?",
+                (root, len(prefix), prefix),
+            )
+            # Предок, проиндексированный с другим режимом deep, теперь неполный
+            for (r,) in con.execute(
+                "SELECT root FROM roots WHERE deep != ?", (int(deep),)
+            ).fetchall():
+                if is_under(root, r):
+                    con.execute("DELETE FROM roots WHERE root = ?", (r,))
+            count = 0
+            batch = []
+            for dirpath, files in walk_files(root, deep, stop, workers):
+                for e in files:
+                    try:
+                        # На Windows stat уже лежит в DirEntry после scandir
+                        st = e.stat()
+                        size, mtime = st.st_size, st.st_mtime
+                    except OSError:
+                        size, mtime = None, None
+                    # casefold, как в finder.query: "Straße" находится по "strasse"
+                    f_cf = e.name.casefold()
+                    batch.append((e.path, e.name, f_cf, file_ext(f_cf), size, mtime))
+                if len(batch) >= BATCH_SIZE:
+                    self._insert(con, batch)
+                    count += len(batch)
+                    batch = []
+            if stop and stop():
+                con.rollback()
+                return None
+            self._insert(con, batch)
+            count += len(batch)
+            con.execute(
+                "INSERT INTO roots(root, deep, indexed_at, count) VALUES (?, ?, ?, ?)",
+                (root, int(deep), time.time(), count),
+            )
+            con.commit()
+            return count
+        except sqlite3.Error:
+            con.rollback()
+            return None
+        finally:
+            con.close()
+
+    def _insert(self, con, batch):
+        if batch:
+            con.executemany(
+                "INSERT INTO files(path, name, name_low, ext, size, mtime)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                batch,
+            )
@@ -0,0 +1,86 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+DEFAULT_IO_WORKERS = 4
+# Вызов на мёртвом сетевом диске может не вернуться никогда и держит поток;
+# на смену ему запускается новый, но всего не больше MAX_IO_WORKERS
+MAX_IO_WORKERS = 16
+IO_TIMEOUT = 3.0
+
+
+# --- ПУЛ ДЛЯ ВЫЗОВОВ, КОТОРЫЕ МОГУТ ЗАВИСНУТЬ ---
+# stat, listdir, запуск программ: окно отдаёт их сюда и ждёт результат с
+# таймаутом или получает его асинхронно (Future). Потоки — демоны:
+# зависший вызов не задерживает выход из программы, в отличие от
+# concurrent.futures.ThreadPoolExecutor, который ждёт свои потоки
+class IoPool:
+    def __init__(self, workers=DEFAULT_IO_WORKERS, max_workers=MAX_IO_WORKERS):
+        self.max_workers = max(workers, max_workers)
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.threads = 0
+        self.idle = 0
+        self.submitted = 0
+        for _ in range(workers):
+            self._start()
+
+    def _start(self):
+        self.threads += 1
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def _worker(self):
+        while True:
+            with self.lock:
+                self.idle += 1
+            fut, fn, args = self.jobs.get()
+            with self.lock:
+                self.idle -= 1
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                fut.set_result(fn(*args))
+            except BaseException as e:
+                fut.set_exception(e)
+
+    def submit(self, fn, *args):
+        fut = Future()
+        with self.lock:
+            self.submitted += 1
+            # Все потоки заняты (возможно, зависли) — добавляем ещё один
+            if self.idle <= self.jobs.qsize() and self.threads < self.max_workers:
+                self._start()
+        self.jobs.put((fut, fn, args))
+        return fut
+
+    def call(self, fn, *args, timeout=IO_TIMEOUT, default=None):
+        # Синхронно, но не дольше timeout: для значений, без которых окно не
+        # может продолжить (settings.json при запуске). Ошибка или таймаут — default
+        try:
+            return self.submit(fn, *args).result(timeout)
+        except Exception:
+            return default
+
+    def stats(self):
+        with self.lock:
+            return {
+                "threads": self.threads,
+                "busy": self.threads - self.idle,
+                "submitted": self.submitted,
+            }
+
+
+def check_dirs(pool, paths, timeout=IO_TIMEOUT):
+    # {путь: True/False, None — не ответил за timeout}. Каждый путь — своя
+    # задача: один мёртвый сетевой диск не задерживает проверку остальных
+    futures = {p: pool.submit(os.path.isdir, p) for p in dict.fromkeys(paths)}
+    deadline = time.monotonic() + timeout
+    out = {}
+    for p, fut in futures.items():
+        try:
+            out[p] = fut.result(max(0.0, deadline - time.monotonic()))
+        except Exception:
+            out[p] = None
+    return out
@@ -0,0 +1,196 @@
+import heapq
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+
+TOP_DIRS = 10
+PREFIX_DEPTH = 2  # ошибки группируем по первым двум уровням под корнем
+
+
+# --- СЧЁТЧИКИ СКАНИРОВАНИЯ ---
+# Пишется из потоков обхода (scan_dir) и из генератора поиска, поэтому
+# общие поля меняются под замком; время — в секундах
+class ScanMetrics:
+    def __init__(self, root="", top_n=TOP_DIRS, prefix_depth=PREFIX_DEPTH):
+        self.root = os.path.normpath(root) if root else ""
+        self.top_n = top_n
+        self.prefix_depth = prefix_depth
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.finished = None
+
+        self.dirs = 0
+        self.files = 0
+        self.matches = 0
+        self.errors = Counter()  # (тип ошибки, префикс пути) -> количество
+        self.listdir_time = 0.0
+        self.match_time = 0.0
+        self.emit_time = 0.0
+        self.slowest = []  # куча (время, путь) из top_n самых медленных папок
+
+    def prefix(self, path):
+        path = os.path.normpath(path)
+        rel = os.path.relpath(path, self.root) if self.root else path
+        if rel.startswith(".."):
+            return path
+        parts = [p for p in rel.split(os.sep) if p and p != "."]
+        return os.path.join(self.root, *parts[: self.prefix_depth])
+
+    def dir_scanned(self, path, seconds, files):
+        with self.lock:
+            self.dirs += 1
+            self.files += files
+            self.listdir_time += seconds
+            if len(self.slowest) < self.top_n:
+                heapq.heappush(self.slowest, (seconds, path))
+            elif seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (seconds, path))
+
+    def error(self, path, exc):
+        kind = "PermissionError" if isinstance(exc, PermissionError) else "OSError"
+        key = (kind, self.prefix(path))
+        with self.lock:
+            self.errors[key] += 1
+
+    def add_matches(self, n, match_time, emit_time):
+        # Поиск сдаёт совпадения и время пачкой на папку: метрики могут
+        # делить несколько поисков в разных потоках (finder.multiroot)
+        with self.lock:
+            self.matches += n
+            self.match_time += match_time
+            self.emit_time += emit_time
+
+    def finish(self):
+        self.finished = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def error_count(self):
+        return sum(self.errors.values())
+
+    def summary(self):
+        # Короткая строка для карточки статуса
+        return (
+            f"Папок: {self.dirs} · Файлов: {self.files} · Ошибок: {self.error_count()}\n"
+            f"listdir {self.listdir_time:.1f} с · сравнение {self.match_time:.1f} с · "
+            f"вывод {self.emit_time:.1f} с"
+        )
+
+    def to_dict(self):
+        with self.lock:
+            errors = [
+                {"type": kind, "prefix": prefix, "count": n}
+                for (kind, prefix), n in self.errors.most_common()
+            ]
+            slowest = [
+                {"path": p, "seconds": round(s, 6)}
+                for s, p in sorted(self.slowest, reverse=True)
+            ]
+            return {
+                "root": self.root,
+                "elapsed": round(self.elapsed, 6),
+                "dirs": self.dirs,
+                "files": self.files,
+                "matches": self.matches,
+                "errors": errors,
+                # listdir суммируется по всем потокам обхода и может
+                # превышать elapsed при параллельном обходе
+                "time": {
+                    "listdir": round(self.listdir_time, 6),
+                    "match": round(self.match_time, 6),
+                    "emit": round(self.emit_time, 6),
+                },
+                "slowest_dirs": slowest,
+            }
+
+    def export(self, path, extra=None):
+        data = self.to_dict()
+        if extra:
+            data.update(extra)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+# --- ПРОФИЛИРОВАНИЕ (ВКЛЮЧАЕТСЯ В settings.json) ---
+class ScanProfiler:
+    MODES = ("cprofile", "tracemalloc")
+
+    def __init__(self, mode, out_path=None):
+        self.mode = mode if mode in self.MODES else None
+        self.out_path = out_path
+        self.profile = None
+
+    def start(self):
+        if self.mode == "cprofile":
+            import cProfile
+
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        elif self.mode == "tracemalloc":
+            import tracemalloc
+
+            tracemalloc.start()
+
+    def stop(self):
+        # Возвращает данные для JSON-отчёта; cProfile пишет .prof рядом
+        if self.mode == "cprofile" and self.profile:
+            self.profile.disable()
+            import io
+            import pstats
+
+            if self.out_path:
+                self.profile.dump_stats(self.out_path)
+            buf = io.StringIO()
+            pstats.Stats(self.profile, stream=buf).sort_stats("cumulative").print_stats(15)
+            return {"cprofile": {"file": self.out_path, "top": buf.getvalue()}}
+        if self.mode == "tracemalloc":
+            import tracemalloc
+
+            snap = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            top = [str(s) for s in snap.statistics("lineno")[:15]]
+            return {"tracemalloc": {"current": current, "peak": peak, "top": top}}
+        return {}
+
+
+# --- ЗАМЕР ЗАПУСКА ОКНА ---
+# Фазы отмечаются по окончании: mark("тема") — время от прошлой отметки
+class StartupTimer:
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.last = self.t0
+        self.phases = []  # [(фаза, мс)]
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self.last) * 1000))
+        self.last = now
+
+    def add(self, phase, ms):
+        # Фаза из фонового потока: в отчёт попадает, но отсчёт не сдвигает
+        self.phases.append((phase, ms))
+
+    def total_ms(self):
+        return (self.last - self.t0) * 1000
+
+    def to_dict(self):
+        return {
+            "phases": [{"phase": p, "ms": round(ms, 2)} for p, ms in self.phases],
+            "total_ms": round(self.total_ms(), 2),
+        }
+
+    def report(self):
+        width = max((len(p) for p, _ in self.phases), default=0)
+        lines = [f"{p:<{width}}  {ms:8.1f} мс" for p, ms in self.phases]
+        lines.append(f"{'всего':<{width}}  {self.total_ms():8.1f} мс")
+        return "\n".join(lines)
+
+    def export(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
@@ -0,0 +1,179 @@
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+from .engine import Search
+from .index import is_under, norm_root
+from .walker import DEFAULT_WORKERS, OUT_QUEUE_SIZE, POLL_INTERVAL
+
+_DONE = object()
+
+
+def dedupe_roots(roots):
+    # Существующие папки без вложенных: /data/x не обходим, если выбран /data
+    out = []
+    for r in sorted({norm_root(r) for r in roots if os.path.isdir(r)}, key=len):
+        if not any(is_under(r, kept) for kept in out):
+            out.append(r)
+    return out
+
+
+def device_of(path):
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return None
+
+
+def group_by_device(roots):
+    # Устройство -> корни на нём; порядок корней сохраняется
+    lanes = OrderedDict()
+    for r in roots:
+        lanes.setdefault(device_of(r), []).append(r)
+    return list(lanes.values())
+
+
+# --- ПОИСК ПО НЕСКОЛЬКИМ КОРНЯМ ---
+# Один поток-«дорожка» на физическое устройство: разные диски обходятся
+# параллельно, а корни одного диска — по очереди, чтобы HDD не метался
+# между ними. Одновременно идёт не больше workers дорожек (остальные ждут
+# свободного потока), а потоки обхода делятся между ними поровну, так что
+# их общее число не превышает workers. Метрики общие: поиски дорожек сдают
+# их под замком, finish() — один раз здесь. Выдаёт (корень, строка)
+class MultiSearch:
+    def __init__(
+        self,
+        roots,
+        query,
+        deep=False,
+        workers=DEFAULT_WORKERS,
+        index=None,
+        stop=None,
+        on_progress=None,
+        metrics=None,
+        stat_filter=None,
+        on_idle=None,
+        rules=None,
+        archives=False,
+        throttle=None,
+    ):
+        self.roots = dedupe_roots(roots)
+        self.lanes = group_by_device(self.roots)
+        self.query = query
+        self.deep = deep
+        self.workers = max(1, workers)
+        self.index = index
+        self.stop = stop
+        self.on_progress = on_progress  # on_progress(корень, проверено)
+        self.metrics = metrics
+        self.stat_filter = stat_filter
+        self.rules = rules
+        self.archives = archives
+        self.throttle = throttle  # один на все дорожки: лимиты общие
+        self.on_idle = on_idle  # зовётся в потоке потребителя, пока выдачи нет
+        self.scanned = {r: 0 for r in self.roots}
+        self.found = 0
+        self.errors = {}  # корень -> текст ошибки
+
+    def stopped(self):
+        return bool(self.stop and self.stop())
+
+    def lane_count(self):
+        return max(1, min(len(self.lanes), self.workers))
+
+    def lane_workers(self):
+        return max(1, self.workers // self.lane_count())
+
+    def __iter__(self):
+        if not self.lanes:
+            return
+        out_q = queue.Queue(maxsize=OUT_QUEUE_SIZE)
+        halt = threading.Event()
+        workers = self.lane_workers()
+        waiting = queue.Queue()  # дорожки, которые ещё никто не взял
+        for roots in self.lanes:
+            waiting.put(roots)
+
+        def put(item):
+            while not halt.is_set():
+                try:
+                    out_q.put(item, timeout=POLL_INTERVAL)
+                    return
+                except queue.Full:
+                    pass
+
+        def progress(root):
+            def report(scanned):
+                self.scanned[root] = scanned
+                if self.on_progress:
+                    self.on_progress(root, scanned)
+
+            return report
+
+        def lane():
+            try:
+                while not halt.is_set():
+                    try:
+                        roots = waiting.get_nowait()
+                    except queue.Empty:
+                        return
+                    walk_lane(roots)
+            finally:
+                put(_DONE)
+
+        def walk_lane(roots):
+            for root in roots:
+                if halt.is_set():
+                    return
+                search = Search(
+                    root,
+                    self.query,
+                    self.deep,
+                    workers,
+                    self.index,
+                    stop=halt.is_set,
+                    on_progress=progress(root),
+                    metrics=self.metrics,
+                    stat_filter=self.stat_filter,
+                    rules=self.rules,
+                    archives=self.archives,
+                    throttle=self.throttle,
+                    finish_metrics=False,
+                )
+                try:
+                    for row in search:
+                        put((root, row))
+                except OSError as e:
+                    self.errors[root] = str(e)
+                self.scanned[root] = search.scanned
+
+        threads = [
+            threading.Thread(target=lane, daemon=True)
+            for _ in range(self.lane_count())
+        ]
+        for t in threads:
+            t.start()
+        running = len(threads)
+        try:
+            while running:
+                # Отмена одна на все корни: halt останавливает каждую дорожку
+                if self.stopped():
+                    return
+                try:
+                    item = out_q.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    if self.on_idle:
+                        self.on_idle()
+                    continue
+                if item is _DONE:
+                    running -= 1
+                    continue
+                self.found += 1
+                yield item
+        finally:
+            halt.set()
+            for t in threads:
+                t.join()
+            if self.metrics:
+                self.metrics.finish()
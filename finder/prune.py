@@ -0,0 +1,137 @@
+import fnmatch
+import json
+import os
+import re
+import threading
+from collections import Counter
+
+from .categories import CATEGORY_ALIASES
+
+PRUNE_KEY = "prune"
+HIDDEN_RULE = "скрытые/системные"
+DEPTH_RULE = "max_depth"
+ENTRIES_RULE = "max_entries"
+
+# Имена папок на Windows сравниваем без учёта регистра, как и файловая система
+_FLAGS = re.IGNORECASE if os.name == "nt" else 0
+
+
+def _alternation(patterns):
+    # Одна регулярка на все шаблоны: по lastgroup видно, какой сработал
+    if not patterns:
+        return None, {}
+    groups = {}
+    parts = []
+    for i, (label, rx) in enumerate(patterns):
+        name = f"r{i}"
+        groups[name] = label
+        parts.append(f"(?P<{name}>{rx})")
+    return re.compile("|".join(parts), _FLAGS), groups
+
+
+# --- ПРАВИЛА ОТСЕЧЕНИЯ ПАПОК ---
+# Компилируются один раз на поиск и проверяются на списке подпапок до
+# спуска в них. Шаблон со "/" сравнивается с полным путём, без — с именем
+class PruneRules:
+    def __init__(
+        self, exclude=(), exclude_regex=(), max_depth=None, max_entries=None, hidden=True
+    ):
+        self.hidden = hidden
+        self.max_depth = max_depth
+        self.max_entries = max_entries
+        names, paths = [], []
+        for pat in exclude:
+            target = paths if "/" in pat else names
+            target.append((pat, fnmatch.translate(pat)))
+        for pat in exclude_regex:
+            re.compile(pat)  # неверное выражение — ошибка сразу, а не в обходе
+            target = paths if "/" in pat else names
+            target.append(("re:" + pat, f".*?(?:{pat})"))
+        self.name_rx, self.name_groups = _alternation(names)
+        self.path_rx, self.path_groups = _alternation(paths)
+        self.custom = bool(names or paths or max_depth is not None or max_entries)
+        self.lock = threading.Lock()
+        self.counts = Counter()  # правило -> сколько папок отсечено
+
+    def count(self, label):
+        with self.lock:
+            self.counts[label] += 1
+
+    def match(self, name, path, depth):
+        # Название правила, отсекающего папку, или None
+        if self.hidden and (name.startswith(".") or "$" in name):
+            return HIDDEN_RULE
+        if self.max_depth is not None and depth > self.max_depth:
+            return DEPTH_RULE
+        if self.name_rx:
+            m = self.name_rx.match(name)
+            if m:
+                return self.name_groups[m.lastgroup]
+        if self.path_rx:
+            m = self.path_rx.match(path.replace(os.sep, "/"))
+            if m:
+                return self.path_groups[m.lastgroup]
+        return None
+
+    def pruned(self, name, path, depth):
+        label = self.match(name, path, depth)
+        if label:
+            self.count(label)
+        return label is not None
+
+    def fits_index(self, deep):
+        # Индекс строится с default_rules(deep) и дорезается через allows.
+        # Скрытых папок без deep в нём нет, а max_entries по пути не проверить —
+        # с такими правилами ответ из индекса был бы неверным
+        return (self.hidden or deep) and not self.max_entries
+
+    def allows(self, root, path):
+        # Для ответов из индекса: не лежит ли файл под отсечённой папкой.
+        # max_entries здесь не проверить — размер папки индекс не хранит
+        rel = os.path.relpath(os.path.dirname(path), root)
+        if rel == ".":
+            return True
+        cur = root
+        for depth, part in enumerate(rel.split(os.sep), 1):
+            cur = os.path.join(cur, part)
+            if self.pruned(part, cur, depth):
+                return False
+        return True
+
+    def report(self):
+        with self.lock:
+            return dict(self.counts.most_common())
+
+    def summary(self):
+        return " · ".join(f"{k}: {n}" for k, n in self.report().items())
+
+
+def default_rules(deep):
+    # Поведение без настроек: только скрытые и системные папки, и то не в deep
+    return PruneRules(hidden=not deep)
+
+
+def build_rules(config, category=None, deep=False):
+    # config — раздел "prune" из settings.json; категория может переопределить
+    # любые его ключи в "categories": {"эцп": {"exclude": []}, ...}
+    cfg = dict(config or {})
+    overrides = cfg.pop("categories", {}) or {}
+    if category is not None:
+        cfg.update(
+            overrides.get(category) or overrides.get(CATEGORY_ALIASES.get(category), {})
+        )
+    return PruneRules(
+        exclude=cfg.get("exclude", ()),
+        exclude_regex=cfg.get("exclude_regex", ()),
+        max_depth=cfg.get("max_depth"),
+        max_entries=cfg.get("max_entries"),
+        hidden=cfg.get("hidden", True) and not deep,
+    )
+
+
+def load_prune_config(settings_path):
+    try:
+        with open(settings_path, "r", encoding="utf-8") as f:
+            return json.load(f).get(PRUNE_KEY, {})
+    except (OSError, ValueError, AttributeError):
+        return {}
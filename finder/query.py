@@ -0,0 +1,247 @@
+import fnmatch
+import re
+
+
+GLOB_CHARS = "*?["
+REGEX_PREFIX = "re:"
+# Метасимволы, после которых литерал в регулярке перестаёт быть обязательным
+QUANTIFIERS = "?*{"
+
+
+def regex_literal(pattern):
+    # Самый длинный кусок текста, без которого регулярка совпасть не может.
+    # С "|" на любом уровне гарантий нет — фильтра не будет
+    if "|" in pattern:
+        return ""
+    runs, run = [], []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        lit = None
+        if c == "\\" and i + 1 < n:
+            nxt = pattern[i + 1]
+            i += 2
+            if not nxt.isalnum():
+                lit = nxt
+        elif c == "[":
+            j = pattern.find("]", i + 2)
+            i = n if j < 0 else j + 1
+        elif c == "(":
+            # Группа может быть необязательной — пропускаем её целиком
+            depth = 0
+            while i < n:
+                if pattern[i] == "\\":
+                    i += 2
+                    continue
+                if pattern[i] == "(":
+                    depth += 1
+                elif pattern[i] == ")":
+                    depth -= 1
+                    if depth == 0:
+                        i += 1
+                        break
+                i += 1
+        elif c in ".^$+)":
+            i += 1
+        elif c in QUANTIFIERS:
+            # Предыдущий символ мог встретиться ноль раз
+            if run:
+                run.pop()
+            if c == "{":
+                j = pattern.find("}", i)
+                i = n if j < 0 else j + 1
+            else:
+                i += 1
+        else:
+            lit = c
+            i += 1
+        if lit is not None and not (i < n and pattern[i] in QUANTIFIERS):
+            run.append(lit)
+        else:
+            if run:
+                runs.append("".join(run))
+            run = []
+    if run:
+        runs.append("".join(run))
+    return max(runs, key=len, default="").casefold()
+
+
+def split_terms(text):
+    # Пробел разделяет условия (И), "в кавычках" — одна фраза с пробелами
+    terms, buf, quoted = [], [], False
+    for c in text:
+        if c == '"':
+            if quoted or buf:
+                terms.append("".join(buf))
+                buf = []
+            quoted = not quoted
+        elif c.isspace() and not quoted:
+            if buf:
+                terms.append("".join(buf))
+                buf = []
+        else:
+            buf.append(c)
+    if buf:
+        terms.append("".join(buf))
+    return [t for t in terms if t]
+
+
+def _implied(term, terms):
+    kind, value = term
+    for k, v in terms:
+        if (k, v) == term:
+            return True
+        if kind == "sub" and k in ("sub", "prefix") and value in v:
+            return True
+        if kind == "prefix" and k == "prefix" and v.startswith(value):
+            return True
+    return False
+
+
+# --- СКОМПИЛИРОВАННЫЙ ЗАПРОС ---
+class Query:
+    def __init__(self, text, exts=()):
+        self.text = text.strip()
+        self.exts = [e.casefold() for e in exts]
+        self.literals = []  # обязательные подстроки (для фильтра индекса)
+        self.tests = []
+        self.terms = []  # (вид, значение) — для проверки сужения запроса
+        self.regex = None
+        self.plain = True  # только подстроки, без глобов, "^" и регулярок
+
+        text = self.text
+        if text.startswith(REGEX_PREFIX):
+            self.plain = False
+            self.regex = re.compile(text[len(REGEX_PREFIX) :], re.IGNORECASE)
+            self.terms.append(("re", self.regex.pattern))
+            lit = regex_literal(self.regex.pattern)
+            if lit:
+                self.literals.append(lit)
+                self.tests.append(self._contains(lit))
+            self.tests.append(self._regex_test(self.regex))
+        else:
+            for term in split_terms(text.casefold()):
+                self._add_term(term)
+
+        # Суффиксы с одной точкой проверяем одним поиском в множестве,
+        # составные (".tar.gz") — через str.endswith с кортежем
+        self.ext_set = None
+        self.ext_tuple = None
+        if self.exts:
+            if all(e.count(".") == 1 and e.startswith(".") for e in self.exts):
+                self.ext_set = frozenset(self.exts)
+            else:
+                self.ext_tuple = tuple(self.exts)
+
+        # Одна подстрока без расширений: lit in name.casefold() целиком
+        self.bare = (
+            self.literals[0]
+            if self.plain and len(self.literals) == 1 and not self.exts
+            else None
+        )
+        self.match = self._build()
+
+    def matches(self, names):
+        # Список match для имён подряд (finder.engine — по папке). Одна
+        # подстрока проверяется прямо в цикле, без вызова функции на имя
+        lit = self.bare
+        if lit is None:
+            return list(map(self.match, names))
+        if lit.isascii():
+            return [lit in n.casefold() for n in names]
+        # casefold ASCII-имени — тоже ASCII: подстроки не из ASCII в нём нет,
+        # и такие имена отсеиваются без casefold
+        return [not n.isascii() and lit in n.casefold() for n in names]
+
+    def narrows(self, other):
+        # True, если всё, что находит self, гарантированно находит и other:
+        # тогда ответ можно получить фильтрацией результатов other
+        if other.exts and (not self.exts or not set(self.exts) <= set(other.exts)):
+            return False
+        return all(_implied(t, self.terms) for t in other.terms)
+
+    def _contains(self, lit):
+        return lambda cf, name: lit in cf
+
+    def _regex_test(self, rx):
+        search = rx.search
+        return lambda cf, name: search(name) is not None
+
+    def _add_term(self, term):
+        if term.startswith("^") and len(term) > 1:
+            self.plain = False
+            prefix = term[1:]
+            self.terms.append(("prefix", prefix))
+            self.literals.append(prefix)
+            self.tests.append(lambda cf, name: cf.startswith(prefix))
+        elif any(c in term for c in GLOB_CHARS):
+            # Глоб сравнивается с именем целиком: "*.xls?"
+            self.plain = False
+            self.terms.append(("glob", term))
+            rx = re.compile(fnmatch.translate(term), re.DOTALL)
+            for part in re.split(r"[*?]|\[[^\]]*\]", term):
+                if part:
+                    self.literals.append(part)
+            match = rx.match
+            self.tests.append(lambda cf, name: match(cf) is not None)
+        else:
+            self.terms.append(("sub", term))
+            self.literals.append(term)
+            self.tests.append(self._contains(term))
+
+    def _build(self):
+        tests = self.tests
+        ext_set = self.ext_set
+        ext_tuple = self.ext_tuple
+
+        # Самый частый случай — одна подстрока и/или набор расширений
+        if self.plain and len(self.literals) <= 1:
+            lit = self.literals[0] if self.literals else ""
+            if ext_set is not None:
+
+                def match(name):
+                    cf = name.casefold()
+                    i = cf.rfind(".")
+                    return i >= 0 and cf[i:] in ext_set and lit in cf
+
+            elif ext_tuple is not None:
+
+                def match(name):
+                    cf = name.casefold()
+                    return cf.endswith(ext_tuple) and lit in cf
+
+            elif lit and not lit.isascii():
+
+                def match(name, lit=lit):
+                    return not name.isascii() and lit in name.casefold()
+
+            elif lit:
+
+                def match(name, lit=lit):
+                    return lit in name.casefold()
+
+            else:
+
+                def match(name):
+                    return True
+
+            return match
+
+        def match(name):
+            cf = name.casefold()
+            if ext_set is not None:
+                i = cf.rfind(".")
+                if i < 0 or cf[i:] not in ext_set:
+                    return False
+            elif ext_tuple is not None and not cf.endswith(ext_tuple):
+                return False
+            for t in tests:
+                if not t(cf, name):
+                    return False
+            return True
+
+        return match
+
+
+def compile_query(text, exts=()):
+    return Query(text, exts)
@@ -0,0 +1,177 @@
+import mmap
+import struct
+import sys
+import tempfile
+
+
+DEFAULT_MEMORY_BYTES = 256 * 1024 * 1024  # сверх этого — во временный файл
+FLUSH_BYTES = 1024 * 1024  # хвост после spill копится в памяти до 1 МБ
+
+# Запись на строку: смещение и длина имени, id префикса, размер, mtime
+REC = struct.Struct("<QIIqd")
+# Префикс — весь путь (имя в строке не совпадает с концом пути, например
+# "отчет.txt:12  строка" у поиска по содержимому)
+FULL_PATH = 1 << 31
+PREFIX_OVERHEAD = sys.getsizeof("") + 8 + 100  # строка, список, запись в dict
+# Имена с суррогатами от файловой системы должны вернуться как были
+ENCODING, ERRORS = "utf-8", "surrogatepass"
+
+
+# --- БУФЕР С ВЫГРУЗКОЙ НА ДИСК ---
+# Байты только на дописывание. До spill() всё в bytearray, после — во
+# временном файле, который читается через mmap; свежий хвост держится в
+# памяти и сбрасывается в файл кусками по FLUSH_BYTES
+class SpillBuffer:
+    def __init__(self):
+        self.mem = bytearray()  # всё содержимое, а после spill — хвост
+        self.file = None
+        self.flushed = 0  # байт уже в файле
+        self.map = None
+        self.mapped = 0
+
+    def __len__(self):
+        return self.flushed + len(self.mem)
+
+    @property
+    def spilled(self):
+        return self.file is not None
+
+    def append(self, data):
+        self.mem += data
+        if self.file is not None and len(self.mem) >= FLUSH_BYTES:
+            self._flush()
+
+    def spill(self):
+        if self.file is None:
+            self.file = tempfile.TemporaryFile(prefix="ffp_results_")
+            self._flush()
+
+    def _flush(self):
+        # Сбрасывается весь хвост, так что запись целиком либо в файле, либо в mem
+        self.file.write(self.mem)
+        self.flushed += len(self.mem)
+        self.mem = bytearray()
+
+    def _remap(self):
+        self.file.flush()
+        if self.map is not None:
+            self.map.close()
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.mapped = len(self.map)
+
+    def read(self, pos, n):
+        if pos >= self.flushed:
+            pos -= self.flushed
+            return self.mem[pos : pos + n]
+        if pos + n > self.mapped:
+            self._remap()
+        return self.map[pos : pos + n]
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+# --- КОМПАКТНОЕ ХРАНИЛИЩЕ РЕЗУЛЬТАТОВ ---
+# Последовательность строк (имя, путь, размер, mtime), как список кортежей,
+# но без объекта на строку: имена лежат подряд в одном буфере, записи
+# фиксированной длины — в другом, а папка (префикс пути) хранится один раз
+# на все свои файлы. Доступ по номеру — O(1); при превышении memory_bytes
+# оба буфера уходят во временный файл
+class ResultStore:
+    def __init__(self, rows=(), memory_bytes=DEFAULT_MEMORY_BYTES):
+        self.memory_bytes = memory_bytes
+        self.prefixes = []
+        self.prefix_ids = {}
+        self.prefix_bytes = 0
+        self.names = SpillBuffer()
+        self.recs = SpillBuffer()
+        self.count = 0
+        self.extend(rows)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def spilled(self):
+        return self.recs.spilled
+
+    @property
+    def nbytes(self):
+        # Полный объём данных, включая выгруженное на диск
+        return len(self.names) + len(self.recs) + self.prefix_bytes
+
+    @property
+    def resident_bytes(self):
+        return len(self.names.mem) + len(self.recs.mem) + self.prefix_bytes
+
+    def _prefix(self, prefix):
+        pid = self.prefix_ids.get(prefix)
+        if pid is None:
+            pid = len(self.prefixes)
+            self.prefixes.append(prefix)
+            self.prefix_ids[prefix] = pid
+            self.prefix_bytes += len(prefix) + PREFIX_OVERHEAD
+        return pid
+
+    def extend(self, rows):
+        # Пакет собирается в списки и дописывается в буферы одним куском
+        pack = REC.pack
+        prefix = self._prefix
+        ids = self.prefix_ids
+        off = len(self.names)
+        names, recs = [], []
+        for name, path, size, mtime in rows:
+            if name and path.endswith(name):
+                head = path[: len(path) - len(name)]
+                pid = ids.get(head)
+                if pid is None:
+                    pid = prefix(head)
+            else:
+                pid = prefix(path) | FULL_PATH
+            data = name.encode(ENCODING, ERRORS)
+            recs.append(pack(off, len(data), pid, size, mtime))
+            names.append(data)
+            off += len(data)
+        if not recs:
+            return
+        self.names.append(b"".join(names))
+        self.recs.append(b"".join(recs))
+        self.count += len(recs)
+        if not self.spilled and self.resident_bytes > self.memory_bytes:
+            self.spill()
+
+    def append(self, row):
+        self.extend((row,))
+
+    def spill(self):
+        self.names.spill()
+        self.recs.spill()
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        recs = self.recs
+        pos = i * REC.size
+        if pos >= recs.flushed:
+            off, n, pid, size, mtime = REC.unpack_from(recs.mem, pos - recs.flushed)
+        else:
+            off, n, pid, size, mtime = REC.unpack(recs.read(pos, REC.size))
+        name = self.names.read(off, n).decode(ENCODING, ERRORS)
+        if pid & FULL_PATH:
+            return name, self.prefixes[pid ^ FULL_PATH], size, mtime
+        return name, self.prefixes[pid] + name, size, mtime
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def close(self):
+        self.names.close()
+        self.recs.close()
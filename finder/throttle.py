@@ -0,0 +1,189 @@
+import os
+import sys
+import threading
+import time
+
+
+DEFAULT_FILES_PER_S = 2000
+DEFAULT_DIRS_PER_S = 200
+NICE_LEVEL = 10
+
+# Задержка listdir (скользящее среднее) выросла вдвое против лучшей
+# замеченной — диск занят кем-то ещё, снижаем темп; упала — возвращаем
+LATENCY_ALPHA = 0.2
+BACKOFF_RATIO = 2.0
+LATENCY_FLOOR = 0.005  # до 5 мс на папку — не повод тормозить
+BACKOFF_FACTOR = 0.5
+RECOVER_FACTOR = 1.1
+MIN_SCALE = 0.05
+ADJUST_INTERVAL = 0.5
+
+# ioprio_set(IOPRIO_WHO_PROCESS, 0, ...) — для вызывающего потока.
+# Низший уровень best-effort, а не класс idle: idle на загруженном
+# сервере может не получить диск совсем
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_BE = 2
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_LOWEST = 7
+SYS_IOPRIO_SET = {
+    "x86_64": 251,
+    "amd64": 251,
+    "i386": 289,
+    "i686": 289,
+    "aarch64": 30,
+    "arm64": 30,
+    "armv7l": 314,
+    "ppc64le": 273,
+    "s390x": 282,
+}
+
+
+def set_io_priority_low():
+    if not sys.platform.startswith("linux"):
+        return False
+    # ctypes и platform нужны только фоновому обходу — не при запуске
+    import ctypes
+    import platform
+
+    nr = SYS_IOPRIO_SET.get(platform.machine().lower())
+    if nr is None:
+        return False
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        prio = (IOPRIO_CLASS_BE << IOPRIO_CLASS_SHIFT) | IOPRIO_LOWEST
+        return libc.syscall(nr, IOPRIO_WHO_PROCESS, 0, prio) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+def lower_priority():
+    # На Linux nice и ioprio — свойства потока, поэтому зовётся в каждом
+    # потоке обхода. Уровень задаётся абсолютно: потоки, унаследовавшие
+    # его от родителя, не уходят ещё ниже. Возвращает то, что удалось.
+    # На macOS и BSD nice действует на весь процесс и обратно не поднять —
+    # окно и все следующие поиски остались бы медленными, там не трогаем
+    applied = []
+    if sys.platform.startswith("linux") and hasattr(os, "nice"):
+        try:
+            current = os.nice(0)
+            if current < NICE_LEVEL:
+                os.nice(NICE_LEVEL - current)
+            applied.append("nice")
+        except OSError:
+            pass
+    if set_io_priority_low():
+        applied.append("ioprio")
+    return applied
+
+
+# --- ФОНОВЫЙ РЕЖИМ ОБХОДА ---
+# Ограничивает число открытых папок и просмотренных файлов в секунду
+# (общие на все потоки обхода) и снижает темп, когда listdir замедляется.
+# Обход не останавливается, а только делает паузы
+class Throttle:
+    def __init__(
+        self,
+        files_per_s=DEFAULT_FILES_PER_S,
+        dirs_per_s=DEFAULT_DIRS_PER_S,
+        adaptive=True,
+    ):
+        self.files_per_s = files_per_s
+        self.dirs_per_s = dirs_per_s
+        self.adaptive = adaptive
+        self.lock = threading.Lock()
+        self.next_dir = 0.0  # раньше этого времени новую папку не открываем
+        self.next_files = 0.0
+        self.scale = 1.0  # доля лимитов; снижается при росте задержки
+        self.latency = None
+        self.baseline = None
+        self.last_adjust = 0.0
+        self.priority = set()  # что удалось: nice, ioprio
+        self.dirs = 0
+        self.files = 0
+        self.slept = 0.0
+        self.backoffs = 0
+
+    def enter_thread(self):
+        with self.lock:
+            self.priority.update(lower_priority())
+
+    def _reserve(self, attr, cost):
+        # Место на шкале времени: сколько подождать до своей очереди
+        now = time.monotonic()
+        start = max(getattr(self, attr), now)
+        setattr(self, attr, start + cost / self.scale)
+        return start - now
+
+    def before_dir(self):
+        if not self.dirs_per_s:
+            return 0.0
+        with self.lock:
+            return self._reserve("next_dir", 1.0 / self.dirs_per_s)
+
+    def after_dir(self, seconds, files):
+        # seconds — время listdir; возвращает паузу за просмотренные файлы
+        with self.lock:
+            self.dirs += 1
+            self.files += files
+            if self.adaptive:
+                self._adapt(seconds)
+            if not self.files_per_s or not files:
+                return 0.0
+            return self._reserve("next_files", files / self.files_per_s)
+
+    def _adapt(self, seconds):
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += LATENCY_ALPHA * (seconds - self.latency)
+        if self.baseline is None or self.latency < self.baseline:
+            self.baseline = self.latency
+        now = time.monotonic()
+        if now - self.last_adjust < ADJUST_INTERVAL:
+            return
+        self.last_adjust = now
+        if self.latency > max(self.baseline * BACKOFF_RATIO, LATENCY_FLOOR):
+            if self.scale > MIN_SCALE:
+                self.backoffs += 1
+            self.scale = max(MIN_SCALE, self.scale * BACKOFF_FACTOR)
+        else:
+            self.scale = min(1.0, self.scale * RECOVER_FACTOR)
+
+    def slept_for(self, seconds):
+        with self.lock:
+            self.slept += seconds
+
+    def summary(self):
+        limits = []
+        if self.dirs_per_s:
+            limits.append(f"{self.dirs_per_s} папок/с")
+        if self.files_per_s:
+            limits.append(f"{self.files_per_s} файлов/с")
+        text = "Фоновый режим: " + (" · ".join(limits) or "без лимитов")
+        text += f" · темп {self.scale:.0%} · пауз {self.slept:.1f} с"
+        if self.backoffs:
+            text += f" · замедлений {self.backoffs}"
+        if self.priority:
+            text += f" · {', '.join(sorted(self.priority))}"
+        return text
+
+    def to_dict(self):
+        return {
+            "files_per_s": self.files_per_s,
+            "dirs_per_s": self.dirs_per_s,
+            "scale": round(self.scale, 3),
+            "slept_s": round(self.slept, 3),
+            "backoffs": self.backoffs,
+            "latency_ms": round((self.latency or 0) * 1000, 3),
+            "priority": sorted(self.priority),
+        }
+
+
+def throttle_from_settings(cfg):
+    # Раздел "background_scan" из settings.json
+    cfg = cfg or {}
+    return Throttle(
+        cfg.get("files_per_s", DEFAULT_FILES_PER_S),
+        cfg.get("dirs_per_s", DEFAULT_DIRS_PER_S),
+        cfg.get("adaptive", True),
+    )
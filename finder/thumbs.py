@@ -0,0 +1,198 @@
+import hashlib
+import os
+import shutil
+import statistics
+import subprocess
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+THUMB_DIR = "thumbs"  # рядом с index.db
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+THUMB_PX = 96  # сторона миниатюры в кэше; окно рисует её меньше
+VIDEO_TIMEOUT = 10  # секунд на кадр из ffmpeg
+LATENCY_SAMPLES = 500
+
+
+def thumb_key(path, size, mtime, px=THUMB_PX):
+    # Адрес миниатюры — путь, размер и mtime: изменённый файл получает новый
+    # ключ, а прежняя миниатюра просто доживает до вытеснения
+    raw = f"{path}\0{size}\0{mtime!r}\0{px}".encode("utf-8", "surrogatepass")
+    return hashlib.sha1(raw).hexdigest()
+
+
+# --- КЭШ МИНИАТЮР НА ДИСКЕ ---
+# Файлы <ключ>.png по подпапкам из первых двух символов ключа. Порядок LRU
+# держится в памяти (ключ -> размер) и при первом обращении строится по
+# mtime файлов; попадание обновляет mtime, так что порядок переживает
+# перезапуск. Сверх max_bytes удаляются самые давние
+class ThumbCache:
+    def __init__(self, directory=THUMB_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = None  # OrderedDict, читается с диска при первом get/put
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key[:2], key + ".png")
+
+    def _load(self):
+        found = []
+        try:
+            subdirs = list(os.scandir(self.directory))
+        except OSError:
+            subdirs = []
+        for sub in subdirs:
+            if not sub.is_dir():
+                continue
+            try:
+                for e in os.scandir(sub.path):
+                    if e.name.endswith(".png"):
+                        st = e.stat()
+                        found.append((st.st_mtime, e.name[:-4], st.st_size))
+            except OSError:
+                continue
+        found.sort()
+        self.entries = OrderedDict((key, size) for _, key, size in found)
+        self.size = sum(size for _, _, size in found)
+        self._evict()
+
+    def get(self, key):
+        with self.lock:
+            if self.entries is None:
+                self._load()
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+        path = self.path_for(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            # Файл удалили снаружи или вытеснили параллельно
+            with self.lock:
+                self.size -= self.entries.pop(key, 0)
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        path = self.path_for(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self.lock:
+            if self.entries is None:
+                self._load()
+            self.size += len(data) - self.entries.pop(key, 0)
+            self.entries[key] = len(data)
+            self._evict()
+
+    def _evict(self):
+        while self.size > self.max_bytes and self.entries:
+            key, size = self.entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
+
+    def report(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries or ()),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+            }
+
+
+def video_frame(path, px=THUMB_PX, timeout=VIDEO_TIMEOUT):
+    # Кадр через ffmpeg, если он установлен: PNG-байты или None. Сначала
+    # секунда от начала (первый кадр часто чёрный), для коротких — сам первый
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return None
+    scale = f"scale={px}:{px}:force_original_aspect_ratio=decrease"
+    for seek in (["-ss", "1"], []):
+        cmd = [ffmpeg, "-v", "error", *seek, "-i", path, "-frames:v", "1"]
+        cmd += ["-vf", scale, "-f", "image2pipe", "-vcodec", "png", "-"]
+        try:
+            out = subprocess.run(cmd, capture_output=True, timeout=timeout).stdout
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if out:
+            return out
+    return None
+
+
+# --- МИНИАТЮРЫ: КЭШ + ДЕКОДИРОВАНИЕ ---
+# decode_image(путь, px) -> PNG-байты или None даёт окно (QImageReader
+# умеет читать JPEG сразу в уменьшенном виде); видео — через ffmpeg.
+# Вызывается из потоков пула, поэтому счётчики под замком
+class Thumbnailer:
+    def __init__(self, decode_image, cache=None, video_exts=(), px=THUMB_PX):
+        self.decode_image = decode_image
+        self.cache = cache or ThumbCache()
+        self.video_exts = frozenset(video_exts)
+        self.px = px
+        self.lock = threading.Lock()
+        self.latency = deque(maxlen=LATENCY_SAMPLES)  # мс на декодирование
+        self.decoded = 0
+        self.failed = 0
+
+    def thumbnail(self, path, size, mtime):
+        key = thumb_key(path, size, mtime, self.px)
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+        t0 = time.perf_counter()
+        try:
+            if os.path.splitext(path)[1].lower() in self.video_exts:
+                data = video_frame(path, self.px)
+            else:
+                data = self.decode_image(path, self.px)
+        except Exception:
+            data = None
+        ms = (time.perf_counter() - t0) * 1000
+        with self.lock:
+            self.latency.append(ms)
+            if data:
+                self.decoded += 1
+            else:
+                self.failed += 1
+        if data:
+            self.cache.put(key, data)
+        return data
+
+    def report(self):
+        with self.lock:
+            lat = sorted(self.latency)
+            out = {"decoded": self.decoded, "failed": self.failed}
+        if lat:
+            out["decode_ms"] = {
+                "median": round(statistics.median(lat), 2),
+                "p95": round(lat[min(len(lat) - 1, int(len(lat) * 0.95))], 2),
+                "max": round(lat[-1], 2),
+            }
+        out["cache"] = self.cache.report()
+        return out
@@ -0,0 +1,233 @@
+import heapq
+import os
+import time
+from collections import deque
+from operator import attrgetter
+
+from .walker import walk_files
+
+
+# Законченная папка меньше порога остаётся только в сумме родителя —
+# память не растёт с числом мелких папок в глубоком дереве
+DEFAULT_MIN_BYTES = 1024 * 1024
+SNAPSHOT_NODES = 2000  # узлов в одном снимке для окна
+SNAPSHOT_CHILDREN = 50  # самых тяжёлых подпапок на узел
+PROGRESS_EVERY = 20  # папок между вызовами on_progress
+
+_by_bytes = attrgetter("bytes")
+
+
+def entry_usage(entry):
+    # (байт на диске, ключ inode или None) из stat, который DirEntry уже
+    # получил при scandir (на Unix — один lstat на файл). Занятое место
+    # считается по блокам, как у du; на Windows блоков нет — берётся размер,
+    # а st_nlink там 0, так что жёсткие ссылки не сверяются
+    try:
+        st = entry.stat(follow_symlinks=False)
+    except OSError:
+        return 0, None
+    blocks = getattr(st, "st_blocks", None)
+    size = blocks * 512 if blocks is not None else st.st_size
+    key = (st.st_dev, st.st_ino) if st.st_nlink > 1 else None
+    return size, key
+
+
+class DirNode:
+    __slots__ = ("path", "parent", "children", "bytes", "files", "pending", "folded")
+
+    def __init__(self, path, parent=None):
+        self.path = path
+        self.parent = parent
+        self.children = {}  # путь -> DirNode, только оставленные в дереве
+        self.bytes = 0  # всё поддерево, включая свёрнутые подпапки
+        self.files = 0
+        self.pending = 0  # подпапки, обход которых ещё не закончен
+        self.folded = 0  # мелкие подпапки, оставшиеся только в сумме
+
+
+# --- ЗАНЯТОЕ МЕСТО ПО ПАПКАМ ---
+# Тот же обход (finder.walker), что и у поиска: размеры файлов папки сразу
+# добавляются ей и всем предкам, поэтому самые тяжёлые ветви видны по ходу
+# обхода. Папка закончена, когда закончены все её подпапки; законченная
+# папка меньше min_bytes сворачивается в родителя
+class DiskUsage:
+    def __init__(
+        self,
+        root,
+        deep=False,
+        workers=1,
+        stop=None,
+        on_progress=None,
+        metrics=None,
+        rules=None,
+        throttle=None,
+        min_bytes=DEFAULT_MIN_BYTES,
+    ):
+        self.root = root
+        self.deep = deep
+        self.workers = workers
+        self.stop = stop
+        self.on_progress = on_progress
+        self.metrics = metrics
+        self.rules = rules
+        self.throttle = throttle
+        self.min_bytes = min_bytes
+        self.tree = None
+        self.open = {}  # путь -> узел, чьё поддерево ещё обходится
+        self.seen = set()  # (st_dev, st_ino) файлов с несколькими ссылками
+        self.dirs = 0
+        self.files = 0
+        self.hardlinks = 0
+        self.kept = 1  # узлов в дереве сейчас
+
+    def stopped(self):
+        return bool(self.stop and self.stop())
+
+    def run(self, on_update=None, interval=0.5):
+        # on_update(снимок) — не чаще interval, для живого дерева в окне
+        if not os.path.isdir(self.root):
+            raise FileNotFoundError(self.root)
+        self.tree = DirNode(self.root)
+        self.open = {self.root: self.tree}
+        clock = time.monotonic
+        last = clock()
+        try:
+            for path, files, dirs in walk_files(
+                self.root,
+                self.deep,
+                self.stop,
+                self.workers,
+                self.metrics,
+                self.rules,
+                self.throttle,
+                with_dirs=True,
+            ):
+                if self.stopped():
+                    break
+                self._add(path, files, dirs)
+                if not self.dirs % PROGRESS_EVERY:
+                    if self.on_progress:
+                        self.on_progress(self.files)
+                    if on_update and clock() - last >= interval:
+                        on_update(self.snapshot())
+                        last = clock()
+        finally:
+            if self.metrics:
+                self.metrics.finish()
+        return self.tree
+
+    def _add(self, path, files, dirs):
+        node = self.open.get(path)
+        if node is None:
+            return
+        self.dirs += 1
+        seen = self.seen
+        size = count = 0
+        for entry in files:
+            b, key = entry_usage(entry)
+            if key is not None:
+                if key in seen:
+                    self.hardlinks += 1
+                    continue
+                seen.add(key)
+            size += b
+            count += 1
+        self.files += count
+        p = node
+        while p is not None:
+            p.bytes += size
+            p.files += count
+            p = p.parent
+        for d in dirs:
+            child = DirNode(d, node)
+            node.children[d] = child
+            self.open[d] = child
+        self.kept += len(dirs)
+        node.pending = len(dirs)
+        if not dirs:
+            self._finish(node)
+
+    def _finish(self, node):
+        # Закрываем папку и всех предков, у которых она была последней
+        while node is not None:
+            del self.open[node.path]
+            parent = node.parent
+            if parent is None:
+                return
+            if node.bytes < self.min_bytes:
+                del parent.children[node.path]
+                parent.folded += 1 + node.folded
+                self.kept -= 1 + self._count(node)
+            parent.pending -= 1
+            if parent.pending:
+                return
+            node = parent
+
+    def _count(self, node):
+        n, stack = 0, list(node.children.values())
+        while stack:
+            c = stack.pop()
+            n += 1
+            stack.extend(c.children.values())
+        return n
+
+    def snapshot(self, max_nodes=SNAPSHOT_NODES, max_children=SNAPSHOT_CHILDREN):
+        # Вложенные списки [путь, байт, файлов, свёрнуто, закончена, дети]:
+        # сначала верхние уровни, подпапки — по убыванию размера
+        if self.tree is None:
+            return None
+        open_ = self.open
+
+        def item(node):
+            return [
+                node.path,
+                node.bytes,
+                node.files,
+                node.folded,
+                node.path not in open_,
+                [],
+            ]
+
+        top = item(self.tree)
+        queue = deque([(self.tree, top)])
+        budget = max_nodes - 1
+        while queue and budget > 0:
+            node, out = queue.popleft()
+            kids = heapq.nlargest(
+                min(max_children, budget), node.children.values(), key=_by_bytes
+            )
+            for k in kids:
+                child = item(k)
+                out[5].append(child)
+                queue.append((k, child))
+            budget -= len(kids)
+        return top
+
+    def walk(self):
+        # (глубина, узел) сверху вниз, подпапки по убыванию размера
+        if self.tree is None:
+            return
+        stack = [(0, self.tree)]
+        while stack:
+            depth, node = stack.pop()
+            yield depth, node
+            kids = sorted(node.children.values(), key=_by_bytes)
+            stack.extend((depth + 1, k) for k in kids)
+
+    def summary(self):
+        total = self.tree.bytes if self.tree else 0
+        mb = total / 1024 / 1024
+        text = f"Занято: {mb:.1f} МБ · папок: {self.dirs} · файлов: {self.files}"
+        if self.hardlinks:
+            text += f" · повторных жёстких ссылок: {self.hardlinks}"
+        return text + f" · в дереве: {self.kept}"
+
+    def to_dict(self):
+        return {
+            "bytes": self.tree.bytes if self.tree else 0,
+            "dirs": self.dirs,
+            "files": self.files,
+            "hardlinks_skipped": self.hardlinks,
+            "nodes_kept": self.kept,
+            "min_bytes": self.min_bytes,
+        }
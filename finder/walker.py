@@ -0,0 +1,193 @@
+import os
+import queue
+import threading
+import time
+
+from .prune import ENTRIES_RULE, default_rules
+
+
+# Обход упирается в задержку каждого listdir (сеть, HDD), поэтому потоков
+# больше, чем ядер: большую часть времени они ждут ввода-вывода
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+OUT_QUEUE_SIZE = 256
+POLL_INTERVAL = 0.05
+
+_DONE = object()
+
+
+# --- ЧТЕНИЕ ОДНОЙ ПАПКИ ---
+def scan_dir(path, rules, metrics=None, depth=0):
+    # Один os.scandir на папку: тип записи берём из DirEntry без лишних stat.
+    # Подпапки проверяются правилами (finder.prune) до спуска в них
+    dirs, files = [], []
+    t0 = time.perf_counter() if metrics else 0
+    limit = rules.max_entries if depth else None
+    try:
+        with os.scandir(path) as it:
+            for n, e in enumerate(it, 1):
+                if limit and n > limit:
+                    # Слишком большая папка: дочитывать её незачем
+                    rules.count(ENTRIES_RULE)
+                    dirs, files = [], []
+                    break
+                try:
+                    is_dir = e.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    # Как os.walk(followlinks=False): ссылки на папки не раскрываем
+                    if not e.is_symlink() and not rules.pruned(e.name, e.path, depth + 1):
+                        dirs.append(e.path)
+                else:
+                    files.append(e)
+    except OSError as exc:
+        if metrics:
+            metrics.error(path, exc)
+    if metrics:
+        metrics.dir_scanned(path, time.perf_counter() - t0, len(files))
+    return dirs, files
+
+
+def _pause(seconds, stop):
+    # Пауза фонового режима, прерываемая остановкой поиска
+    end = time.monotonic() + seconds
+    while not (stop and stop()):
+        left = end - time.monotonic()
+        if left <= 0:
+            return
+        time.sleep(min(left, POLL_INTERVAL))
+
+
+def throttled_scan(path, rules, metrics, depth, throttle, sleep):
+    # scan_dir с паузами finder.throttle.Throttle до и после чтения папки
+    delay = throttle.before_dir()
+    if delay > 0:
+        sleep(delay)
+        throttle.slept_for(delay)
+    t0 = time.perf_counter()
+    dirs, files = scan_dir(path, rules, metrics, depth)
+    delay = throttle.after_dir(time.perf_counter() - t0, len(files))
+    if delay > 0:
+        sleep(delay)
+        throttle.slept_for(delay)
+    return dirs, files
+
+
+# --- ПОСЛЕДОВАТЕЛЬНЫЙ ОБХОД ---
+def _walk_serial(root, rules, stop, metrics=None, throttle=None, with_dirs=False):
+    if throttle:
+        throttle.enter_thread()
+    stack = [(root, 0)]
+    while stack:
+        if stop and stop():
+            return
+        path, depth = stack.pop()
+        if throttle:
+            dirs, files = throttled_scan(
+                path, rules, metrics, depth, throttle, lambda s: _pause(s, stop)
+            )
+        else:
+            dirs, files = scan_dir(path, rules, metrics, depth)
+        stack.extend((d, depth + 1) for d in reversed(dirs))
+        yield (path, files, dirs) if with_dirs else (path, files)
+
+
+# --- ПАРАЛЛЕЛЬНЫЙ ОБХОД ---
+class ParallelWalker:
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.workers = max(1, workers)
+
+    def walk(self, root, rules, stop=None, metrics=None, throttle=None, with_dirs=False):
+        dirs_q = queue.Queue()
+        out_q = queue.Queue(maxsize=OUT_QUEUE_SIZE)
+        halt = threading.Event()
+        lock = threading.Lock()
+        pending = [1]  # папки в очереди или в работе
+        dirs_q.put((root, 0))
+
+        def put(item):
+            # Потребитель мог уйти — не висим на полной очереди вечно
+            while not halt.is_set():
+                try:
+                    out_q.put(item, timeout=POLL_INTERVAL)
+                    return
+                except queue.Full:
+                    pass
+
+        def worker():
+            if throttle:
+                throttle.enter_thread()
+            while not halt.is_set():
+                try:
+                    item = dirs_q.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    return
+                path, depth = item
+                if throttle:
+                    dirs, files = throttled_scan(
+                        path, rules, metrics, depth, throttle, halt.wait
+                    )
+                else:
+                    dirs, files = scan_dir(path, rules, metrics, depth)
+                with lock:
+                    pending[0] += len(dirs)
+                # Папка выдаётся раньше, чем её подпапки попадут в работу:
+                # потребитель всегда видит родителя до детей
+                put((path, files, dirs) if with_dirs else (path, files))
+                for d in dirs:
+                    dirs_q.put((d, depth + 1))
+                with lock:
+                    pending[0] -= 1
+                    done = pending[0] == 0
+                if done:
+                    put(_DONE)
+
+        threads = [
+            threading.Thread(target=worker, daemon=True) for _ in range(self.workers)
+        ]
+        for t in threads:
+            t.start()
+        try:
+            while True:
+                if stop and stop():
+                    return
+                try:
+                    item = out_q.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            halt.set()
+            for _ in threads:
+                dirs_q.put(None)  # будим ждущих потоков сразу
+            for t in threads:
+                t.join()
+
+
+def walk_files(
+    root,
+    deep=False,
+    stop=None,
+    workers=1,
+    metrics=None,
+    rules=None,
+    throttle=None,
+    with_dirs=False,
+):
+    # Выдаёт (папка, [DirEntry файлов]); workers > 1 — параллельный обход.
+    # rules — finder.prune.PruneRules; без них отсекаются только скрытые
+    # и системные папки (и то не в режиме deep). throttle —
+    # finder.throttle.Throttle для фонового режима. with_dirs — третьим
+    # полем пути подпапок, в которые обход спустится (родитель всегда
+    # выдаётся раньше детей)
+    if rules is None:
+        rules = default_rules(deep)
+    if workers > 1:
+        return ParallelWalker(workers).walk(
+            root, rules, stop, metrics, throttle, with_dirs
+        )
+    return _walk_serial(root, rules, stop, metrics, throttle, with_dirs)
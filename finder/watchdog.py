@@ -0,0 +1,132 @@
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+BEAT_INTERVAL = 0.05  # как часто цикл событий отмечается (QTimer в окне)
+DEFAULT_THRESHOLD_MS = 250
+KEEP_STALLS = 50
+# Кадры стека из этих файлов считаются "нашими": по ним видно обработчик
+OWN_FILES = ("main.py", os.sep + "finder" + os.sep)
+
+
+def where(frame):
+    # Самый внешний и самый внутренний кадры нашего кода в стеке потока GUI:
+    # первый — обработчик Qt, второй — место, где он стоит. Кадр модуля
+    # (app.exec() в main.py) есть в любом стеке и ничего не говорит
+    own = [
+        f
+        for f in traceback.extract_stack(frame)
+        if f.name != "<module>"
+        and (f.filename.endswith(OWN_FILES[0]) or OWN_FILES[1] in f.filename)
+    ]
+    if not own:
+        return "вне кода программы (Qt)"
+    outer, inner = own[0], own[-1]
+    text = f"{outer.name} ({os.path.basename(outer.filename)}:{outer.lineno})"
+    if inner is not outer:
+        text += f" → {inner.name} ({os.path.basename(inner.filename)}:{inner.lineno})"
+    return text
+
+
+# --- СТОРОЖ ЦИКЛА СОБЫТИЙ ---
+# Поток GUI зовёт beat() по таймеру каждые interval секунд. Запаздывание
+# таймера — задержка цикла событий. Если отметки нет дольше порога, сторож
+# из своего потока снимает стек потока GUI (sys._current_frames) — так видно
+# обработчик, который держит окно, — а по возвращении пишет зависание
+# целиком: длительность и место
+class StallWatchdog:
+    def __init__(
+        self,
+        threshold_ms=DEFAULT_THRESHOLD_MS,
+        interval=BEAT_INTERVAL,
+        log_path=None,
+        thread_id=None,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self.log_path = log_path
+        self.thread_id = thread_id or threading.get_ident()
+        self.lock = threading.Lock()
+        self.last_beat = time.monotonic()
+        self.pending = None  # место зависания, снятое сторожем
+        self.stalls = deque(maxlen=KEEP_STALLS)
+        self.unlogged = []  # пишет в журнал поток сторожа, не поток GUI
+        self.stall_count = 0
+        self.max_lag_ms = 0.0
+        self.beats = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.last_beat = time.monotonic()
+        self.thread = threading.Thread(target=self._watch, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def beat(self):
+        now = time.monotonic()
+        with self.lock:
+            gap = now - self.last_beat
+            self.last_beat = now
+            self.beats += 1
+            place, self.pending = self.pending, None
+        lag_ms = max(0.0, gap - self.interval) * 1000
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        if gap >= self.threshold:
+            # Обработчик, держащий GIL, не даёт сторожу проснуться — тогда
+            # место неизвестно, но длительность всё равно видна
+            self._record(gap * 1000, place or "не снято (обработчик держал GIL)")
+
+    def _watch(self):
+        while not self.stopped.wait(self.interval):
+            self._flush()
+            with self.lock:
+                late = time.monotonic() - self.last_beat >= self.threshold
+                if not late or self.pending is not None:
+                    continue
+            frame = sys._current_frames().get(self.thread_id)
+            place = where(frame) if frame is not None else "поток GUI не найден"
+            with self.lock:
+                # Отметка могла прийти, пока снимали стек
+                if time.monotonic() - self.last_beat >= self.threshold:
+                    self.pending = place
+        self._flush()
+
+    def _record(self, ms, place):
+        entry = {"at": time.strftime("%H:%M:%S"), "ms": round(ms, 1), "where": place}
+        with self.lock:
+            self.stalls.append(entry)
+            self.stall_count += 1
+            self.unlogged.append(entry)
+
+    def _flush(self):
+        with self.lock:
+            entries, self.unlogged = self.unlogged, []
+        if not entries:
+            return
+        lines = [
+            f"{e['at']} окно не отвечало {e['ms']:.0f} мс: {e['where']}"
+            for e in entries
+        ]
+        print("\n".join(lines), file=sys.stderr)
+        if self.log_path:
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+            except OSError:
+                pass
+
+    def report(self):
+        with self.lock:
+            recent = list(self.stalls)
+        return {
+            "threshold_ms": round(self.threshold * 1000),
+            "stalls": self.stall_count,
+            "max_loop_lag_ms": round(self.max_lag_ms, 1),
+            "recent": recent,
+        }
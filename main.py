@@ -1,7 +1,15 @@
+import time
+
+# Отсчёт запуска — до импорта Qt, чтобы он тоже попал в --startup-profile
+STARTUP_T0 = time.perf_counter()
+
 import sys
 import os
 import json
+import multiprocessing
+import re
 import subprocess
+from collections import OrderedDict
 from PyQt6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -12,6 +20,9 @@ from PyQt6.QtWidgets import (
     QLabel,
     QListWidget,
     QListWidgetItem,
+    QListView,
+    QStyledItemDelegate,
+    QStyle,
     QPushButton,
     QFrame,
     QDialog,
@@ -20,9 +31,89 @@ from PyQt6.QtWidgets import (
     QMenu,
     QMessageBox,
     QFileDialog,
+    QComboBox,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QHeaderView,
+)
+from PyQt6.QtCore import (
+    Qt,
+    QThread,
+    pyqtSignal,
+    QTimer,
+    QSize,
+    QAbstractListModel,
+    QModelIndex,
+    QObject,
+    QPoint,
+    QRect,
+    QBuffer,
+    QIODevice,
+)
+from PyQt6.QtGui import (
+    QColor,
+    QCursor,
+    QFont,
+    QIcon,
+    QImage,
+    QImageReader,
+    QKeySequence,
+    QPixmap,
+    QShortcut,
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize
-from PyQt6.QtGui import QCursor, QIcon, QKeySequence, QShortcut
+
+# Режимы поиска (содержимое, дубликаты, нечёткий, все папки, архивы) тянут
+# multiprocessing, concurrent.futures, zipfile и т.п. — их модули
+# импортируются в потоке поиска при первом использовании, а не при запуске
+from finder.cache import DEFAULT_MAX_BYTES, ResultCache, rules_scope
+from finder.categories import (
+    ALL_FILES,
+    EXTENSIONS_JSON,
+    category_exts,
+    category_name,
+    is_deep,
+    load_categories,
+)
+from finder.engine import Search
+from finder.filters import StatFilter, format_size, parse_size, parse_time
+from finder.index import FileIndex
+from finder.iopool import IO_TIMEOUT, IoPool, check_dirs
+from finder.metrics import ScanMetrics, ScanProfiler, StartupTimer
+from finder.prune import PRUNE_KEY, build_rules
+from finder.query import compile_query
+from finder.store import DEFAULT_MEMORY_BYTES, ResultStore
+from finder.throttle import throttle_from_settings
+from finder.walker import DEFAULT_WORKERS
+from finder.watchdog import BEAT_INTERVAL, DEFAULT_THRESHOLD_MS, StallWatchdog
+
+# Пакетная доставка результатов: одно событие Qt на 500 файлов или 50 мс
+RESULT_BATCH_SIZE = 500
+RESULT_BATCH_INTERVAL = 0.05
+
+# Живая сводка метрик в карточке — не чаще раза в полсекунды
+METRICS_INTERVAL = 0.5
+PROFILE_OUTPUT = "search_profile.prof"
+
+# Поиск по мере ввода: пауза после последнего символа и минимальная длина
+# запроса, ради которой можно запускать полный обход диска
+LIVE_SEARCH_DELAY_MS = 300
+LIVE_MIN_WALK_CHARS = 3
+
+# Повторные F5/Enter в пределах паузы сливаются в один запуск
+SEARCH_DEBOUNCE_MS = 150
+
+# Индекс старше часа отвечает на запрос, но после поиска обновляется в фоне
+INDEX_MAX_AGE = 3600
+
+# Дисковые вызовы окна идут через IoPool. Программа, открывающая файл,
+# может стартовать долго — ей даём больше, чем stat или чтению настроек
+IO_TIMEOUT_MS = int(IO_TIMEOUT * 1000)
+LAUNCH_TIMEOUT_MS = 10000
+
+# python main.py --startup-profile[=startup.json] — время запуска по фазам;
+# --startup-exit закрывает окно сразу после запуска (для замеров)
+STARTUP_PROFILE_ARG = "--startup-profile"
+STARTUP_EXIT_ARG = "--startup-exit"
 
 
 # --- ФУНКЦИЯ ПУТЕЙ ---
@@ -34,6 +125,44 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+# --- ДИСКОВЫЕ ВЫЗОВЫ ОКНА (ВЫПОЛНЯЮТСЯ В IoPool) ---
+def read_settings():
+    try:
+        with open("settings.json", "r") as f:
+            return json.load(f)
+    except:
+        return {}
+
+
+def write_settings(s):
+    with open("settings.json", "w") as f:
+        json.dump(s, f, indent=4)
+
+
+def open_path(path):
+    # False — файла уже нет. Запускающую программу не ждём: xdg-open может
+    # не возвращаться долго и держал бы поток пула
+    if not os.path.exists(path):
+        return False
+    if sys.platform == "win32":
+        os.startfile(path)
+    else:
+        subprocess.Popen(("open" if sys.platform == "darwin" else "xdg-open", path))
+    return True
+
+
+def reveal_path(path):
+    if not os.path.exists(path):
+        return False
+    if sys.platform == "win32":
+        subprocess.Popen(["explorer", "/select,", os.path.normpath(path)])
+    elif sys.platform == "darwin":
+        subprocess.Popen(["open", "-R", path])
+    else:
+        subprocess.Popen(["xdg-open", os.path.dirname(path)])
+    return True
+
+
 # --- ТЕМЫ ---
 THEMES = {
     "dark": {
@@ -137,7 +266,7 @@ class ExtensionSelectionDialog(QDialog):
 class HistoryDialog(QDialog):
     path_selected = pyqtSignal(str)
 
-    def __init__(self, history_list, theme_data, parent=None):
+    def __init__(self, history_list, theme_data, parent=None, hidden=()):
         super().__init__(parent)
         self.setWindowTitle("История путей")
         
@@ -168,11 +297,13 @@ class HistoryDialog(QDialog):
         self.list.setAlternatingRowColors(True) # <--- ВКЛЮЧАЕМ РЕЖИМ ЗЕБРЫ
         self.list.itemDoubleClicked.connect(self.select_path)
         
+        # Пути уже проверены в пуле IoPool: диалог диск не трогает
         for p in reversed(self.history_list):
-            if os.path.exists(p):
-                item = QListWidgetItem(f"{os.path.basename(p)} ({p})")
-                item.setData(Qt.ItemDataRole.UserRole, p)
-                self.list.addItem(item)
+            if p in hidden:
+                continue
+            item = QListWidgetItem(f"{os.path.basename(p)} ({p})")
+            item.setData(Qt.ItemDataRole.UserRole, p)
+            self.list.addItem(item)
         layout.addWidget(self.list)
 
         btns = QHBoxLayout()
@@ -196,115 +327,1089 @@ class HistoryDialog(QDialog):
         self.reject()
 
 
-# --- ПОТОК ПОИСКА (ПОШТУЧНЫЙ ВЫВОД) ---
+# --- ПОТОК ПОИСКА (ПОШТУЧНЫЙ ИЛИ ПАКЕТНЫЙ ВЫВОД) ---
 class SearchThread(QThread):
-    single_result_found = pyqtSignal(str, str)
+    single_result_found = pyqtSignal(tuple)
+    results_batch = pyqtSignal(list)
     update_status = pyqtSignal(str, str)
-    finished = pyqtSignal()
-
-    def __init__(self, term, exts, root, deep):
+    metrics_updated = pyqtSignal(str)
+
+    def __init__(
+        self,
+        query,
+        root,
+        deep,
+        index=None,
+        workers=1,
+        batch_size=0,
+        batch_interval=RESULT_BATCH_INTERVAL,
+        profile_mode=None,
+        rows=None,
+        content=None,
+        stat_filter=None,
+        rules=None,
+        archives=False,
+        throttle=None,
+        daemon=None,
+        category=None,
+        prune=None,
+        no_index=False,
+    ):
         super().__init__()
-        self.term = term.lower()
-        self.exts = exts
+        self.query = query
+        self.rows = rows
+        self.stat_filter = stat_filter
+        self.rules = rules
+        # Из чего построены rules: демон строит правила у себя
+        self.category = category
+        self.prune = prune
+        self.no_index = no_index  # F5: свежий обход, без индекса и кэша демона
+        self.archives = archives  # искать и внутри zip/tar
+        self.archive_info = ""
+        self.throttle = throttle  # фоновый режим: finder.throttle.Throttle
+        self.daemon = daemon  # сокет демона поиска ("" — по умолчанию) или None
+        self.daemon_info = ""
+        self.content = content  # текст внутри файлов; None — только имена
         self.root = root
         self.deep = deep
+        self.index = index
+        self.report = {}  # дополнительные данные для экспорта метрик
+        self.workers = workers
+        self.completed = False
+        self.metrics = ScanMetrics(root)
+        self.profiler = ScanProfiler(profile_mode, PROFILE_OUTPUT)
+        self.profile_report = {}
+        self.last_metrics = 0.0
+
+        # batch_size == 0 — старый режим, один сигнал на файл
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.batch = []
+        self.last_flush = time.monotonic()
+        # Глубина очереди событий: отправлено потоком минус принято GUI
+        # (каждый счётчик пишет только одна сторона)
+        self.sent_batches = 0
+        self.sent_items = 0
+        self.delivered_batches = 0
+        self.delivered_items = 0
+        self.peak_batches = 0
+        self.peak_items = 0
+
+    def found(self, row):
+        if not self.batch_size:
+            self.single_result_found.emit(row)
+            return
+        self.batch.append(row)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def maybe_flush(self):
+        if self.batch and time.monotonic() - self.last_flush >= self.batch_interval:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            self.sent_batches += 1
+            self.sent_items += len(self.batch)
+            self.peak_batches = max(
+                self.peak_batches, self.sent_batches - self.delivered_batches
+            )
+            self.peak_items = max(
+                self.peak_items, self.sent_items - self.delivered_items
+            )
+            self.results_batch.emit(self.batch)
+            self.batch = []
+        self.last_flush = time.monotonic()
+
+    def ack(self, n):
+        # Вызывается из GUI после вставки пакета
+        self.delivered_batches += 1
+        self.delivered_items += n
+
+    def cancel(self, total):
+        self.flush()
+        self.update_status.emit("Отменено", f"Стоп. Найдено: {total}")
+
+    def progress(self, scanned):
+        # Реже обновляем текст "Сканирование", чтобы не грузить UI
+        title = "Фоновый поиск" if self.throttle else "Сканирование"
+        self.update_status.emit(title, f"Проверено: {scanned}...")
+        self.maybe_flush()
+        now = time.monotonic()
+        if now - self.last_metrics >= METRICS_INTERVAL:
+            self.last_metrics = now
+            text = self.metrics.summary()
+            if self.throttle:
+                text += f"\n{self.throttle.summary()}"
+            self.metrics_updated.emit(text)
+
+    def summary(self):
+        text = self.metrics.summary()
+        if self.rules is not None and self.rules.counts:
+            text += f"\nОтсечено: {self.rules.summary()}"
+        if self.archive_info:
+            text += f"\n{self.archive_info}"
+        if self.throttle:
+            text += f"\n{self.throttle.summary()}"
+        if self.daemon_info:
+            text += f"\n{self.daemon_info}"
+        return text
+
+    @property
+    def cacheable(self):
+        # В кэш попадают только совпадения по именам файлов на диске без фильтров
+        return (
+            not self.content
+            and not self.archives
+            and not (self.stat_filter and self.stat_filter.active)
+        )
+
+    def delivery_stats(self):
+        return {
+            "batches": self.sent_batches,
+            "peak_queue_batches": self.peak_batches,
+            "peak_queue_items": self.peak_items,
+        }
 
     def run(self):
-        total = 0
-        count = 0
+        self.profiler.start()
+        try:
+            self.search()
+        finally:
+            self.profile_report = self.profiler.stop()
+
+    def daemon_search(self):
+        # Поиск через демон (finder.daemon); не запущен — None, ищем сами
+        from finder.daemon import DaemonClient, DaemonError, DaemonSearch
+
+        if self.throttle:
+            # Обход демона не знает лимитов фонового режима — ищем сами
+            self.daemon_info = "Фоновый режим — локальный поиск"
+            return None
+        try:
+            client = DaemonClient(self.daemon or None)
+        except DaemonError:
+            self.daemon_info = "Демон недоступен — локальный поиск"
+            return None
+        return DaemonSearch(
+            self.root,
+            self.query,
+            self.deep,
+            stop=self.isInterruptionRequested,
+            on_progress=self.progress,
+            stat_filter=self.stat_filter,
+            archives=self.archives,
+            category=self.category,
+            client=client,
+            no_index=self.no_index,
+            prune=self.prune,
+        )
+
+    def search(self):
+        # Вся логика поиска — в finder.engine (или у демона), поток лишь
+        # доставляет результаты
+        search = None
+        if self.daemon is not None and self.rows is None:
+            search = self.daemon_search()
+        if search is None:
+            search = self.local_search()
+        self.deliver(search)
+
+    def local_search(self):
+        return Search(
+            self.root,
+            self.query,
+            self.deep,
+            self.workers,
+            None if self.no_index else self.index,
+            stop=self.isInterruptionRequested,
+            on_progress=self.progress,
+            metrics=self.metrics,
+            rows=self.rows,
+            stat_filter=self.stat_filter,
+            rules=self.rules,
+            archives=self.archives,
+            throttle=self.throttle,
+        )
+
+    def deliver(self, search):
+        # Режим содержимого: найденное по имени — кандидаты для поиска текста
+        results = search
+        if self.content:
+            from finder.content import ContentSearch
 
-        if not os.path.exists(self.root):
+            results = ContentSearch(
+                search, self.content, stop=self.isInterruptionRequested
+            )
+        try:
+            if self.rows is not None:
+                self.update_status.emit("Кэш", "Фильтрация прошлых результатов...")
+            elif search.from_index:
+                self.update_status.emit("Индекс", "Поиск по индексу...")
+            if self.content:
+                for (f, full, size, mtime), line, snippet in results:
+                    self.found((f"{f}:{line}  {snippet}", full, size, mtime))
+            else:
+                for row in results:
+                    self.found(row)
+        except FileNotFoundError:
             self.update_status.emit("Ошибка", "Путь не найден")
-            self.finished.emit()
             return
+        except Exception:
+            self.update_status.emit("Ошибка", "Ошибка доступа")
 
+        if search.lister:
+            self.archive_info = search.lister.summary()
+        if hasattr(search, "reply"):
+            self.daemon_info = search.summary()
+            self.report = {"daemon": search.reply}
+        self.metrics_updated.emit(self.summary())
+        if self.isInterruptionRequested():
+            return self.cancel(results.found)
+
+        self.flush()
+        self.completed = True
+        self.update_status.emit("Готово", f"Всего найдено: {results.found}")
+
+
+# --- ПОИСК ДУБЛИКАТОВ ---
+# Тот же обход и та же доставка пакетами; строки одной группы идут подряд
+class DuplicateThread(SearchThread):
+    cacheable = False
+
+    def stage_done(self, stage):
+        self.update_status.emit("Дубликаты", str(stage))
+        self.metrics_updated.emit(str(stage))
+
+    def search(self):
+        from finder.dupes import DuplicateFinder
+
+        finder = DuplicateFinder(
+            self.root,
+            self.query,
+            self.deep,
+            self.workers,
+            stop=self.isInterruptionRequested,
+            metrics=self.metrics,
+            stat_filter=self.stat_filter,
+            rules=self.rules,
+        )
+        if not os.path.isdir(self.root):
+            self.update_status.emit("Ошибка", "Путь не найден")
+            return
+        self.update_status.emit("Дубликаты", "Группировка по размеру...")
+        groups = finder.run(on_stage=self.stage_done)
+        self.report = {"dupes": [st.to_dict() for st in finder.stages]}
+        if self.isInterruptionRequested():
+            return self.cancel(0)
+
+        for i, g in enumerate(groups, 1):
+            wasted = g.wasted / 1024 / 1024
+            for p in g.paths:
+                try:
+                    mtime = os.path.getmtime(p)
+                except OSError:
+                    mtime = 0.0
+                label = f"[{i}] {os.path.basename(p)} · {wasted:.1f} МБ лишних"
+                self.found((label, p, g.size, mtime))
+        self.flush()
+        self.metrics_updated.emit(finder.summary(groups))
+        self.completed = True
+        self.update_status.emit("Готово", f"Групп дубликатов: {len(groups)}")
+
+
+# --- НЕЧЁТКИЙ ПОИСК ---
+# Обходит всё, что подходит по категории, и держит лучшие K имён;
+# список в окне целиком заменяется текущим рейтингом по мере обхода
+class FuzzySearchThread(SearchThread):
+    results_ranked = pyqtSignal(list)
+    cacheable = False
+
+    def search(self):
+        from finder.fuzzy import FuzzySearch
+
+        search = Search(
+            self.root,
+            compile_query("", self.query.exts),
+            self.deep,
+            self.workers,
+            self.index,
+            stop=self.isInterruptionRequested,
+            on_progress=self.progress,
+            metrics=self.metrics,
+            stat_filter=self.stat_filter,
+            rules=self.rules,
+            with_stat=False,
+            archives=self.archives,
+            throttle=self.throttle,
+        )
+        fuzzy = FuzzySearch(search, self.query.text, stop=self.isInterruptionRequested)
         try:
-            for root, dirs, files in os.walk(self.root):
-                if self.isInterruptionRequested():
-                    self.update_status.emit("Отменено", f"Стоп. Найдено: {total}")
-                    self.finished.emit()
-                    return
-
-                if not self.deep:
-                    dirs[:] = [
-                        d for d in dirs if not d.startswith(".") and "$" not in d
-                    ]
-
-                for f in files:
-                    if self.isInterruptionRequested():
-                        self.update_status.emit("Отменено", f"Стоп. Найдено: {total}")
-                        self.finished.emit()
-                        return
-
-                    count += 1
-                    # Реже обновляем текст "Сканирование", чтобы не грузить UI
-                    if count % 100 == 0:
-                        self.update_status.emit(
-                            "Сканирование", f"Проверено: {count}..."
-                        )
-
-                    f_low = f.lower()
-                    match_name = self.term in f_low
-                    match_ext = (
-                        any(f_low.endswith(e) for e in self.exts) if self.exts else True
-                    )
-
-                    if (match_name and match_ext) or (not self.term and not self.exts):
-                        full = os.path.join(root, f)
-                        total += 1
-                        self.single_result_found.emit(f, full)
-
+            fuzzy.run(on_update=self.results_ranked.emit)
+        except FileNotFoundError:
+            self.update_status.emit("Ошибка", "Путь не найден")
+            return
         except Exception:
             self.update_status.emit("Ошибка", "Ошибка доступа")
+            return
+        self.results_ranked.emit(fuzzy.results())
+        if search.lister:
+            self.archive_info = search.lister.summary()
+        self.metrics_updated.emit(self.summary())
+        if self.isInterruptionRequested():
+            return self.cancel(fuzzy.found)
+        self.completed = True
+        self.update_status.emit(
+            "Готово", f"Лучших: {fuzzy.found} из {fuzzy.top.seen} похожих"
+        )
+
+
+# --- СВОДКА ПО КАТЕГОРИЯМ ---
+# Один обход раскладывает найденное по всем категориям extensions.json
+# (finder.facets); счётчики по ходу обхода идут в боковую панель, а сами
+# строки остаются в потоке — окно берёт из них подборку по категории
+class FacetThread(SearchThread):
+    facets_updated = pyqtSignal(dict)
+    cacheable = False
+
+    def __init__(
+        self, query, root, deep, categories, memory_bytes, facet_key=None, **kwargs
+    ):
+        super().__init__(query, root, deep, **kwargs)
+        self.categories = categories
+        self.memory_bytes = memory_bytes
+        # Путь, запрос и фильтры на момент запуска: набранное во время
+        # обхода к этой сводке уже не относится
+        self.facet_key = facet_key
+        self.facets = None
+
+    def search(self):
+        from finder.facets import FacetScan
+
+        search = Search(
+            self.root,
+            compile_query(self.query.text),
+            self.deep,
+            self.workers,
+            self.index,
+            stop=self.isInterruptionRequested,
+            on_progress=self.progress,
+            metrics=self.metrics,
+            stat_filter=self.stat_filter,
+            rules=self.rules,
+            archives=self.archives,
+            throttle=self.throttle,
+        )
+        self.facets = FacetScan(
+            search,
+            self.categories,
+            stop=self.isInterruptionRequested,
+            memory_bytes=self.memory_bytes,
+        )
+        try:
+            self.facets.run(on_update=self.facets_updated.emit)
+        except FileNotFoundError:
+            self.update_status.emit("Ошибка", "Путь не найден")
+            return
+        if search.lister:
+            self.archive_info = search.lister.summary()
+        self.report = {"facets": self.facets.to_dict()}
+        self.metrics_updated.emit(self.summary())
+        if self.isInterruptionRequested():
+            return self.cancel(self.facets.found)
+        self.completed = True
+        self.update_status.emit("Готово", self.facets.summary())
+
+
+# --- ЗАНЯТОЕ МЕСТО ПО ПАПКАМ ---
+# Обход с суммированием размеров снизу вверх (finder.usage); окну уходят
+# снимки дерева — самые тяжёлые ветви видны ещё до конца обхода
+class UsageThread(SearchThread):
+    usage_updated = pyqtSignal(object)
+    cacheable = False
+
+    def __init__(self, root, deep, min_bytes, **kwargs):
+        super().__init__(compile_query(""), root, deep, **kwargs)
+        self.min_bytes = min_bytes
+
+    def search(self):
+        from finder.usage import DEFAULT_MIN_BYTES, DiskUsage
+
+        usage = DiskUsage(
+            self.root,
+            self.deep,
+            self.workers,
+            stop=self.isInterruptionRequested,
+            on_progress=self.progress,
+            metrics=self.metrics,
+            rules=self.rules,
+            throttle=self.throttle,
+            min_bytes=(
+                DEFAULT_MIN_BYTES if self.min_bytes is None else self.min_bytes
+            ),
+        )
+        try:
+            usage.run(on_update=self.usage_updated.emit)
+        except FileNotFoundError:
+            self.update_status.emit("Ошибка", "Путь не найден")
+            return
+        self.usage_updated.emit(usage.snapshot())
+        self.report = {"usage": usage.to_dict()}
+        self.metrics_updated.emit(f"{self.summary()}\n{usage.summary()}")
+        if self.isInterruptionRequested():
+            return self.cancel(usage.files)
+        self.completed = True
+        self.update_status.emit("Готово", usage.summary())
+
+
+# --- ПОИСК ПО ВСЕМ СОХРАНЁННЫМ ПАПКАМ ---
+# Корни из истории обходятся параллельно по дискам (finder.multiroot);
+# прогресс приходит из потоков дорожек, пакеты копятся в этом потоке
+class MultiSearchThread(SearchThread):
+    cacheable = False
+
+    def __init__(self, query, roots, deep, **kwargs):
+        super().__init__(query, "", deep, **kwargs)
+        self.roots = roots
+        self.multi = None
+
+    def root_progress(self, root, scanned):
+        now = time.monotonic()
+        if now - self.last_metrics < METRICS_INTERVAL:
+            return
+        self.last_metrics = now
+        total = sum(self.multi.scanned.values())
+        title = "Фоновый поиск" if self.throttle else "Сканирование"
+        self.update_status.emit(title, f"Проверено: {total}...")
+        lines = [
+            f"{os.path.basename(r) or r}: {n}" for r, n in self.multi.scanned.items()
+        ]
+        if self.throttle:
+            lines.append(self.throttle.summary())
+        self.metrics_updated.emit(" · ".join(lines))
+
+    def search(self):
+        from finder.content import ContentSearch
+        from finder.multiroot import MultiSearch
+
+        self.multi = MultiSearch(
+            self.roots,
+            self.query,
+            self.deep,
+            self.workers,
+            self.index,
+            stop=self.isInterruptionRequested,
+            on_progress=self.root_progress,
+            metrics=self.metrics,
+            stat_filter=self.stat_filter,
+            rules=self.rules,
+            on_idle=self.maybe_flush,
+            archives=self.archives,
+            throttle=self.throttle,
+        )
+        if not self.multi.roots:
+            self.update_status.emit("Ошибка", "Путь не найден")
+            return
+        self.update_status.emit("Сканирование", f"Папок: {len(self.multi.roots)}")
+        rows = (row for _, row in self.multi)
+        results = self.multi
+        if self.content:
+            results = ContentSearch(rows, self.content, stop=self.isInterruptionRequested)
+            for (f, full, size, mtime), line, snippet in results:
+                self.found((f"{f}:{line}  {snippet}", full, size, mtime))
+                self.maybe_flush()
+        else:
+            for row in rows:
+                self.found(row)
+                self.maybe_flush()
+
+        self.metrics_updated.emit(self.summary())
+        if self.isInterruptionRequested():
+            return self.cancel(results.found)
+        self.flush()
+        self.completed = True
+        self.update_status.emit("Готово", f"Всего найдено: {results.found}")
 
-        self.update_status.emit("Готово", f"Всего найдено: {total}")
-        self.finished.emit()
 
+# --- ФОНОВАЯ ИНДЕКСАЦИЯ ---
+class IndexThread(QThread):
+    index_ready = pyqtSignal(str, int)
+
+    def __init__(self, index, root, deep, workers=1):
+        super().__init__()
+        self.index = index
+        self.root = root
+        self.deep = deep
+        self.workers = workers
 
-# --- ЭЛЕМЕНТ СПИСКА ---
-class FileItemWidget(QWidget):
-    def __init__(self, name, path, color, parent=None):
+    def run(self):
+        count = self.index.rebuild(
+            self.root, self.deep, self.isInterruptionRequested, self.workers
+        )
+        if count is not None:
+            self.index_ready.emit(self.root, count)
+
+
+# --- СЕССИЯ ПОИСКА ---
+# Диск обходит не больше одного потока: новый поиск (или индексация) стартует,
+# только когда прерванный поток действительно завершился. У каждого запуска
+# свой номер generation — сигналы прежних потоков, ещё стоящие в очереди
+# событий, отбрасываются. Частые запуски сливаются паузой debounce
+class SearchSession(QObject):
+    search_done = pyqtSignal(object)  # текущий поток поиска завершился
+
+    def __init__(self, parent=None):
         super().__init__(parent)
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(15, 5, 15, 5)
-        layout.setSpacing(1)
-        n = QLabel(name)
-        n.setStyleSheet("font-weight: bold; font-size: 14px;")
-        p = QLabel(path)
-        p.setStyleSheet(f"color: {color}; font-size: 12px;")
-        layout.addWidget(n)
-        layout.addWidget(p)
-        self.setFixedHeight(50)
+        self.generation = 0
+        self.current = None  # поток текущего поиска
+        self.threads = []  # потоки, которые ещё работают с диском
+        self.launch = None  # отложенный запуск: ждёт паузы или конца обхода
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.fire)
+        self.cancel_at = {}  # поток -> время requestInterruption
+        self.last_cancel_ms = None
+        self.max_cancel_ms = 0.0
+        self.dropped = 0  # отброшено устаревших сигналов
+
+    @property
+    def busy(self):
+        return bool(self.launch or self.threads)
+
+    def request(self, launch, delay_ms=SEARCH_DEBOUNCE_MS):
+        # С этого момента всё, что пришлют прежние потоки, устарело
+        self.generation += 1
+        self.launch = launch
+        self.interrupt()
+        self.timer.start(delay_ms)
+
+    def fire(self):
+        if self.threads:
+            return  # запустится из thread_done, когда диск освободится
+        launch, self.launch = self.launch, None
+        if launch:
+            launch()
+
+    def cancel(self):
+        # Стоп: отложенный запуск забываем, текущий поток прерываем.
+        # generation не меняем — итог отменённого поиска ещё нужен окну
+        self.timer.stop()
+        self.launch = None
+        self.interrupt()
+
+    def interrupt(self):
+        now = time.perf_counter()
+        for t in self.threads:
+            if t not in self.cancel_at:
+                t.requestInterruption()
+                self.cancel_at[t] = now
+
+    def guard(self, slot):
+        # Слот для сигналов потока текущего поколения
+        gen = self.generation
+
+        def call(*args):
+            if gen == self.generation:
+                slot(*args)
+            else:
+                self.dropped += 1
+
+        return call
+
+    def run(self, thread):
+        self.current = thread
+        self.track(thread)
+
+    def track(self, thread):
+        # Поток, обходящий диск: поиск или индексация
+        thread.generation = self.generation
+        self.threads.append(thread)
+        thread.finished.connect(lambda t=thread: self.thread_done(t))
+        thread.start()
+
+    def thread_done(self, thread):
+        self.threads.remove(thread)
+        started = self.cancel_at.pop(thread, None)
+        if started is not None:
+            self.last_cancel_ms = (time.perf_counter() - started) * 1000
+            self.max_cancel_ms = max(self.max_cancel_ms, self.last_cancel_ms)
+        if thread is self.current:
+            self.current = None
+            if not self.launch:
+                self.search_done.emit(thread)
+        if not self.threads and self.launch and not self.timer.isActive():
+            self.fire()
+
+    def wait_all(self):
+        self.cancel()
+        for t in list(self.threads):
+            t.wait()
+
+    def report(self):
+        return {
+            "generation": self.generation,
+            "dropped_signals": self.dropped,
+            "last_cancel_ms": (
+                round(self.last_cancel_ms, 3) if self.last_cancel_ms is not None else None
+            ),
+            "max_cancel_ms": round(self.max_cancel_ms, 3),
+        }
+
+
+# --- ДИСКОВЫЕ ВЫЗОВЫ БЕЗ ОЖИДАНИЯ В ОКНЕ ---
+# fn(*args) выполняется в IoPool, а on_done(результат) или on_fail(текст) —
+# снова в потоке GUI: сигнал из потока пула приходит через очередь событий.
+# Не уложился в timeout_ms — on_fail("нет ответа"), поздний результат
+# отбрасывается (вызов на мёртвом сетевом диске может не вернуться никогда)
+class IoTasks(QObject):
+    completed = pyqtSignal(object, object)  # обработчик, Future
+
+    def __init__(self, pool, parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.timeouts = 0
+        self.failures = 0
+        # Слот объекта окна: сигнал из потока пула встаёт в очередь событий GUI
+        self.completed.connect(self.deliver)
+
+    def deliver(self, finish, fut):
+        finish(fut)
+
+    def run(self, fn, *args, on_done=None, on_fail=None, timeout_ms=IO_TIMEOUT_MS):
+        over = []
+
+        def finish(fut):
+            if over:
+                return
+            over.append(True)
+            try:
+                result = fut.result()
+            except Exception as e:
+                self.failures += 1
+                if on_fail:
+                    on_fail(str(e) or type(e).__name__)
+                return
+            if on_done:
+                on_done(result)
+
+        def expire():
+            if not over:
+                over.append(True)
+                self.timeouts += 1
+                if on_fail:
+                    on_fail("нет ответа")
+
+        fut = self.pool.submit(fn, *args)
+        fut.add_done_callback(lambda f: self.completed.emit(finish, f))
+        QTimer.singleShot(timeout_ms, expire)
+
+    def report(self):
+        return dict(self.pool.stats(), timeouts=self.timeouts, failures=self.failures)
+
+
+# --- ФОНОВАЯ ЗАГРУЗКА ПРИ ЗАПУСКЕ ---
+# Всё, без чего окно можно показать: индекс (SQLite), категории из
+# extensions.json и проверка путей истории (сетевой диск может отвечать
+# секунды, мёртвый — не ответить вовсе: такие пути ждём не дольше IO_TIMEOUT)
+class StartupThread(QThread):
+    loaded = pyqtSignal(object, dict, dict)
+
+    def __init__(self, categories_path, history, pool):
+        super().__init__()
+        self.categories_path = categories_path
+        self.history = history
+        self.pool = pool
+        self.phases = []  # [(фаза, мс)] для --startup-profile
+
+    def timed(self, phase, fn, *args):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        self.phases.append((phase, (time.perf_counter() - t0) * 1000))
+        return result
+
+    def run(self):
+        index = self.timed("индекс", FileIndex)
+        categories = self.timed("extensions.json", load_categories, self.categories_path)
+        states = self.timed("история", check_dirs, self.pool, self.history)
+        self.loaded.emit(index, categories, states)
+
+
+# --- МОДЕЛЬ РЕЗУЛЬТАТОВ ---
+# Строки (имя, путь, размер, mtime) лежат в finder.store.ResultStore: без
+# объекта на строку, папка пути хранится один раз, а сверх memory_bytes всё
+# уходит во временный файл. Кортеж собирается только при обращении.
+# Сортировка не трогает rows: для столбца один раз строится список ключей,
+# а на экран строки выводятся через перестановку order
+SORT_COLUMNS = ("name", "size", "mtime", "path")
+SizeRole = Qt.ItemDataRole.UserRole + 1
+MtimeRole = Qt.ItemDataRole.UserRole + 2
+
+
+def sort_key(column, row):
+    if column == 0:
+        return row[0].casefold()
+    if column == 3:
+        return row[1].casefold()
+    return row[2] if column == 1 else row[3]
+
+
+class ResultsModel(QAbstractListModel):
+    def __init__(self, parent=None, memory_bytes=DEFAULT_MEMORY_BYTES):
+        super().__init__(parent)
+        self.memory_bytes = memory_bytes
+        self.rows = ResultStore(memory_bytes=memory_bytes)
+        self.keys = {}  # столбец -> ключи сортировки в порядке rows
+        self.order = None  # None — порядок поступления
+        self.sort_column = -1
+        self.sort_desc = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def row_at(self, r):
+        return self.rows[self.order[r] if self.order is not None else r]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        name, path, size, mtime = self.row_at(index.row())
+        if role == Qt.ItemDataRole.DisplayRole:
+            return name
+        if role in (Qt.ItemDataRole.UserRole, Qt.ItemDataRole.ToolTipRole):
+            return path
+        if role == SizeRole:
+            return size
+        if role == MtimeRole:
+            return mtime
+        return None
+
+    def append_rows(self, batch):
+        if not batch:
+            return
+        n = len(self.rows)
+        self.beginInsertRows(QModelIndex(), n, n + len(batch) - 1)
+        self.rows.extend(batch)
+        for column, keys in self.keys.items():
+            keys.extend(sort_key(column, row) for row in batch)
+        # Пока идёт поиск, новые строки встают в конец; на место их
+        # ставит resort() по окончании, а не пересортировка на каждый пакет
+        if self.order is not None:
+            self.order.extend(range(n, n + len(batch)))
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_column = column
+        self.sort_desc = order == Qt.SortOrder.DescendingOrder
+        self.resort()
+
+    def resort(self):
+        self.layoutAboutToBeChanged.emit()
+        if self.sort_column < 0:
+            self.order = None
+        else:
+            keys = self.keys.get(self.sort_column)
+            if keys is None:
+                keys = [sort_key(self.sort_column, row) for row in self.rows]
+                self.keys[self.sort_column] = keys
+            self.order = sorted(
+                range(len(self.rows)), key=keys.__getitem__, reverse=self.sort_desc
+            )
+        self.layoutChanged.emit()
+
+    def set_rows(self, rows):
+        # Полная замена (рейтинг нечёткого поиска); сортировка, если выбрана,
+        # применяется поверх
+        self.beginResetModel()
+        self.rows = ResultStore(rows, self.memory_bytes)
+        self.keys = {}
+        self.order = None
+        self.endResetModel()
+        if self.sort_column >= 0:
+            self.resort()
+
+    def clear(self):
+        # Прежнее хранилище не закрываем: его может держать кэш результатов
+        self.beginResetModel()
+        self.rows = ResultStore(memory_bytes=self.memory_bytes)
+        self.keys = {}
+        self.order = None if self.sort_column < 0 else []
+        self.endResetModel()
+
+
+# --- МИНИАТЮРЫ ФОТО И ВИДЕО ---
+# Делегат просит миниатюру только у строк, которые рисует, то есть видимых.
+# Кэш на диске и декодирование (finder.thumbs) — в пуле; окно получает
+# готовый QImage и делает из него QPixmap. Задачи строк, ушедших с экрана,
+# снимаются с очереди, пока их не начали
+THUMB_CATEGORIES = {"фото", "видео"}
+THUMB_SIZE = 40  # сторона в строке списка, логические пиксели
+THUMB_WORKERS = 3
+THUMB_PIXMAPS = 600  # готовых миниатюр в памяти окна
+
+
+def decode_image(path, px):
+    # Поток пула: QImage, в отличие от QPixmap, можно создавать вне GUI
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and max(size.width(), size.height()) > px:
+        # JPEG декодируется сразу в уменьшенном виде, без полного кадра
+        reader.setScaledSize(size.scaled(px, px, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+    buf = QBuffer()
+    buf.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buf, "PNG")
+    return bytes(buf.data())
+
+
+class ThumbnailLoader(QObject):
+    ready = pyqtSignal()  # появились новые миниатюры — перерисовать список
+    completed = pyqtSignal(object, object)  # ключ, Future
+
+    def __init__(self, thumbnailer, ratio=1.0, parent=None):
+        super().__init__(parent)
+        self.thumbnailer = thumbnailer
+        self.ratio = ratio
+        self.px = round(THUMB_SIZE * ratio)
+        # Без запасных потоков: декодирование не зависает, ffmpeg ограничен
+        # таймаутом
+        self.pool = IoPool(THUMB_WORKERS, THUMB_WORKERS)
+        self.pending = {}  # (путь, размер, mtime) -> Future
+        self.pixmaps = OrderedDict()  # ключ -> QPixmap или None (не вышло)
+        self.requested = 0
+        self.cancelled = 0
+        self.completed.connect(self.deliver)
+
+    def pixmap(self, key):
+        # Зовётся из paint: только словари, диск не трогаем
+        if key in self.pixmaps:
+            self.pixmaps.move_to_end(key)
+            return self.pixmaps[key]
+        if key not in self.pending:
+            self.requested += 1
+            fut = self.pool.submit(self.load, key)
+            self.pending[key] = fut
+            fut.add_done_callback(lambda f: self.completed.emit(key, f))
+        return None
+
+    def load(self, key):
+        data = self.thumbnailer.thumbnail(*key)
+        image = QImage()
+        if not data or not image.loadFromData(data):
+            return None
+        if max(image.width(), image.height()) > self.px:
+            image = image.scaled(
+                self.px,
+                self.px,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+        return image
+
+    def deliver(self, key, fut):
+        if self.pending.get(key) is fut:
+            del self.pending[key]
+        if fut.cancelled():
+            return
+        try:
+            image = fut.result()
+        except Exception:
+            image = None
+        pix = None
+        if image is not None:
+            pix = QPixmap.fromImage(image)
+            pix.setDevicePixelRatio(self.ratio)
+        self.pixmaps[key] = pix
+        while len(self.pixmaps) > THUMB_PIXMAPS:
+            self.pixmaps.popitem(last=False)
+        self.ready.emit()
+
+    def retain(self, keys):
+        # Строки не на экране: ещё не начатые задачи снимаются
+        for key, fut in list(self.pending.items()):
+            if key not in keys and fut.cancel():
+                self.pending.pop(key, None)
+                self.cancelled += 1
+
+    def report(self):
+        out = self.thumbnailer.report()
+        out["requested"] = self.requested
+        out["cancelled"] = self.cancelled
+        out["pending"] = len(self.pending)
+        out["in_memory"] = len(self.pixmaps)
+        return out
+
+
+# --- ОТРИСОВКА ЭЛЕМЕНТА СПИСКА ---
+class FileItemDelegate(QStyledItemDelegate):
+    ROW_HEIGHT = 50
+
+    def __init__(self, theme_data, parent=None):
+        super().__init__(parent)
+        self.theme_data = theme_data
+        self.thumbs = None  # ThumbnailLoader, когда выбраны фото или видео
+
+    def set_theme(self, theme_data):
+        self.theme_data = theme_data
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        # Фон (зебра, выделение, hover) рисует стиль по правилам таблицы стилей
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(
+            QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, option.widget
+        )
+
+        rect = option.rect.adjusted(15, 5, -15, -5)
+        if self.thumbs:
+            self.paint_thumb(painter, index, rect)
+            rect = rect.adjusted(THUMB_SIZE + 10, 0, 0, 0)
+        half = rect.height() // 2
+        name_rect = rect.adjusted(0, 0, 0, -half)
+        path_rect = rect.adjusted(0, rect.height() - half, 0, 0)
+        align = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+
+        font = QFont(option.font)
+        font.setPixelSize(14)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor(self.theme_data["text_main"]))
+        name = painter.fontMetrics().elidedText(
+            index.data(Qt.ItemDataRole.DisplayRole),
+            Qt.TextElideMode.ElideRight,
+            name_rect.width(),
+        )
+        painter.drawText(name_rect, align, name)
+
+        font.setPixelSize(12)
+        font.setBold(False)
+        painter.setFont(font)
+        painter.setPen(QColor(self.theme_data["text_path"]))
+        # Размер и дата — справа, путь сокращается посередине на оставшемся месте
+        mtime = index.data(MtimeRole)
+        info = format_size(index.data(SizeRole))
+        if mtime:
+            info += "  ·  " + time.strftime("%d.%m.%Y %H:%M", time.localtime(mtime))
+        info_w = painter.fontMetrics().horizontalAdvance(info) + 20
+        right = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        painter.drawText(path_rect, right, info)
+        path = painter.fontMetrics().elidedText(
+            index.data(Qt.ItemDataRole.UserRole),
+            Qt.TextElideMode.ElideMiddle,
+            max(0, path_rect.width() - info_w),
+        )
+        painter.drawText(path_rect, align, path)
+        painter.restore()
+
+    def paint_thumb(self, painter, index, rect):
+        # Пока миниатюры нет (или не будет) — пустая рамка того же размера
+        box = QRect(
+            rect.left(),
+            rect.top() + (rect.height() - THUMB_SIZE) // 2,
+            THUMB_SIZE,
+            THUMB_SIZE,
+        )
+        key = (
+            index.data(Qt.ItemDataRole.UserRole),
+            index.data(SizeRole),
+            index.data(MtimeRole),
+        )
+        pix = self.thumbs.pixmap(key)
+        if pix is None:
+            painter.setPen(QColor(self.theme_data["border"]))
+            painter.drawRect(box.adjusted(0, 0, -1, -1))
+            return
+        w = round(pix.width() / pix.devicePixelRatio())
+        h = round(pix.height() / pix.devicePixelRatio())
+        x = box.left() + (THUMB_SIZE - w) // 2
+        y = box.top() + (THUMB_SIZE - h) // 2
+        painter.drawPixmap(QRect(x, y, w, h), pix)
 
 
 # --- ГЛАВНОЕ ОКНО ---
 class ModernSearchApp(QMainWindow):
     LAST_ROOT_DIR_KEY = "last_root_dir"
     SEARCH_HISTORY_KEY = "search_history"
-
-    def __init__(self):
+    SCAN_WORKERS_KEY = "scan_workers"
+    SCAN_PROFILE_KEY = "scan_profile"  # "cprofile", "tracemalloc" или null
+    LIVE_SEARCH_KEY = "live_search"
+    RESULT_CACHE_MB_KEY = "result_cache_mb"
+    RESULT_MEMORY_MB_KEY = "result_memory_mb"
+    DAEMON_SOCKET_KEY = "daemon_socket"  # true или путь — искать через демон
+    BACKGROUND_SCAN_KEY = "background_scan"  # лимиты фонового режима
+    USAGE_MIN_MB_KEY = "usage_min_mb"  # порог папок в дереве занятого места
+    THUMBNAILS_KEY = "thumbnails"  # миниатюры в категориях фото и видео
+    THUMB_CACHE_MB_KEY = "thumb_cache_mb"
+    STALL_THRESHOLD_KEY = "stall_threshold_ms"  # 0 — без сторожа цикла событий
+    STALL_LOG_KEY = "stall_log"  # файл, куда дописываются зависания окна
+
+    startup_done = pyqtSignal()
+
+    def __init__(self, startup=None):
         super().__init__()
+        self.startup = startup  # StartupTimer при --startup-profile
         self.setWindowTitle("File Finder Pro (Проводник) v12.3")
         self.setWindowIcon(QIcon(resource_path("file-explorer.ico")))
         self.resize(1100, 750)
 
         self.current_theme = "dark"
-        self.raw_results_data = []
         self.is_searching = False
+        self.session = SearchSession(self)
+        self.session.search_done.connect(lambda t: self.on_search_finished())
         self.search_thread = None
+        self.search_from_cache = False
+        self.facets = None  # FacetScan последней завершённой сводки
+        self.facets_key = None  # при каком пути, запросе и фильтрах она снята
+        self.index_thread = None
+        self.startup_thread = None
+        self.file_index = None  # открывается в StartupThread
+        self.json_data = None  # extensions.json, тоже из StartupThread
+        self.history_checked = False
+        self.unreachable = set()  # пути истории, не ответившие за IO_TIMEOUT
+        self.thumbs = None  # ThumbnailLoader, создаётся при первом выборе фото
+        # Домашняя папка — из окружения, один раз: подсказка о слишком
+        # широком поиске пересчитывается на каждый клик по категории
+        self.home_dir = os.path.expanduser("~")
+        # stat, чтение настроек, запуск программ — только в пуле, окно не ждёт
+        self.io = IoTasks(IoPool(), self)
+        # "Все файлы" не требуют extensions.json — с них и начинаем
         self.current_filter_ext = []
-        self.current_filter_key = None
+        self.current_filter_key = ALL_FILES
         self.found_count = 0  # СЧЕТЧИК НАЙДЕННЫХ
+        self.max_stall_ms = 0.0  # самая долгая вставка пакета в GUI
+        self.total_stall_ms = 0.0
 
         self.settings = self.load_settings()
         self.search_history = self.settings.get(self.SEARCH_HISTORY_KEY, [])
         def_path = (
             "C:\\"
-            if os.name == "nt" and os.path.exists("C:\\")
-            else os.path.expanduser("~")
+            if os.name == "nt"
+            and self.io.pool.call(os.path.exists, "C:\\", default=False)
+            else self.home_dir
         )
         self.root_dir = self.settings.get(self.LAST_ROOT_DIR_KEY, def_path)
-        self.json_data = self.load_extensions_json()
+        self.scan_workers = self.settings.get(self.SCAN_WORKERS_KEY, DEFAULT_WORKERS)
+        self.live_search_enabled = self.settings.get(self.LIVE_SEARCH_KEY, True)
+        cache_mb = self.settings.get(self.RESULT_CACHE_MB_KEY)
+        self.result_cache = ResultCache(
+            cache_mb * 1024 * 1024 if cache_mb else DEFAULT_MAX_BYTES
+        )
+        memory_mb = self.settings.get(self.RESULT_MEMORY_MB_KEY)
+        self.results_model = ResultsModel(
+            self, memory_mb * 1024 * 1024 if memory_mb else DEFAULT_MEMORY_BYTES
+        )
+        threshold = self.settings.get(self.STALL_THRESHOLD_KEY, DEFAULT_THRESHOLD_MS)
+        self.watchdog = (
+            StallWatchdog(threshold, log_path=self.settings.get(self.STALL_LOG_KEY))
+            if threshold
+            else None
+        )
+        self.mark("настройки")
 
         self.central_widget = QWidget()
         self.setCentralWidget(self.central_widget)
@@ -319,40 +1424,94 @@ class ModernSearchApp(QMainWindow):
         self.refresh_shortcut.activated.connect(self.toggle_search)
 
         self.update_path_display()
+        self.mark("виджеты")
         self.apply_theme()
-        self.change_category("ALL_FILES", self.menu_buttons[0])
+        self.mark("тема")
+        # Сработает, когда окно уже показано и нарисовано
+        QTimer.singleShot(0, self.finish_startup)
+
+    def mark(self, phase):
+        if self.startup:
+            self.startup.mark(phase)
+
+    def finish_startup(self):
+        self.mark("первая отрисовка")
+        self.load_sidebar_icons()
+        self.mark("иконки")
+        self.start_watchdog()
+        self.startup_thread = StartupThread(
+            resource_path(EXTENSIONS_JSON), list(self.search_history), self.io.pool
+        )
+        self.startup_thread.loaded.connect(self.on_startup_loaded)
+        self.startup_thread.start()
+
+    def start_watchdog(self):
+        # Цикл событий уже крутится: отметки с этого момента — его задержка
+        if not self.watchdog:
+            return
+        self.beat_timer = QTimer(self)
+        self.beat_timer.setInterval(int(BEAT_INTERVAL * 1000))
+        self.beat_timer.timeout.connect(self.watchdog.beat)
+        self.beat_timer.start()
+        self.watchdog.start()
+
+    def on_startup_loaded(self, index, categories, states):
+        self.file_index = index
+        if self.json_data is None:
+            self.json_data = categories
+        self.apply_history_states(states)
+        self.mark("фоновая загрузка")
+        if self.startup:
+            for phase, ms in self.startup_thread.phases:
+                self.startup.add(f"  {phase}", ms)
+        self.startup_done.emit()
+
+    def categories(self):
+        # Категорию выбрали раньше, чем StartupThread прочитал extensions.json
+        if self.json_data is None:
+            self.json_data = self.load_extensions_json()
+        return self.json_data
+
+    def apply_history_states(self, states):
+        # {путь: есть ли папка} из check_dirs. Пути, добавленные уже после
+        # проверки, выбраны в диалоге и существуют. Не ответившие (None)
+        # остаются в истории — сетевой диск может вернуться, — но в диалоге
+        # не показываются
+        self.search_history = [
+            p for p in self.search_history if states.get(p) is not False
+        ]
+        self.unreachable = {p for p, ok in states.items() if ok is None}
+        self.history_checked = True
 
     def load_settings(self):
-        try:
-            with open("settings.json", "r") as f:
-                return json.load(f)
-        except:
-            return {}
+        # Окну без настроек не продолжить, но и ждать зависшую папку
+        # программы (запуск из общей сетевой папки) дольше IO_TIMEOUT незачем.
+        # None — файл не прочитан за это время: тогда и не сохраняем его при
+        # выходе, иначе пустые настройки затёрли бы prune, daemon_socket и т.п.
+        s = self.io.pool.call(read_settings)
+        self.settings_loaded = s is not None
+        return s or {}
 
     def save_settings(self):
-        s = {
-            self.LAST_ROOT_DIR_KEY: self.root_dir,
-            self.SEARCH_HISTORY_KEY: self.search_history,
-        }
-        try:
-            with open("settings.json", "w") as f:
-                json.dump(s, f, indent=4)
-        except:
-            pass
+        if not self.settings_loaded:
+            return
+        # Сохраняем и ключи, которые правятся вручную (scan_workers и т.п.)
+        s = dict(self.settings)
+        s[self.LAST_ROOT_DIR_KEY] = self.root_dir
+        s[self.SEARCH_HISTORY_KEY] = self.search_history
+        self.io.pool.call(write_settings, s)
 
     def load_extensions_json(self):
-        p = resource_path("extensions.json")
-        if os.path.exists(p):
-            try:
-                with open(p, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except:
-                pass
-        return {}
+        return load_categories(resource_path(EXTENSIONS_JSON))
 
     def closeEvent(self, e):
-        self.stop_search_process()
+        # Поиск и индексация прерываются и дожидаются — без потоков-сирот
+        self.session.wait_all()
+        if self.startup_thread and self.startup_thread.isRunning():
+            self.startup_thread.wait()
         self.save_settings()
+        if self.watchdog:
+            self.watchdog.stop()
         super().closeEvent(e)
 
     def setup_sidebar(self):
@@ -372,7 +1531,8 @@ class ModernSearchApp(QMainWindow):
         layout.addSpacing(30)
 
         self.menu_buttons = []
-        icons = {
+        # Сами картинки грузятся в load_sidebar_icons после первой отрисовки
+        self.category_icons = {
             "office": resource_path("images/doc_file.png"),
             "office_old": resource_path("images/ms_office.png"),
             "фото": resource_path("images/picture.png"),
@@ -386,7 +1546,7 @@ class ModernSearchApp(QMainWindow):
             "эцп": resource_path("images/ncalayer.png"),
         }
         cats = {
-            "📂 Все файлы": "ALL_FILES",
+            "📂 Все файлы": ALL_FILES,
             " Документы": "office",
             " PowerBI": "power-bi",
             " Word": "word",
@@ -400,13 +1560,14 @@ class ModernSearchApp(QMainWindow):
             " Office (Старый/Новый)": "office_old",
         }
 
+        self.categories_map = cats
+
         for name, key in cats.items():
             btn = QPushButton(name)
             btn.setCheckable(True)
             btn.setFixedHeight(50)
             btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            if key in icons:
-                btn.setIcon(QIcon(icons[key]))
+            if key in self.category_icons:
                 btn.setIconSize(QSize(20, 20))
             btn.clicked.connect(
                 lambda c, k=key, b=btn: self.handle_category_click(k, b)
@@ -425,6 +1586,11 @@ class ModernSearchApp(QMainWindow):
         self.theme_toggle.setFixedHeight(45)
         layout.addWidget(self.theme_toggle)
 
+    def load_sidebar_icons(self):
+        for key, btn in zip(self.categories_map.values(), self.menu_buttons):
+            if key in self.category_icons:
+                btn.setIcon(QIcon(self.category_icons[key]))
+
     def setup_content_area(self):
         self.content_area = QFrame()
         self.content_area.setObjectName("ContentArea")
@@ -445,6 +1611,11 @@ class ModernSearchApp(QMainWindow):
         self.search_input.setPlaceholderText("Введите имя файла...")
         self.search_input.setFixedHeight(50)
         self.search_input.returnPressed.connect(self.start_search)
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(LIVE_SEARCH_DELAY_MS)
+        self.live_timer.timeout.connect(self.live_search)
+        self.search_input.textChanged.connect(self.on_search_text_changed)
         
         # Добавляем действие (Action) внутрь поля ввода справа
         # Убедись, что clear_icon.png лежит в папке images!
@@ -456,6 +1627,14 @@ class ModernSearchApp(QMainWindow):
         self.clear_action.triggered.connect(self.search_input.clear)
         
         top_bar.addWidget(self.search_input)
+
+        # Необязательный текст внутри файлов (литерал или re:выражение)
+        self.content_input = QLineEdit()
+        self.content_input.setPlaceholderText("Текст внутри файлов...")
+        self.content_input.setFixedHeight(50)
+        self.content_input.setFixedWidth(220)
+        self.content_input.returnPressed.connect(self.start_search)
+        top_bar.addWidget(self.content_input)
         # -------------------------------
 
         self.browse_btn = QPushButton("Обзор...")
@@ -472,6 +1651,63 @@ class ModernSearchApp(QMainWindow):
         self.history_btn.setObjectName("SecondaryButton")
         top_bar.addWidget(self.history_btn)
 
+        # Искать сразу во всех папках из истории и в текущей
+        self.all_roots_btn = QPushButton("Все папки")
+        self.all_roots_btn.setCheckable(True)
+        self.all_roots_btn.setFixedWidth(110)
+        self.all_roots_btn.setFixedHeight(50)
+        self.all_roots_btn.setObjectName("SecondaryButton")
+        top_bar.addWidget(self.all_roots_btn)
+
+        # Режим дубликатов: тот же запрос и категория, но ищем копии
+        self.dupes_btn = QPushButton("Дубликаты")
+        self.dupes_btn.setCheckable(True)
+        self.dupes_btn.setFixedWidth(120)
+        self.dupes_btn.setFixedHeight(50)
+        self.dupes_btn.setObjectName("SecondaryButton")
+        top_bar.addWidget(self.dupes_btn)
+
+        # Сводка: один обход, число файлов и объём по каждой категории
+        self.facets_btn = QPushButton("Сводка")
+        self.facets_btn.setCheckable(True)
+        self.facets_btn.setFixedWidth(110)
+        self.facets_btn.setFixedHeight(50)
+        self.facets_btn.setObjectName("SecondaryButton")
+        top_bar.addWidget(self.facets_btn)
+
+        # Занятое место: дерево папок по размеру вместо списка файлов
+        self.usage_btn = QPushButton("Место")
+        self.usage_btn.setCheckable(True)
+        self.usage_btn.setFixedWidth(100)
+        self.usage_btn.setFixedHeight(50)
+        self.usage_btn.setObjectName("SecondaryButton")
+        top_bar.addWidget(self.usage_btn)
+
+        # Нечёткий поиск: опечатки и пропуски букв, лучшие совпадения сверху
+        self.fuzzy_btn = QPushButton("Нечёткий")
+        self.fuzzy_btn.setCheckable(True)
+        self.fuzzy_btn.setFixedWidth(110)
+        self.fuzzy_btn.setFixedHeight(50)
+        self.fuzzy_btn.setObjectName("SecondaryButton")
+        top_bar.addWidget(self.fuzzy_btn)
+
+        # Заглядывать в .zip/.tar: файлы внутри показываются как архив.zip!/путь
+        self.archives_btn = QPushButton("В архивах")
+        self.archives_btn.setCheckable(True)
+        self.archives_btn.setFixedWidth(110)
+        self.archives_btn.setFixedHeight(50)
+        self.archives_btn.setObjectName("SecondaryButton")
+        top_bar.addWidget(self.archives_btn)
+
+        # Фоновый обход: лимит папок и файлов в секунду, низкий приоритет
+        # процессора и диска — чтобы не мешать другим программам
+        self.background_btn = QPushButton("Фоновый")
+        self.background_btn.setCheckable(True)
+        self.background_btn.setFixedWidth(110)
+        self.background_btn.setFixedHeight(50)
+        self.background_btn.setObjectName("SecondaryButton")
+        top_bar.addWidget(self.background_btn)
+
         self.refresh_btn = QPushButton("")
         self.refresh_btn.setFixedSize(50, 50)
         self.refresh_btn.setIcon(QIcon(resource_path("images/refresh.png")))
@@ -481,6 +1717,41 @@ class ModernSearchApp(QMainWindow):
         top_bar.addWidget(self.refresh_btn)
         
         layout.addLayout(top_bar)
+
+        # --- ФИЛЬТРЫ ПО РАЗМЕРУ/ДАТЕ И СОРТИРОВКА ---
+        filter_bar = QHBoxLayout()
+        filter_bar.setSpacing(10)
+        self.filter_inputs = {}
+        for key, hint, width in [
+            ("min_size", "Размер от (10M)", 140),
+            ("max_size", "Размер до", 120),
+            ("after", "Изменён после (7d, 01.10.2026)", 230),
+            ("before", "Изменён до", 130),
+        ]:
+            edit = QLineEdit()
+            edit.setPlaceholderText(hint)
+            edit.setFixedHeight(36)
+            edit.setFixedWidth(width)
+            edit.returnPressed.connect(self.start_search)
+            filter_bar.addWidget(edit)
+            self.filter_inputs[key] = edit
+        filter_bar.addStretch()
+
+        self.sort_combo = QComboBox()
+        self.sort_combo.addItems(
+            ["Без сортировки", "По имени", "По размеру", "По дате", "По пути"]
+        )
+        self.sort_combo.setFixedHeight(36)
+        self.sort_combo.currentIndexChanged.connect(self.apply_sort)
+        filter_bar.addWidget(self.sort_combo)
+        self.sort_desc_btn = QPushButton("↓")
+        self.sort_desc_btn.setCheckable(True)
+        self.sort_desc_btn.setFixedSize(36, 36)
+        self.sort_desc_btn.setToolTip("По убыванию")
+        self.sort_desc_btn.setObjectName("SecondaryButton")
+        self.sort_desc_btn.toggled.connect(self.apply_sort)
+        filter_bar.addWidget(self.sort_desc_btn)
+        layout.addLayout(filter_bar)
         
         self.hint_label = QLabel("")
         self.hint_label.setObjectName("HintLabel")
@@ -502,85 +1773,600 @@ class ModernSearchApp(QMainWindow):
             cl.addWidget(val)
             self.status_labels[key] = val
             info.addWidget(card)
+
+        # Карточка метрик: где ушло время сканирования + экспорт в JSON
+        card = QFrame()
+        card.setObjectName("InfoCard")
+        card.setFixedHeight(100)
+        cl = QVBoxLayout(card)
+        cl.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        head = QHBoxLayout()
+        head.addWidget(QLabel("Профиль сканирования"))
+        head.addStretch()
+        self.export_metrics_btn = QPushButton("Экспорт JSON")
+        self.export_metrics_btn.setObjectName("SecondaryButton")
+        self.export_metrics_btn.setFixedHeight(26)
+        self.export_metrics_btn.setEnabled(False)
+        self.export_metrics_btn.clicked.connect(self.export_metrics)
+        head.addWidget(self.export_metrics_btn)
+        cl.addLayout(head)
+        val = QLabel("—")
+        val.setObjectName("CardDetail")
+        val.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        cl.addWidget(val)
+        self.status_labels["metrics"] = val
+        info.addWidget(card)
         layout.addLayout(info)
 
         layout.addWidget(QLabel("РЕЗУЛЬТАТЫ ПОИСКА"))
-        self.results_list = QListWidget()
+        self.results_list = QListView()
+        self.results_list.setModel(self.results_model)
+        self.results_delegate = FileItemDelegate(THEMES[self.current_theme], self)
+        self.results_list.setItemDelegate(self.results_delegate)
+        # Одинаковая высота строк: вид не опрашивает sizeHint у каждой строки
+        self.results_list.setUniformItemSizes(True)
         self.results_list.setAlternatingRowColors(True)
         self.results_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.results_list.customContextMenuRequested.connect(self.show_context_menu)
-        self.results_list.itemDoubleClicked.connect(self.open_file_on_double_click)
+        self.results_list.doubleClicked.connect(self.open_file_on_double_click)
         layout.addWidget(self.results_list)
+        # Прокрутка, новый поиск, сортировка: видимые строки сменились —
+        # чуть позже снимаем с очереди миниатюры ушедших
+        self.thumb_timer = QTimer(self)
+        self.thumb_timer.setSingleShot(True)
+        self.thumb_timer.setInterval(50)
+        self.thumb_timer.timeout.connect(self.retain_visible_thumbnails)
+        self.results_list.verticalScrollBar().valueChanged.connect(
+            lambda _: self.thumb_timer.start()
+        )
+        self.results_model.modelReset.connect(lambda: self.thumb_timer.start())
+        self.results_model.layoutChanged.connect(lambda: self.thumb_timer.start())
+        # Готовые миниатюры приходят пачками — одна перерисовка на пачку
+        self.thumb_repaint = QTimer(self)
+        self.thumb_repaint.setSingleShot(True)
+        self.thumb_repaint.setInterval(30)
+        self.thumb_repaint.timeout.connect(self.results_list.viewport().update)
+
+        # Дерево режима «Место»; раскрытые ветви переживают обновления снимка
+        self.usage_tree = QTreeWidget()
+        self.usage_tree.setHeaderLabels(["Папка", "Занято", "Файлов"])
+        self.usage_tree.setAlternatingRowColors(True)
+        self.usage_tree.header().setSectionResizeMode(
+            0, QHeaderView.ResizeMode.Stretch
+        )
+        self.usage_tree.itemExpanded.connect(
+            lambda item: self.usage_expanded.add(item.data(0, Qt.ItemDataRole.UserRole))
+        )
+        self.usage_tree.itemCollapsed.connect(
+            lambda item: self.usage_expanded.discard(
+                item.data(0, Qt.ItemDataRole.UserRole)
+            )
+        )
+        self.usage_tree.itemDoubleClicked.connect(
+            lambda item, col: self.open_file(item.data(0, Qt.ItemDataRole.UserRole))
+        )
+        self.usage_expanded = set()
+        self.usage_tree.hide()
+        layout.addWidget(self.usage_tree)
 
         self.main_layout.addWidget(self.sidebar)
         self.main_layout.addWidget(self.content_area)
 
     def set_controls_enabled(self, enabled):
+        # Поле ввода не блокируем: поиск по мере ввода уточняет запрос на ходу
         for b in self.menu_buttons:
             b.setEnabled(enabled)
-        self.search_input.setEnabled(enabled)
         self.browse_btn.setEnabled(enabled)
         self.history_btn.setEnabled(enabled)
+        self.dupes_btn.setEnabled(enabled)
+        self.facets_btn.setEnabled(enabled)
+        self.usage_btn.setEnabled(enabled)
+        self.all_roots_btn.setEnabled(enabled)
+        self.fuzzy_btn.setEnabled(enabled)
+        self.archives_btn.setEnabled(enabled)
+        self.background_btn.setEnabled(enabled)
         self.theme_toggle.setEnabled(enabled)
 
     def toggle_search(self):
         if self.is_searching:
             self.stop_search_process()
         else:
-            self.start_search()
+            # F5 / кнопка обновления — всегда свежий обход, без кэша
+            self.start_search(use_cache=False)
 
     def stop_search_process(self):
-        if self.search_thread and self.search_thread.isRunning():
-            self.search_thread.requestInterruption()
+        pending = self.session.launch is not None
+        self.session.cancel()
+        if pending and not self.session.current:
+            # Поток ещё не стартовал — завершать нечего
+            self.on_search_finished()
 
-    def start_search(self):
-        if self.search_thread and self.search_thread.isRunning():
-            self.search_thread.requestInterruption()
+    def current_search_params(self):
+        # (запрос, deep) для текущего ввода и категории; None — искать нечего
+        term = self.search_input.text().strip()
+        is_all = self.current_filter_key == ALL_FILES
+        if not term and not self.current_filter_ext and not is_all:
+            return None
+        exts = [] if is_all and not term else self.current_filter_ext
+        try:
+            query = compile_query(term, exts)
+        except re.error:
+            self.update_status_card("Ошибка", "Неверное регулярное выражение")
+            return None
+        return query, is_deep(self.current_filter_key)
+
+    def current_stat_filter(self):
+        # StatFilter из полей фильтра; None — в полях ошибка
+        f = {k: e.text() for k, e in self.filter_inputs.items()}
+        try:
+            return StatFilter(
+                parse_size(f["min_size"]),
+                parse_size(f["max_size"]),
+                parse_time(f["after"]),
+                parse_time(f["before"], end=True),
+            )
+        except ValueError:
+            self.update_status_card("Ошибка", "Неверный размер или дата")
+            return None
+
+    def apply_sort(self, *_):
+        # Пересортировка уже найденного, без повторного поиска
+        column = self.sort_combo.currentIndex() - 1
+        desc = self.sort_desc_btn.isChecked()
+        self.results_model.sort(
+            column,
+            Qt.SortOrder.DescendingOrder if desc else Qt.SortOrder.AscendingOrder,
+        )
+
+    def on_search_text_changed(self, text):
+        if self.live_search_enabled:
+            self.live_timer.start()
 
+    def live_search(self):
+        term = self.search_input.text().strip()
+        if not term:
+            return
+        # Короткий запрос запускаем, только если ответ есть в кэше:
+        # полный обход по одной-двум буквам при наборе не нужен
+        if len(term) < LIVE_MIN_WALK_CHARS:
+            params = self.current_search_params()
+            if params is None:
+                return
+            rows, _ = self.result_cache.get(
+                self.root_dir, params[1], params[0], self.cache_scope()
+            )
+            if rows is None:
+                return
+        # Пауза уже выдержана live_timer
+        self.start_search(delay_ms=0)
+
+    def start_search(self, use_cache=True, delay_ms=SEARCH_DEBOUNCE_MS):
+        # Окно готовим сразу, а поток запустит сессия: после паузы и
+        # только когда прерванный обход освободит диск
         self.is_searching = True
         self.set_controls_enabled(False)
         self.refresh_btn.setIcon(QIcon(resource_path("images/stop_icon.png")))
-        self.results_list.clear()
-        self.raw_results_data = []
+        self.results_model.clear()
 
         # СБРОС СЧЕТЧИКА
         self.found_count = 0
         self.status_labels["count"].setText("0")
-
-        term = self.search_input.text().strip()
-        is_all = self.current_filter_key == "ALL_FILES"
-        if not term and not self.current_filter_ext and not is_all:
+        self.max_stall_ms = 0.0
+        self.total_stall_ms = 0.0
+        self.status_labels["status"].setToolTip("")
+        self.status_labels["metrics"].setText("—")
+        self.export_metrics_btn.setEnabled(False)
+        usage = self.usage_btn.isChecked()
+        self.results_list.setVisible(not usage)
+        self.usage_tree.setVisible(usage)
+        self.session.request(lambda: self.launch_search(use_cache), delay_ms)
+
+    def launch_search(self, use_cache):
+        if self.usage_btn.isChecked():
+            return self.launch_usage()
+        params = self.current_search_params()
+        stat_filter = self.current_stat_filter()
+        if params is None or stat_filter is None:
+            self.on_search_finished()
+            return
+        query, deep = params
+        try:
+            rules = build_rules(
+                self.settings.get(PRUNE_KEY), self.current_filter_key, deep
+            )
+        except re.error:
+            self.update_status_card("Ошибка", "Неверное правило в prune")
             self.on_search_finished()
             return
 
-        exts = [] if is_all and not term else self.current_filter_ext
-        deep = self.current_filter_key == "эцп"
+        content = self.content_input.text().strip() or None
+        if content:
+            from finder.content import compile_pattern
+
+            # re:-выражение проверяем здесь, до запуска потока
+            try:
+                compile_pattern(content)
+            except re.error:
+                self.update_status_card("Ошибка", "Неверное регулярное выражение")
+                self.on_search_finished()
+                return
+        archives = self.archives_btn.isChecked()
+        throttle = (
+            throttle_from_settings(self.settings.get(self.BACKGROUND_SCAN_KEY))
+            if self.background_btn.isChecked()
+            else None
+        )
+        if self.dupes_btn.isChecked():
+            self.search_from_cache = False
+            self.search_thread = DuplicateThread(
+                query,
+                self.root_dir,
+                deep,
+                workers=self.scan_workers,
+                batch_size=RESULT_BATCH_SIZE,
+                profile_mode=self.settings.get(self.SCAN_PROFILE_KEY),
+                stat_filter=stat_filter,
+                rules=rules,
+            )
+            self.connect_search_thread()
+            return
+        if self.facets_btn.isChecked():
+            # Категории считаются все сразу: правила отсечения — как у
+            # "Все файлы", без захода в скрытые папки
+            self.search_from_cache = False
+            self.show_facet_counts({})
+            self.search_thread = FacetThread(
+                query,
+                self.root_dir,
+                False,
+                self.categories(),
+                self.results_model.memory_bytes,
+                facet_key=self.facet_key(),
+                index=self.file_index,
+                workers=self.scan_workers,
+                batch_size=RESULT_BATCH_SIZE,
+                profile_mode=self.settings.get(self.SCAN_PROFILE_KEY),
+                stat_filter=stat_filter,
+                rules=build_rules(self.settings.get(PRUNE_KEY), ALL_FILES, False),
+                archives=archives,
+                throttle=throttle,
+            )
+            self.search_thread.facets_updated.connect(
+                self.session.guard(self.show_facet_counts)
+            )
+            self.connect_search_thread()
+            return
+        if self.fuzzy_btn.isChecked() and query.text:
+            self.search_from_cache = False
+            self.search_thread = FuzzySearchThread(
+                query,
+                self.root_dir,
+                deep,
+                self.file_index,
+                self.scan_workers,
+                RESULT_BATCH_SIZE,
+                profile_mode=self.settings.get(self.SCAN_PROFILE_KEY),
+                stat_filter=stat_filter,
+                rules=rules,
+                archives=archives,
+                throttle=throttle,
+            )
+            self.search_thread.results_ranked.connect(
+                self.session.guard(self.set_ranked_results)
+            )
+            self.connect_search_thread()
+            return
+        if self.all_roots_btn.isChecked():
+            self.search_from_cache = False
+            self.search_thread = MultiSearchThread(
+                query,
+                self.search_history + [self.root_dir],
+                deep,
+                index=self.file_index,
+                workers=self.scan_workers,
+                batch_size=RESULT_BATCH_SIZE,
+                profile_mode=self.settings.get(self.SCAN_PROFILE_KEY),
+                content=content,
+                stat_filter=stat_filter,
+                rules=rules,
+                archives=archives,
+                throttle=throttle,
+            )
+            self.connect_search_thread()
+            return
 
-        self.search_thread = SearchThread(term, exts, self.root_dir, deep)
-        self.search_thread.single_result_found.connect(self.add_single_result)
-        self.search_thread.update_status.connect(self.update_status_card)
-        self.search_thread.finished.connect(self.on_search_finished)
-        self.search_thread.start()
+        # Кэш не знает о файлах внутри архивов — с ними всегда идём на диск
+        rows, exact = (
+            self.result_cache.get(self.root_dir, deep, query, self.cache_scope())
+            if use_cache and not archives
+            else (None, False)
+        )
+        # Кэш хранит совпадения по именам без фильтров: для поиска по
+        # содержимому или с фильтром это только кандидаты, а не готовый ответ
+        self.search_from_cache = exact and not content and not stat_filter.active
+        if self.search_from_cache:
+            # Этот запрос уже выполнялся — показываем сохранённый результат
+            self.add_results_batch(rows)
+            self.update_status_card("Готово", f"Всего найдено: {len(rows)}")
+            self.on_search_finished()
+            return
+
+        self.search_thread = SearchThread(
+            query,
+            self.root_dir,
+            deep,
+            self.file_index,
+            self.scan_workers,
+            RESULT_BATCH_SIZE,
+            profile_mode=self.settings.get(self.SCAN_PROFILE_KEY),
+            rows=rows,
+            content=content,
+            stat_filter=stat_filter,
+            rules=rules,
+            archives=archives,
+            throttle=throttle,
+            daemon=self.daemon_socket(),
+            category=self.current_filter_key,
+            prune=self.settings.get(PRUNE_KEY) or {},
+            no_index=not use_cache,
+        )
+        self.connect_search_thread()
+
+    def cache_scope(self):
+        # Набор строк зависит и от правил отсечения: от категории и prune
+        return rules_scope(self.current_filter_key, self.settings.get(PRUNE_KEY))
+
+    def daemon_socket(self):
+        # "daemon_socket": true — сокет по умолчанию, строка — свой путь
+        value = self.settings.get(self.DAEMON_SOCKET_KEY)
+        if not value:
+            return None
+        return value if isinstance(value, str) else ""
+
+    def launch_usage(self):
+        # Место считается по всем файлам, и в скрытых папках тоже; правила
+        # prune из настроек действуют, как при поиске
+        try:
+            rules = build_rules(self.settings.get(PRUNE_KEY), ALL_FILES, True)
+        except re.error:
+            self.update_status_card("Ошибка", "Неверное правило в prune")
+            self.on_search_finished()
+            return
+        min_mb = self.settings.get(self.USAGE_MIN_MB_KEY)
+        self.search_from_cache = False
+        self.search_thread = UsageThread(
+            self.root_dir,
+            True,
+            min_mb * 1024 * 1024 if min_mb is not None else None,
+            workers=self.scan_workers,
+            profile_mode=self.settings.get(self.SCAN_PROFILE_KEY),
+            rules=rules,
+            throttle=(
+                throttle_from_settings(self.settings.get(self.BACKGROUND_SCAN_KEY))
+                if self.background_btn.isChecked()
+                else None
+            ),
+        )
+        self.search_thread.usage_updated.connect(self.session.guard(self.show_usage))
+        self.connect_search_thread()
+
+    def show_usage(self, snap):
+        # Снимок finder.usage.DiskUsage.snapshot(): [путь, байт, файлов,
+        # свёрнуто, закончена, дети]; подпапки уже по убыванию размера
+        tree = self.usage_tree
+        tree.setUpdatesEnabled(False)
+        tree.clear()
+        stack = [(snap, None)] if snap else []
+        while stack:
+            (path, size, files, folded, done, kids), parent = stack.pop()
+            name = path if parent is None else os.path.basename(path)
+            item = QTreeWidgetItem(
+                [name if done else f"{name} …", format_size(size), str(files)]
+            )
+            item.setData(0, Qt.ItemDataRole.UserRole, path)
+            item.setTextAlignment(1, Qt.AlignmentFlag.AlignRight)
+            item.setTextAlignment(2, Qt.AlignmentFlag.AlignRight)
+            tip = path if not folded else f"{path}\nМелких подпапок в сумме: {folded}"
+            item.setToolTip(0, tip)
+            if parent is None:
+                tree.addTopLevelItem(item)
+            else:
+                parent.addChild(item)
+            if parent is None or path in self.usage_expanded:
+                item.setExpanded(True)
+            stack.extend((k, item) for k in reversed(kids))
+        tree.setUpdatesEnabled(True)
+
+    def connect_search_thread(self):
+        t = self.search_thread
+        guard = self.session.guard
+        t.single_result_found.connect(guard(self.add_single_result))
+        t.results_batch.connect(guard(self.add_results_batch))
+        t.update_status.connect(guard(self.update_status_card))
+        t.metrics_updated.connect(guard(self.status_labels["metrics"].setText))
+        self.session.run(t)
 
     def on_search_finished(self):
         self.is_searching = False
         self.set_controls_enabled(True)
         self.refresh_btn.setIcon(QIcon(resource_path("images/refresh.png")))
+        # Строки, пришедшие во время поиска, ставим на места по сортировке
+        self.results_model.resort()
+        t = None if self.search_from_cache else self.search_thread
+        tips = []
+        if t and t.sent_batches:
+            tips.append(
+                f"Пакетов: {t.sent_batches}, пик очереди: {t.peak_batches} "
+                f"({t.peak_items} файлов), макс. задержка UI: "
+                f"{self.max_stall_ms:.1f} мс, всего: {self.total_stall_ms:.0f} мс"
+            )
+        s = self.session
+        if s.last_cancel_ms is not None:
+            tips.append(
+                f"Отмена обхода: {s.last_cancel_ms:.0f} мс (макс. {s.max_cancel_ms:.0f} мс), "
+                f"отброшено устаревших сигналов: {s.dropped}"
+            )
+        self.status_labels["status"].setToolTip("\n".join(tips))
+        if t:
+            self.export_metrics_btn.setEnabled(True)
+        if t and t.completed and t.cacheable:
+            self.result_cache.put(
+                t.root,
+                t.deep,
+                t.query,
+                self.results_model.rows,
+                rules_scope(t.category, t.prune),
+            )
+            # С демоном индекс ведёт он сам
+            if t.daemon is None:
+                self.schedule_indexing(t.root, t.deep)
+        if isinstance(t, FacetThread) and t.completed:
+            if self.facets:
+                self.facets.close()
+            self.facets = t.facets
+            self.facets_key = t.facet_key
+            self.show_facet_counts(self.facets.snapshot(), self.facets)
+            self.show_facet_subset()
+
+    def facet_key(self):
+        # Сводка годится, пока не сменились путь, запрос, фильтры и архивы
+        return (
+            self.root_dir,
+            self.search_input.text().strip(),
+            tuple(e.text() for e in self.filter_inputs.values()),
+            self.archives_btn.isChecked(),
+        )
+
+    def show_facet_counts(self, counts, facets=None):
+        # Число файлов и объём — второй строкой на кнопках категорий;
+        # пустой counts возвращает кнопкам их названия
+        for (name, key), btn in zip(self.categories_map.items(), self.menu_buttons):
+            if key == ALL_FILES:
+                n, size = (facets.found, facets.total_bytes) if facets else (None, 0)
+            elif is_deep(key):
+                # Сводка не заходит в скрытые папки — для ЭЦП число было бы неверным
+                n, size = None, 0
+            else:
+                n, size = counts.get(category_name(key), (None, 0))
+            if n is None:
+                btn.setText(name)
+                btn.setToolTip("")
+            else:
+                btn.setText(f"{name}\n      {n} · {format_size(size)}")
+                btn.setToolTip(f"Файлов: {n}, объём: {format_size(size)}")
+
+    def show_facet_subset(self):
+        # После сводки клик по категории показывает её файлы из памяти
+        key = self.current_filter_key
+        f = self.facets
+        if f is None or self.is_searching or is_deep(key):
+            return False
+        if self.facets_key != self.facet_key():
+            # Сменились путь, запрос или фильтры — сводка устарела
+            self.show_facet_counts({})
+            f.close()
+            self.facets = None
+            return False
+        if key == ALL_FILES:
+            rows = f.store
+        else:
+            rows = f.subset(category_name(key), self.current_filter_ext)
+        self.results_model.set_rows(rows)
+        self.found_count = len(rows)
+        self.status_labels["count"].setText(str(self.found_count))
+        self.update_status_card("Сводка", f"Из памяти: {self.found_count}")
+        return True
+
+    def export_metrics(self):
+        t = self.search_thread
+        if not t:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Экспорт метрик", "scan_metrics.json", "JSON (*.json)"
+        )
+        if not path:
+            return
+        delivery = t.delivery_stats()
+        delivery["max_ui_stall_ms"] = round(self.max_stall_ms, 3)
+        delivery["total_ui_stall_ms"] = round(self.total_stall_ms, 3)
+        extra = {"query": t.query.text, "delivery": delivery}
+        extra["session"] = self.session.report()
+        extra.update(t.report)
+        if t.throttle:
+            extra["background"] = t.throttle.to_dict()
+        if t.rules is not None:
+            extra["pruned"] = t.rules.report()
+        extra.update(t.profile_report)
+        extra["ui"] = self.ui_report()
+        # Файл может лежать на сетевом диске — пишем в пуле
+        self.io.run(
+            t.metrics.export,
+            path,
+            extra,
+            on_fail=lambda err: QMessageBox.warning(
+                self, "Ошибка", f"Не удалось сохранить: {err}"
+            ),
+        )
+
+    def ui_report(self):
+        # Отзывчивость окна: зависания цикла событий, пул IoPool, миниатюры
+        report = {"io": self.io.report()}
+        if self.watchdog:
+            report.update(self.watchdog.report())
+        if self.thumbs:
+            report["thumbnails"] = self.thumbs.report()
+        return report
+
+    def schedule_indexing(self, root, deep):
+        # Индексируем корень после живого обхода или если индекс устарел
+        if self.file_index is None or self.session.busy:
+            return
+        covering = self.file_index.covering_root(root, deep)
+        if covering and time.time() - covering[1] < INDEX_MAX_AGE:
+            return
+        self.index_thread = IndexThread(
+            self.file_index, root, deep, self.scan_workers
+        )
+        self.index_thread.index_ready.connect(self.on_index_ready)
+        # Индексация тоже обход диска — её прервёт следующий поиск
+        self.session.track(self.index_thread)
 
-    def add_single_result(self, f, p):
-        self.raw_results_data.append((f, p))
-        c = THEMES[self.current_theme]["text_path"]
+    def on_index_ready(self, root, count):
+        if not self.is_searching:
+            self.status_labels["status"].setText(f"Индекс: {count}")
 
-        item = QListWidgetItem(self.results_list)
-        w = FileItemWidget(f, p, c)
-        item.setSizeHint(w.sizeHint())
-        self.results_list.setItemWidget(item, w)
-        item.setData(Qt.ItemDataRole.UserRole, p)
+    @property
+    def raw_results_data(self):
+        return self.results_model.rows
+
+    def set_ranked_results(self, rows):
+        self.results_model.set_rows(rows)
+        self.found_count = len(rows)
+        self.status_labels["count"].setText(str(self.found_count))
+
+    def add_single_result(self, row):
+        self.results_model.append_rows([row])
 
         # ОБНОВЛЯЕМ СЧЕТЧИК МГНОВЕННО
         self.found_count += 1
         self.status_labels["count"].setText(str(self.found_count))
 
+    def add_results_batch(self, batch):
+        t0 = time.perf_counter()
+        self.results_model.append_rows(batch)
+
+        # Счетчик обновляем один раз на пакет
+        self.found_count += len(batch)
+        self.status_labels["count"].setText(str(self.found_count))
+
+        # Устаревшие пакеты сюда не доходят (SearchSession.guard). Ответ из
+        # кэша пришёл не от потока: search_thread — прошлый, уже закончивший
+        if self.search_thread and not self.search_from_cache:
+            self.search_thread.ack(len(batch))
+        ms = (time.perf_counter() - t0) * 1000
+        self.max_stall_ms = max(self.max_stall_ms, ms)
+        self.total_stall_ms += ms
+
     def update_status_card(self, title, val):
         self.status_labels["status"].setText(
             title if title != "Сканирование" else "Поиск..."
@@ -605,11 +2391,38 @@ class ModernSearchApp(QMainWindow):
             self.update_path_display()
 
     def show_history_dialog(self):
-        self.search_history = [p for p in self.search_history if os.path.isdir(p)]
+        if self.history_checked:
+            return self.open_history_dialog()
+        # StartupThread ещё проверяет пути — проверяем сами, но в пуле
+        label = self.status_labels["status"]
+        before = label.text()
+        label.setText("Проверка путей...")
+
+        def checked(states):
+            self.apply_history_states(states)
+            label.setText(before)
+            self.open_history_dialog()
+
+        def failed(err):
+            label.setText(before)
+            self.open_history_dialog()
+
+        self.io.run(
+            check_dirs,
+            self.io.pool,
+            list(self.search_history),
+            on_done=checked,
+            on_fail=failed,
+            timeout_ms=IO_TIMEOUT_MS * 2,
+        )
+
+    def open_history_dialog(self):
         if not self.search_history:
             QMessageBox.information(self, "Инфо", "История пуста.")
             return
-        d = HistoryDialog(self.search_history, THEMES[self.current_theme], self)
+        d = HistoryDialog(
+            self.search_history, THEMES[self.current_theme], self, self.unreachable
+        )
         d.path_selected.connect(self.set_new_root_dir)
         d.exec()
 
@@ -627,9 +2440,9 @@ class ModernSearchApp(QMainWindow):
             self.change_category(key, btn)
 
     def show_ext_dialog(self, key, btn):
-        exts = self.json_data.get(key, [])
+        exts = category_exts(self.categories(), key)
         if not exts:
-            return self.change_category("ALL_FILES", self.menu_buttons[0])
+            return self.change_category(ALL_FILES, self.menu_buttons[0])
         name = next(
             (n for n, k in self.categories_map.items() if k == key), "Категория"
         ).split(" ", 1)[-1]
@@ -638,15 +2451,61 @@ class ModernSearchApp(QMainWindow):
             self.current_filter_ext = d.get_selected_extensions()
             self.current_filter_key = key
             self.update_path_display()
+            self.refresh_after_category()
         else:
             self.menu_buttons[0].setChecked(True)
 
     def change_category(self, key, btn):
         self.current_filter_key = key
-        self.current_filter_ext = (
-            [] if key == "ALL_FILES" else self.json_data.get(key, [])
-        )
+        self.current_filter_ext = category_exts(self.categories(), key)
         self.update_path_display()
+        self.refresh_after_category()
+
+    def refresh_after_category(self):
+        # Смена категории при введённом запросе — как живой поиск: частые
+        # клики сливаются в один запуск паузой live_timer
+        self.update_thumbnails()
+        if self.show_facet_subset():
+            return
+        if self.live_search_enabled and self.search_input.text().strip():
+            self.live_timer.start()
+
+    def update_thumbnails(self):
+        show = self.current_filter_key in THUMB_CATEGORIES and self.settings.get(
+            self.THUMBNAILS_KEY, True
+        )
+        if show and self.thumbs is None:
+            from finder.thumbs import DEFAULT_MAX_BYTES as THUMB_MAX_BYTES
+            from finder.thumbs import ThumbCache, Thumbnailer
+
+            mb = self.settings.get(self.THUMB_CACHE_MB_KEY)
+            cache = ThumbCache(max_bytes=mb * 1024 * 1024 if mb else THUMB_MAX_BYTES)
+            video = category_exts(self.categories(), "видео")
+            self.thumbs = ThumbnailLoader(
+                Thumbnailer(decode_image, cache, video),
+                self.devicePixelRatioF(),
+                self,
+            )
+            self.thumbs.ready.connect(lambda: self.thumb_repaint.start())
+        self.results_delegate.thumbs = self.thumbs if show else None
+        if self.thumbs and not show:
+            self.thumbs.retain(set())
+        self.results_list.viewport().update()
+
+    def retain_visible_thumbnails(self):
+        if not self.thumbs:
+            return
+        keys = set()
+        if self.results_delegate.thumbs:
+            view = self.results_list
+            first = view.indexAt(QPoint(1, 1)).row()
+            last = view.indexAt(QPoint(1, view.viewport().height() - 1)).row()
+            if last < 0:
+                last = self.results_model.rowCount() - 1
+            for r in range(max(first, 0), last + 1):
+                _, path, size, mtime = self.results_model.row_at(r)
+                keys.add((path, size, mtime))
+        self.thumbs.retain(keys)
 
     def _update_hint_only(self, key):
         hint = ""
@@ -661,7 +2520,7 @@ class ModernSearchApp(QMainWindow):
 
     def is_root_dir_too_broad(self):
         p = self.root_dir.strip()
-        if not p or p == "/" or p == os.path.expanduser("~"):
+        if not p or p == "/" or p == self.home_dir:
             return True
         if os.name == "nt":
             d, t = os.path.splitdrive(p)
@@ -669,27 +2528,22 @@ class ModernSearchApp(QMainWindow):
                 return True
         return False
 
-    def open_file_on_double_click(self, item):
-        self.open_file(item.data(Qt.ItemDataRole.UserRole))
+    def open_file_on_double_click(self, index):
+        self.open_file(index.data(Qt.ItemDataRole.UserRole))
 
     def open_file(self, path):
-        if not path or not os.path.exists(path):
-            return
-        try:
-            if sys.platform == "win32":
-                os.startfile(path)
-            else:
-                subprocess.call(
-                    ("open" if sys.platform == "darwin" else "xdg-open", path)
-                )
-        except:
-            pass
+        from finder.archives import split_member
+
+        # Файл внутри архива не извлекаем — открываем сам архив
+        path = split_member(path or "")[0]
+        if path:
+            self.launch_path(open_path, path, "открыть")
 
     def show_context_menu(self, pos):
-        item = self.results_list.itemAt(pos)
-        if not item:
+        index = self.results_list.indexAt(pos)
+        if not index.isValid():
             return
-        path = item.data(Qt.ItemDataRole.UserRole)
+        path = index.data(Qt.ItemDataRole.UserRole)
         m = QMenu()
         m.setStyleSheet(
             f"QMenu {{ background-color: {THEMES[self.current_theme]['bg_secondary']}; color: {THEMES[self.current_theme]['text_main']}; }}"
@@ -699,17 +2553,25 @@ class ModernSearchApp(QMainWindow):
         m.exec(self.results_list.mapToGlobal(pos))
 
     def show_in_folder(self, path):
-        if not path or not os.path.exists(path):
-            return
-        try:
-            if sys.platform == "win32":
-                subprocess.Popen(["explorer", "/select,", os.path.normpath(path)])
-            elif sys.platform == "darwin":
-                subprocess.call(["open", "-R", path])
-            else:
-                subprocess.call(["xdg-open", os.path.dirname(path)])
-        except:
-            pass
+        from finder.archives import split_member
+
+        path = split_member(path or "")[0]
+        if path:
+            self.launch_path(reveal_path, path, "показать")
+
+    def launch_path(self, fn, path, action):
+        # Проверка файла и запуск программы — в пуле: на сетевом диске stat
+        # может идти секунды, да и сам запуск (fork/exec) не мгновенный
+        def done(ok):
+            if not ok:
+                self.status_labels["status"].setText("Файл не найден")
+
+        def fail(err):
+            self.status_labels["status"].setText(f"Не удалось {action}: {err}")
+
+        self.io.run(
+            fn, path, on_done=done, on_fail=fail, timeout_ms=LAUNCH_TIMEOUT_MS
+        )
 
     def toggle_theme(self):
         self.current_theme = "light" if self.current_theme == "dark" else "dark"
@@ -718,15 +2580,9 @@ class ModernSearchApp(QMainWindow):
         )
         self.apply_theme()
 
-        if self.raw_results_data:
-            self.results_list.clear()
-            c = THEMES[self.current_theme]["text_path"]
-            for f, p in self.raw_results_data:
-                item = QListWidgetItem(self.results_list)
-                w = FileItemWidget(f, p, c)
-                item.setSizeHint(w.sizeHint())
-                self.results_list.setItemWidget(item, w)
-                item.setData(Qt.ItemDataRole.UserRole, p)
+        # Строки рисует делегат — достаточно перерисовать видимую часть
+        self.results_delegate.set_theme(THEMES[self.current_theme])
+        self.results_list.viewport().update()
 
     def apply_theme(self):
         t = THEMES[self.current_theme]
@@ -762,12 +2618,14 @@ class ModernSearchApp(QMainWindow):
             }}
 
             QLineEdit {{ background: {t['input_bg']}; color: {t['text_main']}; border: 1px solid {t['border']}; border-radius: 12px; padding: 0 15px; font-weight: 500; }}
+            QComboBox {{ background: {t['input_bg']}; color: {t['text_main']}; border: 1px solid {t['border']}; border-radius: 12px; padding: 0 15px; }}
             
             QPushButton#AccentButton {{ background: {t['accent']}; color: {t['accent_text']}; border-radius: 12px; font-weight: bold; padding: 0 15px; }}
             QPushButton#AccentButton:hover {{ background: {t['accent_hover']}; }}
             
             QPushButton#SecondaryButton {{ background: {t['input_bg']}; border: 1px solid {t['border']}; border-radius: 12px; padding: 0 15px; font-weight: 500; }}
             QPushButton#SecondaryButton:hover {{ background: {t['hover']}; border: 1px solid {t['accent']}; color: {t['accent']}; }}
+            QPushButton#SecondaryButton:checked {{ border: 1px solid {t['accent']}; color: {t['accent']}; }}
             
             QPushButton#IconBtn {{ background: {t['input_bg']}; border: 1px solid {t['border']}; border-radius: 12px; padding-left: 12px; color: transparent; font-size: 0; }}
             QPushButton#IconBtn:hover {{ background: {t['hover']}; border: 1px solid {t['text_secondary']}; }}
@@ -775,10 +2633,14 @@ class ModernSearchApp(QMainWindow):
             QFrame#InfoCard {{ background: {t['card_bg']}; border-radius: 15px; border: 1px solid {t['border']}; }}
             QLabel#CardTitle {{ color: {t['text_secondary']}; font-size: 13px; }}
             QLabel#CardValue {{ color: {t['accent']}; font-size: 24px; font-weight: bold; }}
+            QLabel#CardDetail {{ color: {t['text_secondary']}; font-size: 12px; }}
             
-            QListWidget {{ background: {t['bg_secondary']}; alternate-background-color: {t['bg_alternate']}; border-radius: 15px; border: 1px solid {t['border']}; padding: 5px; outline: none; }}
-            QListWidget::item {{ border: none; padding: 0px; }}
-            QListWidget::item:selected {{ background: {t['hover']}; border-radius: 5px; }}
+            QListView {{ background: {t['bg_secondary']}; alternate-background-color: {t['bg_alternate']}; border-radius: 15px; border: 1px solid {t['border']}; padding: 5px; outline: none; }}
+            QListView::item {{ border: none; padding: 0px; }}
+            QListView::item:selected {{ background: {t['hover']}; border-radius: 5px; }}
+            QTreeWidget {{ background: {t['bg_secondary']}; alternate-background-color: {t['bg_alternate']}; border-radius: 15px; border: 1px solid {t['border']}; padding: 5px; outline: none; }}
+            QTreeWidget::item:selected {{ background: {t['hover']}; color: {t['text_main']}; }}
+            QHeaderView::section {{ background: {t['bg_secondary']}; color: {t['text_secondary']}; border: none; padding: 4px; }}
             
             QLabel#HintLabel {{ color: #FF5733; background: transparent; border: none; padding: 0 5px; font-size: 13px; font-weight: 500; }}
             
@@ -790,9 +2652,48 @@ class ModernSearchApp(QMainWindow):
         )
 
 
+def startup_args(argv):
+    # Свои ключи забираем, остальное отдаём Qt
+    profile, out, exit_after, rest = False, None, False, []
+    for a in argv:
+        if a == STARTUP_PROFILE_ARG:
+            profile = True
+        elif a.startswith(STARTUP_PROFILE_ARG + "="):
+            profile, out = True, a.split("=", 1)[1]
+        elif a == STARTUP_EXIT_ARG:
+            exit_after = True
+        else:
+            rest.append(a)
+    return profile, out, exit_after, rest
+
+
+def report_startup(startup, out, exit_after, app):
+    print(startup.report(), file=sys.stderr)
+    if out:
+        startup.export(out)
+    if exit_after:
+        app.quit()
+
+
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = ModernSearchApp()
-    window.show()
+    # Пул процессов поиска по содержимому в сборке PyInstaller (Windows)
+    multiprocessing.freeze_support()
+    profile, out, exit_after, argv = startup_args(sys.argv)
+    startup = StartupTimer(STARTUP_T0) if profile else None
+    if startup:
+        startup.mark("импорт")
+    app = QApplication(argv)
+    if startup:
+        startup.mark("QApplication")
+    window = ModernSearchApp(startup)
+    # Одного showMaximized достаточно: show() перед ним — лишняя раскладка
     window.showMaximized()
+    if startup:
+        startup.mark("показ окна")
+        window.startup_done.connect(
+            lambda: report_startup(startup, out, exit_after, app)
+        )
+    elif exit_after:
+        # --startup-exit без замера: просто закрыться после загрузки
+        window.startup_done.connect(app.quit)
     sys.exit(app.exec())
@@ -0,0 +1,57 @@
+import os
+import zipfile
+
+from finder.archives import ArchiveCache, ArchiveLister
+
+
+def test_cache_key_is_path_size_and_mtime(tmp_path):
+    cache = ArchiveCache(str(tmp_path / "index.db"))
+    members = [("docs/a.txt", 3, 1.0)]
+    cache.put("/x/a.zip", 100, 5.0, members)
+    assert cache.get("/x/a.zip", 100, 5.0) == members
+    # Изменился размер или mtime — оглавление устарело
+    assert cache.get("/x/a.zip", 101, 5.0) is None
+    assert cache.get("/x/a.zip", 100, 6.0) is None
+    assert cache.get("/x/b.zip", 100, 5.0) is None
+    # Новое оглавление заменяет старое целиком
+    cache.put("/x/a.zip", 101, 6.0, [("b.txt", 1, 2.0)])
+    assert cache.get("/x/a.zip", 101, 6.0) == [("b.txt", 1, 2.0)]
+    assert cache.get("/x/a.zip", 100, 5.0) is None
+    cache.close()
+
+
+def test_prune_drops_only_vanished_archives(tmp_path):
+    cache = ArchiveCache(str(tmp_path / "index.db"))
+    kept = tmp_path / "kept.zip"
+    kept.write_bytes(b"")
+    root = str(tmp_path)
+    cache.put(str(kept), 0, 0.0, [])
+    cache.put(os.path.join(root, "gone.zip"), 0, 0.0, [])
+    cache.put("/elsewhere/gone.zip", 0, 0.0, [])
+    assert cache.prune(root, set()) == 1
+    assert cache.get(str(kept), 0, 0.0) == []
+    assert cache.get(os.path.join(root, "gone.zip"), 0, 0.0) is None
+    assert cache.get("/elsewhere/gone.zip", 0, 0.0) == []
+    cache.close()
+
+
+def test_rewritten_archive_is_listed_again(tmp_path):
+    path = tmp_path / "a.zip"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("old.txt", "x")
+    cache = ArchiveCache(str(tmp_path / "index.db"))
+
+    def members():
+        st = os.stat(path)
+        lister = ArchiveLister(cache)
+        lister.submit(str(path), st.st_size, st.st_mtime)
+        names = sorted(row[0] for row in lister.drain())
+        lister.close()
+        return names
+
+    assert members() == ["old.txt"]
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("new.txt", "longer content")
+    os.utime(path, (1, 1))
+    assert members() == ["new.txt"]
+    cache.close()
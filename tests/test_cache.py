@@ -0,0 +1,48 @@
+from finder.cache import ResultCache, rules_scope
+from finder.query import compile_query
+
+
+def test_narrows_longer_substring():
+    assert compile_query("report").narrows(compile_query("rep"))
+    assert compile_query("rep 2024").narrows(compile_query("rep"))
+    assert not compile_query("rep").narrows(compile_query("report"))
+
+
+def test_narrows_prefix_and_extensions():
+    assert compile_query("^report").narrows(compile_query("^rep"))
+    assert compile_query("^report").narrows(compile_query("port"))
+    assert not compile_query("report").narrows(compile_query("^rep"))
+    docs = compile_query("rep", [".doc", ".docx"])
+    assert compile_query("rep", [".doc"]).narrows(docs)
+    assert not compile_query("rep").narrows(docs)
+    assert compile_query("rep", [".doc"]).narrows(compile_query("rep"))
+
+
+def test_narrows_is_exact_for_globs_and_regex():
+    assert not compile_query("*.txt").narrows(compile_query("*.tx?"))
+    assert compile_query("re:a+b").narrows(compile_query("re:a+b"))
+    assert not compile_query("re:ab").narrows(compile_query("re:a"))
+
+
+def test_cache_exact_and_narrowed_hits():
+    cache = ResultCache()
+    rows = [("report.txt", "/r/report.txt", 1, 0.0)]
+    cache.put("/r", False, compile_query("rep"), rows)
+    assert cache.get("/r", False, compile_query("rep")) == (rows, True)
+    assert cache.get("/r", False, compile_query("report")) == (rows, False)
+    assert cache.get("/r", True, compile_query("report")) == (None, False)
+    assert cache.get("/other", False, compile_query("report")) == (None, False)
+
+
+def test_cache_scope_separates_prune_rules():
+    cache = ResultCache()
+    rows = [("report.txt", "/r/report.txt", 1, 0.0)]
+    default = rules_scope("all", {})
+    cache.put("/r", False, compile_query("rep"), rows, default)
+    assert rules_scope("all", None) == default
+    hidden = rules_scope("all", {"hidden": False})
+    assert cache.get("/r", False, compile_query("rep"), hidden) == (None, False)
+    assert cache.get("/r", False, compile_query("report"), hidden) == (None, False)
+    other = rules_scope("docs", {})
+    assert cache.get("/r", False, compile_query("report"), other) == (None, False)
+    assert cache.get("/r", False, compile_query("report"), default) == (rows, False)
@@ -0,0 +1,44 @@
+from finder import fuzzy
+from finder.fuzzy import FuzzySearch, compile_fuzzy
+
+
+def test_casefold_that_changes_length():
+    # "ß" -> "ss", "İ" -> "i̇": позиции из casefold длиннее имени
+    assert compile_fuzzy("ssa")("ßa") is not None
+    assert compile_fuzzy("strasse")("Straße.txt") is not None
+    assert compile_fuzzy("istanbul")("İstanbul.txt") is not None
+    assert compile_fuzzy("ssa")("ßß.txt") is None
+
+
+def test_boundary_bonus_lands_on_original_letters():
+    score = compile_fuzzy("bul")
+    # "B" в "İstanBul" — начало слова camelCase, как и в "IstanBul"
+    assert score("İstanBul") - score("İstanbul") == score("IstanBul") - score(
+        "Istanbul"
+    )
+
+
+def test_ranking_prefers_word_starts():
+    score = compile_fuzzy("rep")
+    assert score("quarterly_report.txt") > score("grepper.txt")
+
+
+def test_results_stat_each_path_once(tmp_path, monkeypatch):
+    rows = []
+    for name in ("report1.txt", "report2.txt"):
+        p = tmp_path / name
+        p.write_text("x")
+        rows.append((name, str(p), -1, 0.0))
+    calls = []
+    real = fuzzy.fill_stat
+
+    def counting(row):
+        calls.append(row[1])
+        return real(row)
+
+    monkeypatch.setattr(fuzzy, "fill_stat", counting)
+    search = FuzzySearch(rows, "report")
+    first = search.run()
+    assert search.results() == first
+    assert sorted(calls) == [row[1] for row in rows]
+    assert all(row[2] == 1 for row in first)
@@ -0,0 +1,53 @@
+from finder.engine import Search
+from finder.index import FileIndex
+from finder.prune import build_rules
+from finder.query import compile_query
+
+
+def make_tree(tmp_path):
+    for rel in ("a/report1.txt", "a/.hidden/report3.txt", "b/report2.txt"):
+        p = tmp_path / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text("x")
+
+
+def names(rows):
+    return sorted(r[0] for r in rows)
+
+
+def test_query_is_scoped_to_indexed_root(tmp_path):
+    make_tree(tmp_path)
+    index = FileIndex(str(tmp_path / "index.db"))
+    assert index.rebuild(str(tmp_path / "a"), False) == 1
+    assert index.rebuild(str(tmp_path / "b"), False) == 1
+
+    query = compile_query("report")
+    assert names(index.query(str(tmp_path / "a"), query, False)) == ["report1.txt"]
+    assert names(index.query(str(tmp_path / "b"), query, False)) == ["report2.txt"]
+
+
+def test_query_is_scoped_to_subfolder_of_indexed_root(tmp_path):
+    make_tree(tmp_path)
+    index = FileIndex(str(tmp_path / "index.db"))
+    index.rebuild(str(tmp_path), False)
+
+    rows = list(index.query(str(tmp_path / "b"), compile_query("report"), False))
+    assert names(rows) == ["report2.txt"]
+
+
+def test_search_skips_index_when_rules_show_hidden(tmp_path):
+    make_tree(tmp_path)
+    index = FileIndex(str(tmp_path / "index.db"))
+    index.rebuild(str(tmp_path / "a"), False)
+    root = str(tmp_path / "a")
+    query = compile_query("report")
+
+    search = Search(root, query, index=index, rules=build_rules({}, None, False))
+    assert search.from_index
+    assert names(search) == ["report1.txt"]
+
+    # Скрытых папок в индексе нет — с hidden: false нужен обход
+    rules = build_rules({"hidden": False}, None, False)
+    search = Search(root, query, index=index, rules=rules)
+    assert not search.from_index
+    assert names(search) == ["report1.txt", "report3.txt"]
@@ -0,0 +1,58 @@
+import pytest
+
+from finder.query import compile_query, regex_literal
+
+NAMES = [
+    "Отчет_2024.xlsx",
+    "ОТЧЁТ.docx",
+    "report.txt",
+    "Straße.pdf",
+    "STRASSE.doc",
+    "archive.tar.gz",
+    ".bashrc",
+    "photo.JPG",
+]
+
+
+@pytest.mark.parametrize(
+    "text, exts",
+    [
+        ("отчет", []),
+        ("отчёт", []),
+        ("REPORT", []),
+        ("strasse", []),
+        ("ß", []),
+        ("", [".xlsx", ".docx"]),
+        ("отч", [".xlsx"]),
+        ("", [".tar.gz"]),
+        ("*.jp?", []),
+        ("^str", []),
+        ("re:\\d{4}", []),
+        ("rep txt", []),
+        ("", []),
+    ],
+)
+def test_matches_agrees_with_match(text, exts):
+    query = compile_query(text, exts)
+    assert query.matches(NAMES) == [query.match(n) for n in NAMES]
+
+
+def test_casefold_and_extensions():
+    assert compile_query("strasse").match("Straße.pdf")
+    assert compile_query("отчет").match("ОТЧЕТ.doc")
+    assert not compile_query("отчет").match("report.doc")
+    docs = compile_query("", [".docx"])
+    assert docs.match("a.DOCX") and not docs.match("a.docx.bak")
+    assert compile_query("", [".tar.gz"]).match("x.tar.gz")
+
+
+def test_terms_are_anded():
+    query = compile_query('rep "final 2"')
+    assert query.match("Report final 2.txt")
+    assert not query.match("Report final.txt")
+
+
+def test_regex_literal_prefilter():
+    assert regex_literal("report_\\d+") == "report_"
+    assert regex_literal("a|b") == ""
+    assert regex_literal("ab?c") == "a"
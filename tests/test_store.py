@@ -0,0 +1,46 @@
+import pytest
+
+from finder import store
+from finder.store import ResultStore
+
+
+def rows(n, base="/data/папка"):
+    out = []
+    for i in range(n):
+        name = f"файл_{i}.txt"
+        out.append((name, f"{base}{i % 7}/{name}", i * 10, 1700000000.5 + i))
+    # Имя не совпадает с концом пути (поиск по содержимому) и суррогаты
+    out.append(("отчет.txt:12  строка", "/data/отчет.txt", 5, 1.0))
+    out.append(("bad\udcff.bin", "/data/bad\udcff.bin", -1, 0.0))
+    return out
+
+
+def test_in_memory_roundtrip():
+    data = rows(50)
+    s = ResultStore(data)
+    assert not s.spilled
+    assert len(s) == len(data)
+    assert list(s) == data
+    assert s[-1] == data[-1]
+    with pytest.raises(IndexError):
+        s[len(data)]
+    s.close()
+
+
+def test_spill_and_read_back(monkeypatch):
+    # Мелкий FLUSH_BYTES: часть хвоста уже в файле, часть ещё в памяти
+    monkeypatch.setattr(store, "FLUSH_BYTES", 256)
+    data = rows(2000)
+    s = ResultStore(memory_bytes=4096)
+    for i in range(0, len(data), 100):
+        s.extend(data[i : i + 100])
+    assert s.spilled
+    assert s.resident_bytes < s.nbytes
+    assert s[0] == data[0]
+    assert s[1000] == data[1000]
+    assert list(s) == data
+    # Дописанное после spill читается вместе со старым
+    s.append(("new.txt", "/x/new.txt", 1, 2.0))
+    assert s[len(data)] == ("new.txt", "/x/new.txt", 1, 2.0)
+    assert s[500] == data[500]
+    s.close()